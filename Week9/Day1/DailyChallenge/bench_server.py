@@ -0,0 +1,355 @@
+# bench_server.py
+"""
+Load test / latency benchmark for server.py.
+
+Usage:
+    python bench_server.py
+    python bench_server.py --concurrency 1 4 16 64 --upstream-latency 0.05 --page-kb 500
+
+The script:
+1. Starts local stub servers for Tavily, Ollama and web pages
+   (configurable latency and payload size)
+2. Starts the FastAPI app with uvicorn, pointed at the stubs
+3. Drives every /tools/* endpoint at rising concurrency
+4. Writes throughput and p50/p95/p99 latency per endpoint and level to JSON
+   (default: bench_results/bench_<timestamp>.json) so runs can be compared
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import requests
+
+ROOT = Path(__file__).resolve().parent
+TOKEN = "bench-token"
+
+
+# ### Stub upstream servers
+
+
+def make_stub_handler(latency: float, page_bytes: int, bullets: int) -> type:
+    """Build a request handler that answers as Tavily, Ollama or a web page."""
+    paragraph = "<p>" + ("Benchmark sentence about the topic. " * 20) + "</p>\n"
+    page_body = (
+        "<html><head><title>Bench page</title>"
+        "<script>var x = 1;</script><style>p { color: red; }</style></head><body>"
+        + paragraph * max(1, page_bytes // len(paragraph))
+        + "</body></html>"
+    ).encode("utf-8")
+    summary = "\n".join(f"- Point number {i} about the topic [1]" for i in range(1, bullets + 1))
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:  # keep the benchmark output clean
+            pass
+
+        def _send(self, body: bytes, content_type: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            time.sleep(latency)
+            self._send(page_body, "text/html; charset=utf-8")
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(latency)
+
+            if self.path == "/search":
+                host = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+                results = [
+                    {
+                        "title": f"Result {i}",
+                        "url": f"{host}/page/{i}",
+                        "content": "Snippet about the topic.",
+                    }
+                    for i in range(payload.get("max_results", 5))
+                ]
+                self._send(json.dumps({"results": results}).encode(), "application/json")
+                return
+
+            if self.path == "/api/chat" and payload.get("stream"):
+                # Ollama streaming: one JSON object per line, a few tokens each
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                pieces = [summary[i: i + 12] for i in range(0, len(summary), 12)]
+                for piece in pieces:
+                    self._chunk(json.dumps({"message": {"content": piece}, "done": False}))
+                self._chunk(json.dumps({"message": {"content": ""}, "done": True}))
+                self.wfile.write(b"0\r\n\r\n")
+                return
+
+            if self.path == "/api/chat":
+                body = {"message": {"role": "assistant", "content": summary}, "done": True}
+                self._send(json.dumps(body).encode(), "application/json")
+                return
+
+            self.send_error(404)
+
+        def _chunk(self, line: str) -> None:
+            data = (line + "\n").encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+    return StubHandler
+
+
+def start_stub(latency: float, page_bytes: int, bullets: int) -> ThreadingHTTPServer:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_stub_handler(latency, page_bytes, bullets))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+# ### Server under test
+
+
+def start_app(stub_url: str, port: int, output_dir: str, keep_cache: bool) -> subprocess.Popen:
+    """Run server.py with uvicorn in a child process, pointed at the stubs."""
+    env = os.environ.copy()
+    env.update(
+        {
+            "MCP_HTTP_TOKEN": TOKEN,
+            "TAVILY_API_KEY": "bench",
+            "TAVILY_URL": f"{stub_url}/search",
+            "LLM_BASE_URL": stub_url,
+            "OUTPUT_DIR": output_dir,
+        }
+    )
+    if not keep_cache:
+        # Every request reaches the stubs, so we measure the full path
+        env["CACHE_TTL_SEARCH"] = "0"
+        env["CACHE_TTL_FETCH"] = "0"
+
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "server:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=str(ROOT),
+        env=env,
+    )
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/tools", headers=auth_headers(), timeout=1)
+            return proc
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("server.py did not start within 30 seconds")
+
+
+def auth_headers() -> dict:
+    return {"Authorization": f"Bearer {TOKEN}"}
+
+
+# ### Load driver
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_level(call: Callable[[requests.Session, int], None], concurrency: int, total: int) -> dict:
+    """Run `total` calls with `concurrency` workers and summarize latencies."""
+    local = threading.local()
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal errors
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            call(session, i)
+            ok = True
+        except Exception:  # noqa: BLE001
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 2),
+    }
+
+
+def build_calls(base: str, stub_url: str) -> Dict[str, Callable[[requests.Session, int], None]]:
+    """One callable per endpoint; each raises on a non-2xx answer."""
+    # Distinct texts: identical ones would be cut to one by the near-duplicate filter
+    docs = [
+        {
+            "title": f"Bench page {n}",
+            "url": f"{stub_url}/page/{n}",
+            "text": " ".join(
+                f"Source {n} sentence {j} about the benchmark topic." for j in range(200)
+            ),
+        }
+        for n in range(3)
+    ]
+    summarize_body = {"topic": "benchmark topic", "docs": docs}
+
+    def post(session: requests.Session, path: str, body: dict) -> requests.Response:
+        resp = session.post(base + path, json=body, headers=auth_headers(), timeout=120)
+        resp.raise_for_status()
+        return resp
+
+    def list_tools(session, i):
+        session.get(base + "/tools", headers=auth_headers(), timeout=30).raise_for_status()
+
+    def search_web(session, i):
+        post(session, "/tools/search_web", {"query": f"benchmark topic {i}", "k": 5})
+
+    def search_multi(session, i):
+        post(session, "/tools/search_multi", {"query": f"benchmark topic {i}", "k": 8})
+
+    def fetch_readable(session, i):
+        post(session, "/tools/fetch_readable", {"url": f"{stub_url}/page/{i}"})
+
+    def summarize(session, i):
+        post(session, "/tools/summarize_with_citations", summarize_body)
+
+    def summarize_stream(session, i):
+        with session.post(
+            base + "/tools/summarize_with_citations/stream",
+            json=summarize_body,
+            headers=auth_headers(),
+            timeout=120,
+            stream=True,
+        ) as resp:
+            resp.raise_for_status()
+            body = b"".join(resp.iter_content(chunk_size=None))
+        if b"event: done" not in body:
+            raise RuntimeError("stream ended without a done event")
+
+    def save_markdown(session, i):
+        post(session, "/tools/save_markdown", {"filename": f"bench_{i % 20}", "content": "# Bench\n" * 50})
+
+    return {
+        "GET /tools": list_tools,
+        "POST /tools/search_web": search_web,
+        "POST /tools/search_multi": search_multi,
+        "POST /tools/fetch_readable": fetch_readable,
+        "POST /tools/summarize_with_citations": summarize,
+        "POST /tools/summarize_with_citations/stream": summarize_stream,
+        "POST /tools/save_markdown": save_markdown,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT), text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the briefing HTTP server.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--requests-per-level", type=int, default=100)
+    parser.add_argument("--upstream-latency", type=float, default=0.02, help="Seconds added by each stub.")
+    parser.add_argument("--page-kb", type=int, default=200, help="Size of stub web pages.")
+    parser.add_argument("--bullets", type=int, default=5, help="Bullets in the stub LLM answer.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--keep-cache", action="store_true", help="Leave the server response cache on.")
+    parser.add_argument("--endpoint", action="append", help="Only run endpoints containing this text.")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    stub = start_stub(args.upstream_latency, args.page_kb * 1024, args.bullets)
+    stub_url = f"http://127.0.0.1:{stub.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        app = start_app(stub_url, args.port, output_dir, args.keep_cache)
+        try:
+            calls = build_calls(f"http://127.0.0.1:{args.port}", stub_url)
+            results: Dict[str, List[dict]] = {}
+            for name, call in calls.items():
+                if args.endpoint and not any(e in name for e in args.endpoint):
+                    continue
+                results[name] = []
+                for concurrency in args.concurrency:
+                    total = max(args.requests_per_level, concurrency)
+                    level = run_level(call, concurrency, total)
+                    results[name].append(level)
+                    print(
+                        f"{name:45s} c={concurrency:<4d} "
+                        f"{level['throughput_rps']:>8.1f} req/s  "
+                        f"p50={level['p50_ms']:.1f}ms p95={level['p95_ms']:.1f}ms "
+                        f"p99={level['p99_ms']:.1f}ms errors={level['errors']}"
+                    )
+        finally:
+            app.terminate()
+            app.wait(timeout=10)
+            stub.shutdown()
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "concurrency": args.concurrency,
+            "requests_per_level": args.requests_per_level,
+            "upstream_latency_s": args.upstream_latency,
+            "page_kb": args.page_kb,
+            "bullets": args.bullets,
+            "cache": args.keep_cache,
+        },
+        "results": results,
+    }
+
+    out = args.out or ROOT / "bench_results" / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(out)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,31 @@
 """
 Usage:
     python brief.py "your topic"
+    python brief.py --queue "topic 1" "topic 2" ...   (server-side jobs, prints job ids)
 
 The script:
 1. Calls /tools/search_web
 2. Picks up to 3 different domains and calls /tools/fetch_readable
+   (near-duplicate pages are skipped via /tools/dedupe_docs and replaced by the next result)
 3. Calls /tools/summarize_with_citations
+   (or its /stream variant when BRIEF_STREAM=1, printing bullets to stderr as they arrive)
 4. Builds a Markdown briefing
 5. Calls /tools/save_markdown and prints the saved path
 """
 
+import json
 import os
 import sys
-from datetime import date
-from urllib.parse import urlparse
 
 import requests
 
+from briefing import build_markdown, distinct_domains
+from storage import brief_filename
+
 # Server base URL and auth
 SERVER_BASE_URL = os.getenv("BRIEF_SERVER_URL", "http://localhost:8000")
 MCP_HTTP_TOKEN = os.getenv("MCP_HTTP_TOKEN", "dev-token")
+BRIEF_STREAM = os.getenv("BRIEF_STREAM", "0") == "1"  # use the SSE summarize endpoint
 
 
 def auth_headers() -> dict:
@@ -39,27 +45,63 @@ def api_post(path: str, payload: dict) -> dict:
     return resp.json()
 
 
-def select_three_domains(results: list) -> list:
-    """Pick at most 3 results with distinct domains."""
-    picked = []
-    seen_domains = set()
-    for item in results:
-        url = item["url"]
-        domain = urlparse(url).netloc
-        if domain not in seen_domains:
-            seen_domains.add(domain)
-            picked.append(item)
-        if len(picked) >= 3:
-            break
-    return picked
+def api_post_stream(path: str, payload: dict):
+    """POST to an SSE endpoint and yield (event, data) pairs as they arrive."""
+    url = SERVER_BASE_URL.rstrip("/") + path
+    with requests.post(
+        url, headers=auth_headers(), json=payload, timeout=60, stream=True
+    ) as resp:
+        if resp.status_code >= 400:
+            raise RuntimeError(f"POST {path} failed: {resp.status_code} {resp.text[:200]}")
+
+        event, data_lines = "message", []
+        for line in resp.iter_lines(decode_unicode=True):
+            if line:
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data_lines.append(line[len("data:"):].strip())
+                continue
+            # Blank line: end of one event
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+
+
+def summarize_streaming(payload: dict) -> dict:
+    """Use the SSE summarize endpoint, showing each bullet on stderr as it completes."""
+    for event, data in api_post_stream("/tools/summarize_with_citations/stream", payload):
+        if event == "bullet":
+            print(f"[{data['index']}/5] {data['text']}", file=sys.stderr, flush=True)
+        elif event == "error":
+            raise RuntimeError(f"Summarize stream failed: {data.get('detail')}")
+        elif event == "done":
+            return data
+    raise RuntimeError("Summarize stream ended without a result.")
+
+
+def queue_topics(topics: list) -> None:
+    """Queue topics on the server (POST /briefs) and print one job id per line."""
+    for topic in topics:
+        job = api_post("/briefs", {"topic": topic})
+        print(f"{job['id']}\t{job['status']}\t{topic}")
 
 
 def main() -> None:
     """Run the full briefing pipeline."""
     if len(sys.argv) < 2:
         print("Usage: python brief.py \"your topic\"")
+        print("       python brief.py --queue \"topic 1\" \"topic 2\" ...")
         sys.exit(1)
 
+    if sys.argv[1] == "--queue":
+        topics = [t.strip() for t in sys.argv[2:] if t.strip()]
+        if not topics:
+            print("Give at least one topic to queue.")
+            sys.exit(1)
+        queue_topics(topics)
+        return
+
     topic = sys.argv[1].strip()
     if not topic:
         print("Topic must not be empty.")
@@ -73,55 +115,49 @@ def main() -> None:
         print("No search results.")
         sys.exit(1)
 
-    picked = select_three_domains(results)
-    if not picked:
+    candidates = distinct_domains(results)
+    if not candidates:
         print("Could not pick any domains.")
         sys.exit(1)
 
-    # 2) Fetch readable versions
+    # 2) Fetch readable versions of 3 distinct domains, skipping pages whose
+    #    text duplicates one already kept and backfilling from the next results
     docs = []
-    for item in picked:
+    kept = []  # signatures of the docs above: only the new page is uploaded
+    for item in candidates:
+        if len(docs) >= 3:
+            break
         url = item["url"]
         fetch_payload = {"url": url}
         fetch_data = api_post("/tools/fetch_readable", fetch_payload)
-        docs.append(
-            {
-                "title": fetch_data["title"],
-                "url": fetch_data["url"],
-                "text": fetch_data["text"],
-            }
-        )
+        doc = {
+            "title": fetch_data["title"],
+            "url": fetch_data["url"],
+            "text": fetch_data["text"],
+        }
+        dedupe_data = api_post("/tools/dedupe_docs", {"docs": [doc], "kept": kept})
+        if dedupe_data["docs"]:
+            docs.append(doc)
+            kept.extend(dedupe_data["signatures"])
+        else:
+            print(f"Skipping near-duplicate page: {url}", file=sys.stderr)
 
     # 3) Summarize with citations
     summarize_payload = {"topic": topic, "docs": docs}
-    summary_data = api_post("/tools/summarize_with_citations", summarize_payload)
+    if BRIEF_STREAM:
+        summary_data = summarize_streaming(summarize_payload)
+    else:
+        summary_data = api_post("/tools/summarize_with_citations", summarize_payload)
 
     bullets = summary_data.get("bullets", [])
     sources = summary_data.get("sources", [])
 
     # 4) Build Markdown briefing
-    today_str = date.today().isoformat()
-    filename = f"brief_{today_str}.md"
-
-    lines = []
-    lines.append(f"# Briefing: {topic}")
-    lines.append("")
-    for b in bullets:
-        lines.append(f"- {b}")
-    lines.append("")
-    lines.append("## Sources")
-    lines.append("")
-
-    for s in sources:
-        idx = s["i"]
-        title = s["title"]
-        url = s["url"]
-        lines.append(f"{idx}. [{title}]({url})")
-
-    content = "\n".join(lines)
-
-    # 5) Save via server
-    save_payload = {"filename": filename, "content": content}
+    filename = brief_filename(topic)
+    content = build_markdown(topic, bullets, sources)
+
+    # 5) Save via server (one file per topic and day, indexed under the topic)
+    save_payload = {"filename": filename, "content": content, "topic": topic}
     save_data = api_post("/tools/save_markdown", save_payload)
 
     path = save_data.get("path")
@@ -0,0 +1,42 @@
+# briefing.py
+"""
+### Briefing helpers shared by brief.py (client) and server.py (background jobs)
+
+- `distinct_domains` keeps the first search result per domain
+- `build_markdown` renders the bullets and numbered sources as Markdown
+"""
+
+from urllib.parse import urlparse
+
+
+def distinct_domains(results: list) -> list:
+    """Results in their original order, keeping the first one per domain."""
+    picked = []
+    seen_domains = set()
+    for item in results:
+        url = item["url"]
+        domain = urlparse(url).netloc
+        if domain not in seen_domains:
+            seen_domains.add(domain)
+            picked.append(item)
+    return picked
+
+
+def build_markdown(topic: str, bullets: list, sources: list) -> str:
+    """Build the Markdown briefing from bullets and indexed sources."""
+    lines = []
+    lines.append(f"# Briefing: {topic}")
+    lines.append("")
+    for b in bullets:
+        lines.append(f"- {b}")
+    lines.append("")
+    lines.append("## Sources")
+    lines.append("")
+
+    for s in sources:
+        idx = s["i"]
+        title = s["title"]
+        url = s["url"]
+        lines.append(f"{idx}. [{title}]({url})")
+
+    return "\n".join(lines)
@@ -0,0 +1,239 @@
+# cache.py
+"""
+### Response cache for the briefing server
+
+A small TTL + LRU cache used by `server.py` for `search_web` and
+`fetch_readable` results:
+
+- entries live in memory (bounded, least recently used evicted first)
+- optional SQLite backing file so the cache survives restarts
+- entries keep their HTTP validators (`ETag` / `Last-Modified`) so a stale
+  page can be revalidated with a conditional GET instead of a full download
+- hit / miss / revalidation counters are exposed for the `/stats` endpoint
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the visitor and never change the content.
+TRACKING_PARAMS_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid"}
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase a search query and collapse whitespace."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical form of a URL for cache keys:
+    lowercase scheme/host, no default port, no fragment,
+    sorted query string without tracking parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not (
+        (scheme == "http" and port == 80) or (scheme == "https" and port == 443)
+    ):
+        host = f"{host}:{port}"
+
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith(TRACKING_PARAMS_PREFIXES)
+    ]
+    query.sort()
+
+    path = parts.path or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+@dataclass
+class CacheEntry:
+    """A cached JSON value with its expiry time and HTTP validators."""
+    value: dict
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """True while the entry is within its TTL."""
+        return (now if now is not None else time.time()) < self.expires_at
+
+    def has_validators(self) -> bool:
+        """True if the entry can be revalidated with a conditional request."""
+        return bool(self.etag or self.last_modified)
+
+
+class ResponseCache:
+    """
+    Thread-safe TTL + LRU cache with an optional SQLite backing file.
+
+    FastAPI runs sync endpoints in a thread pool, so every access goes
+    through a single lock.
+    """
+
+    def __init__(self, max_entries: int = 1000, db_path: Optional[str] = None) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._db.commit()
+
+    # ### Lookup / store
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Return the entry for `key`, fresh or stale, or None.
+        Stale entries are returned so the caller can revalidate them.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+            entry = self._load_from_db(key)
+            if entry is not None:
+                self._remember(key, entry)
+            return entry
+
+    def put(
+        self,
+        key: str,
+        value: dict,
+        ttl: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store a value for `ttl` seconds."""
+        entry = CacheEntry(
+            value=value,
+            expires_at=time.time() + ttl,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        with self._lock:
+            self._remember(key, entry)
+            self._save_to_db(key, entry)
+
+    def refresh(self, key: str, ttl: float) -> Optional[CacheEntry]:
+        """Extend the TTL of an entry after a successful revalidation (304)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.expires_at = time.time() + ttl
+            self._entries.move_to_end(key)
+            self._save_to_db(key, entry)
+            return entry
+
+    # ### Statistics
+
+    def record(self, namespace: str, event: str) -> None:
+        """Count an event ('hit', 'miss', 'revalidated') for a namespace."""
+        with self._lock:
+            counters = self._counters.setdefault(
+                namespace, {"hit": 0, "miss": 0, "revalidated": 0}
+            )
+            counters[event] = counters.get(event, 0) + 1
+
+    def stats(self) -> dict:
+        """Per-namespace counters and hit rates, plus the current size."""
+        with self._lock:
+            namespaces = {}
+            for name, counters in self._counters.items():
+                served = counters["hit"] + counters["revalidated"]
+                total = served + counters["miss"]
+                namespaces[name] = {
+                    **counters,
+                    "hit_rate": round(served / total, 4) if total else 0.0,
+                }
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._db is not None,
+                "namespaces": namespaces,
+            }
+
+    # ### Internals (caller holds the lock)
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load_from_db(self, key: str) -> Optional[CacheEntry]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT value, expires_at, etag, last_modified FROM cache WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        self._db.execute(
+            "UPDATE cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+        )
+        self._db.commit()
+        return CacheEntry(
+            value=json.loads(row[0]),
+            expires_at=row[1],
+            etag=row[2],
+            last_modified=row[3],
+        )
+
+    def _save_to_db(self, key: str, entry: CacheEntry) -> None:
+        if self._db is None:
+            return
+        self._db.execute(
+            """
+            INSERT OR REPLACE INTO cache
+                (key, value, expires_at, etag, last_modified, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                key,
+                json.dumps(entry.value),
+                entry.expires_at,
+                entry.etag,
+                entry.last_modified,
+                time.time(),
+            ),
+        )
+        # Keep the backing file bounded too: drop the least recently used rows.
+        self._db.execute(
+            """
+            DELETE FROM cache WHERE key IN (
+                SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+        self._db.commit()
@@ -0,0 +1,151 @@
+# dedup.py
+"""
+### Near-duplicate detection for fetched documents
+
+Syndicated articles often show up on several domains with the same text.
+Each document gets a MinHash signature of its word 5-gram shingles:
+
+- one-permutation MinHash: every shingle is hashed once and kept as the
+  minimum of one of `num_perm` bins, so fingerprinting is linear in the text
+- banded LSH (`bands` x `rows` = `num_perm`) finds candidate pairs without
+  comparing every document with every other one
+- candidates are confirmed with the estimated Jaccard similarity
+
+Signatures are cached by a hash of the text, so the same content is
+fingerprinted only once whatever URL it came from, and a changed page is
+fingerprinted again.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_WORDS = 5
+MAX_HASH = (1 << 64) - 1
+
+_WORD = re.compile(r"\w+")
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> Set[str]:
+    """Set of lowercase word n-grams (the whole text if it is shorter)."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i: i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str, num_perm: int = NUM_PERM) -> Signature:
+    """One-permutation MinHash signature with empty bins filled from the right."""
+    bins = [MAX_HASH] * num_perm
+    for shingle in shingles(text):
+        h = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        b, value = h % num_perm, h // num_perm
+        if value < bins[b]:
+            bins[b] = value
+
+    # Densification: an empty bin borrows the next non-empty bin's value
+    if all(v == MAX_HASH for v in bins):
+        return tuple(bins)
+    for i in range(num_perm):
+        j = i
+        while bins[j % num_perm] == MAX_HASH:
+            j += 1
+        if j != i:
+            bins[i] = bins[j % num_perm]
+    return tuple(bins)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class LSHIndex:
+    """Banded LSH over MinHash signatures."""
+
+    def __init__(self, bands: int = BANDS, num_perm: int = NUM_PERM) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[Signature, List[int]]] = [{} for _ in range(bands)]
+        self._signatures: List[Signature] = []
+
+    def _band_keys(self, signature: Signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start: start + self.rows]
+
+    def add(self, signature: Signature) -> int:
+        """Index a signature and return its id."""
+        item_id = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, []).append(item_id)
+        return item_id
+
+    def query(self, signature: Signature, threshold: float) -> Optional[Tuple[int, float]]:
+        """Best indexed item with similarity >= threshold, as (id, similarity)."""
+        candidates: Set[int] = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        best: Optional[Tuple[int, float]] = None
+        for item_id in candidates:
+            score = similarity(signature, self._signatures[item_id])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (item_id, score)
+        return best
+
+
+class NearDuplicateDetector:
+    """Signature cache per content hash plus duplicate grouping for signature lists."""
+
+    def __init__(self, threshold: float = 0.8, max_cached: int = 5000) -> None:
+        self.threshold = threshold
+        self.max_cached = max_cached
+        self._signatures: "OrderedDict[bytes, Signature]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def signature(self, text: str) -> Signature:
+        """MinHash signature for a document text, cached under a hash of the text."""
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            cached = self._signatures.get(key)
+            if cached is not None:
+                self._signatures.move_to_end(key)
+                return cached
+        signature = minhash_signature(text)
+        with self._lock:
+            self._signatures[key] = signature
+            while len(self._signatures) > self.max_cached:
+                self._signatures.popitem(last=False)
+        return signature
+
+    def find_duplicates(
+        self, signatures: Sequence[Signature]
+    ) -> Tuple[List[int], List[Tuple[int, int, float]]]:
+        """
+        Earlier signatures win.
+        Returns (indices kept, [(dropped index, duplicate of index, similarity)]).
+        """
+        index = LSHIndex()
+        kept: List[int] = []
+        dropped: List[Tuple[int, int, float]] = []
+        for i, signature in enumerate(signatures):
+            match = index.query(tuple(signature), self.threshold)
+            if match is not None:
+                dropped.append((i, kept[match[0]], match[1]))
+                continue
+            index.add(tuple(signature))
+            kept.append(i)
+        return kept, dropped
@@ -0,0 +1,185 @@
+# jobs.py
+"""
+### Background briefing jobs
+
+- `JobStore` keeps job state in SQLite so it survives server restarts
+- `BriefJobQueue` runs the briefing pipeline on a bounded thread pool and
+  deduplicates topics that are already queued or running
+
+Job status moves through: queued -> running -> done | failed
+"""
+
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+IN_FLIGHT = (QUEUED, RUNNING)
+
+
+def topic_key(topic: str) -> str:
+    """Normalized topic used to detect identical in-flight jobs."""
+    return re.sub(r"\s+", " ", topic).strip().lower()
+
+
+@dataclass
+class Job:
+    """State of one briefing job."""
+    id: str
+    topic: str
+    status: str
+    created_at: float
+    updated_at: float
+    path: Optional[str] = None
+    error: Optional[str] = None
+
+
+class JobStore:
+    """SQLite-backed job table, safe to use from worker threads."""
+
+    _COLUMNS = "id, topic, status, created_at, updated_at, path, error"
+
+    def __init__(self, db_path: str) -> None:
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    topic TEXT NOT NULL,
+                    topic_key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    path TEXT,
+                    error TEXT
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_topic_status ON jobs (topic_key, status)"
+            )
+            self._db.commit()
+
+    def create_or_get_in_flight(self, topic: str) -> Tuple[Job, bool]:
+        """
+        Return the queued/running job for this topic if there is one,
+        otherwise create a new queued job. The bool is True if created.
+        """
+        key = topic_key(topic)
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM jobs "
+                "WHERE topic_key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (key, *IN_FLIGHT),
+            ).fetchone()
+            if row is not None:
+                return Job(*row), False
+
+            now = time.time()
+            job = Job(
+                id=uuid.uuid4().hex,
+                topic=topic,
+                status=QUEUED,
+                created_at=now,
+                updated_at=now,
+            )
+            self._db.execute(
+                "INSERT INTO jobs (id, topic, topic_key, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job.id, job.topic, key, job.status, job.created_at, job.updated_at),
+            )
+            self._db.commit()
+            return job, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return Job(*row) if row else None
+
+    def update(
+        self,
+        job_id: str,
+        status: str,
+        path: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, path = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, path, error, time.time(), job_id),
+            )
+            self._db.commit()
+
+    def requeue_interrupted(self) -> List[Job]:
+        """
+        After a restart, jobs left 'running' never finished: put them back
+        to 'queued' and return every queued job, oldest first.
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (QUEUED, time.time(), RUNNING),
+            )
+            self._db.commit()
+            rows = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE status = ? ORDER BY created_at",
+                (QUEUED,),
+            ).fetchall()
+        return [Job(*row) for row in rows]
+
+
+class BriefJobQueue:
+    """Run `pipeline(topic) -> saved path` for queued jobs with bounded concurrency."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        pipeline: Callable[[str], str],
+        max_workers: int = 4,
+    ) -> None:
+        self.store = store
+        self.pipeline = pipeline
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="brief-job"
+        )
+
+    def submit(self, topic: str) -> Tuple[Job, bool]:
+        """Queue a topic, reusing an identical in-flight job when there is one."""
+        job, created = self.store.create_or_get_in_flight(topic)
+        if created:
+            self._executor.submit(self._run, job.id, job.topic)
+        return job, created
+
+    def resume(self) -> int:
+        """Re-submit jobs that were queued or running before a restart."""
+        jobs = self.store.requeue_interrupted()
+        for job in jobs:
+            self._executor.submit(self._run, job.id, job.topic)
+        return len(jobs)
+
+    def shutdown(self) -> None:
+        # Pending jobs stay 'queued' in SQLite and are resumed on next start.
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job_id: str, topic: str) -> None:
+        self.store.update(job_id, RUNNING)
+        try:
+            path = self.pipeline(topic)
+        except Exception as exc:  # noqa: BLE001
+            # HTTPException carries its message in .detail
+            error = getattr(exc, "detail", None) or str(exc) or exc.__class__.__name__
+            self.store.update(job_id, FAILED, error=str(error)[:500])
+            return
+        self.store.update(job_id, DONE, path=path)
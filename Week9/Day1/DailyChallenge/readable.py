@@ -0,0 +1,132 @@
+# readable.py
+"""
+### Streaming HTML to text extraction
+
+`ReadableTextParser` is an event-driven parser (stdlib `html.parser`) that
+can be fed the page chunk by chunk:
+
+- text inside <script>, <style>, <noscript>, <template> is skipped
+- the <title> is captured on the fly
+- text is collected as it arrives and whitespace collapsed once at the end
+
+Work is linear in the input size and memory is bounded by the text kept,
+so there is no whole-document regex pass and no catastrophic backtracking.
+"""
+
+import codecs
+from html.parser import HTMLParser
+from typing import Iterable, List, Optional, Tuple
+
+SKIPPED_TAGS = {"script", "style", "noscript", "template"}
+
+# Tags that separate words visually; a space is inserted around them.
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "tr", "td", "th", "table",
+    "section", "article", "header", "footer", "nav", "aside",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre",
+}
+
+
+class ReadableTextParser(HTMLParser):
+    """Collect visible text and the page title from streamed HTML."""
+
+    def __init__(self, max_text_chars: Optional[int] = None) -> None:
+        super().__init__(convert_charrefs=True)
+        self.max_text_chars = max_text_chars
+        self._skip_depth = 0
+        self._in_title = False
+        self._title_parts: List[str] = []
+        self._text_parts: List[str] = []
+        self._text_len = 0
+
+    # ### Parser events
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in BLOCK_TAGS:
+            self._add_text(" ")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in BLOCK_TAGS:
+            self._add_text(" ")
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self._title_parts.append(data)
+            return
+        self._add_text(data)
+
+    # ### Results
+
+    @property
+    def full(self) -> bool:
+        """True once `max_text_chars` of text have been collected."""
+        return self.max_text_chars is not None and self._text_len >= self.max_text_chars
+
+    @property
+    def title(self) -> str:
+        return " ".join("".join(self._title_parts).split())
+
+    @property
+    def text(self) -> str:
+        text = " ".join("".join(self._text_parts).split())
+        if self.max_text_chars is not None:
+            text = text[: self.max_text_chars]
+        return text
+
+    def _add_text(self, data: str) -> None:
+        if self.full or not data:
+            return
+        # Raw pieces are kept as-is; whitespace is collapsed once in `text`
+        # so words split across chunk boundaries stay intact.
+        self._text_parts.append(data)
+        self._text_len += len(data)
+
+
+def extract_readable(
+    chunks: Iterable[bytes],
+    encoding: Optional[str] = None,
+    max_bytes: int = 2_000_000,
+    max_text_chars: Optional[int] = None,
+) -> Tuple[str, str, bool]:
+    """
+    Feed raw byte chunks into the parser until the input ends, `max_bytes`
+    have been read or enough text was collected.
+
+    Returns (title, text, truncated).
+    """
+    try:
+        decoder_cls = codecs.getincrementaldecoder(encoding or "utf-8")
+    except LookupError:
+        decoder_cls = codecs.getincrementaldecoder("utf-8")
+    decoder = decoder_cls(errors="replace")
+    parser = ReadableTextParser(max_text_chars=max_text_chars)
+    read = 0
+    truncated = False
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if read + len(chunk) > max_bytes:
+            chunk = chunk[: max_bytes - read]
+            truncated = True
+        read += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if truncated or parser.full:
+            truncated = True
+            break
+    else:
+        # Input ended normally: flush the decoder and any pending markup.
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+
+    return parser.title, parser.text, truncated
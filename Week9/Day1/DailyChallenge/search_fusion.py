@@ -0,0 +1,65 @@
+# search_fusion.py
+"""
+### Multi-query search helpers
+
+- `expand_queries` turns one topic into a few query variants
+- `reciprocal_rank_fusion` merges several ranked result lists into one,
+  deduplicating on a key (the canonical URL)
+
+RRF score of an item = sum over lists of 1 / (k + rank), with rank from 1.
+It needs no score calibration between lists and rewards items that several
+variants agree on.
+"""
+
+from typing import Callable, Dict, Hashable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+RRF_K = 60
+
+# Suffixes added to the topic to broaden coverage; the plain topic comes first.
+QUERY_TEMPLATES = [
+    "{topic}",
+    "{topic} latest news",
+    "{topic} explained",
+    "{topic} analysis",
+    "{topic} statistics and data",
+    "{topic} expert opinion",
+]
+
+
+def expand_queries(topic: str, variants: int) -> List[str]:
+    """Return up to `variants` distinct queries, starting with the topic itself."""
+    topic = " ".join(topic.split())
+    queries: List[str] = []
+    for template in QUERY_TEMPLATES[: max(1, variants)]:
+        query = template.format(topic=topic)
+        if query.lower() not in (q.lower() for q in queries):
+            queries.append(query)
+    return queries
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[T]],
+    key: Callable[[T], Hashable],
+    k: int = RRF_K,
+) -> List[T]:
+    """
+    Fuse ranked lists with RRF. Items sharing a key are merged; the first
+    occurrence (from the earliest list) is kept as the representative.
+    """
+    scores: Dict[Hashable, float] = {}
+    items: Dict[Hashable, T] = {}
+    for results in ranked_lists:
+        seen_in_list = set()
+        for rank, item in enumerate(results, start=1):
+            item_key = key(item)
+            if item_key in seen_in_list:
+                continue
+            seen_in_list.add(item_key)
+            scores[item_key] = scores.get(item_key, 0.0) + 1.0 / (k + rank)
+            items.setdefault(item_key, item)
+
+    # Stable on ties: dict order is first-seen order
+    ordered = sorted(scores, key=lambda item_key: -scores[item_key])
+    return [items[item_key] for item_key in ordered]
@@ -6,35 +6,89 @@ Exposes JSON HTTP endpoints:
 
 - GET /tools
 - POST /tools/search_web
+- POST /tools/search_multi
 - POST /tools/fetch_readable
+- POST /tools/dedupe_docs
 - POST /tools/summarize_with_citations
+- POST /tools/summarize_with_citations/stream  (Server-Sent Events)
 - POST /tools/save_markdown
+- GET /stats
+- POST /briefs       (queue a topic, returns a job id)
+- GET /briefs/{id}   (job status)
+- GET /briefs        (saved briefs from the output index)
 """
 
 import os
 import re
 import json
+from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, List, Optional
 
+import httpx
 import requests
 from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, HttpUrl
 
+from briefing import build_markdown, distinct_domains
+from cache import ResponseCache, canonical_url, normalize_query
+from context_packer import pack_context
+from dedup import NearDuplicateDetector
+from jobs import BriefJobQueue, Job, JobStore
+from readable import extract_readable
+from search_fusion import expand_queries, reciprocal_rank_fusion
+from storage import BriefStorage, brief_filename
+
 # ### Configuration (via environment variables)
 
 MCP_HTTP_TOKEN = os.getenv("MCP_HTTP_TOKEN", "dev-token")  # simple Bearer auth
 
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")  # web search API key (Tavily here)
-TAVILY_URL = "https://api.tavily.com/search"
+TAVILY_URL = os.getenv("TAVILY_URL", "https://api.tavily.com/search")
 
 LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:11434")  # Ollama by default
 LLM_MODEL = os.getenv("LLM_MODEL", "llama3")
+# Approximate tokens of source text sent to the LLM, shared across all docs
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "1500"))
 
 OUTPUT_DIR = os.getenv("OUTPUT_DIR", "output")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Response cache for search/fetch results (TTL in seconds)
+CACHE_TTL_SEARCH = float(os.getenv("CACHE_TTL_SEARCH", "3600"))
+CACHE_TTL_FETCH = float(os.getenv("CACHE_TTL_FETCH", "86400"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH")  # e.g. "cache.sqlite3"; unset = memory only
+
+cache = ResponseCache(max_entries=CACHE_MAX_ENTRIES, db_path=CACHE_DB_PATH)
+
+# Atomic, content-hashed writes for save_markdown, indexed in OUTPUT_DIR/index.json
+storage = BriefStorage(OUTPUT_DIR)
+SAVE_TIMEOUT = float(os.getenv("SAVE_TIMEOUT", "30"))
+
+# fetch_readable limits: bytes read from the origin and characters returned
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+FETCH_MAX_TEXT_CHARS = int(os.getenv("FETCH_MAX_TEXT_CHARS", "200000"))
+FETCH_CHUNK_SIZE = 64 * 1024
+
+# Near-duplicate documents (estimated Jaccard similarity of word 5-grams)
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
+duplicates = NearDuplicateDetector(threshold=NEAR_DUP_THRESHOLD)
+
+# search_multi: query variants searched in parallel within one latency budget
+SEARCH_MULTI_VARIANTS = int(os.getenv("SEARCH_MULTI_VARIANTS", "4"))
+SEARCH_MULTI_BUDGET = float(os.getenv("SEARCH_MULTI_BUDGET", "8"))  # seconds
+search_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="search")
+
+# Background briefing jobs (POST /briefs)
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(OUTPUT_DIR, "jobs.sqlite3"))
+BRIEF_WORKERS = int(os.getenv("BRIEF_WORKERS", "4"))
+
 # ### FastAPI app
 
 app = FastAPI(title="HTTP Web Search Briefing Bot")
@@ -89,6 +143,21 @@ class SearchResponse(BaseModel):
     results: List[SearchResult]
 
 
+class SearchMultiRequest(BaseModel):
+    """Input for /tools/search_multi."""
+    query: str
+    k: int = 8
+    variants: int = SEARCH_MULTI_VARIANTS
+    budget_seconds: float = SEARCH_MULTI_BUDGET
+
+
+class SearchMultiResponse(BaseModel):
+    """Output for /tools/search_multi."""
+    results: List[SearchResult]
+    queries: List[str]
+    completed: int  # variants answered within the budget
+
+
 class FetchReadableRequest(BaseModel):
     """Input for /tools/fetch_readable."""
     url: HttpUrl
@@ -108,6 +177,32 @@ class Doc(BaseModel):
     text: str
 
 
+class DocSignature(BaseModel):
+    """MinHash signature of a document already kept by the caller."""
+    url: HttpUrl
+    signature: List[int]
+
+
+class DedupeRequest(BaseModel):
+    """Input for /tools/dedupe_docs (`kept` docs are compared, never returned)."""
+    docs: List[Doc]
+    kept: List[DocSignature] = []
+
+
+class DuplicateInfo(BaseModel):
+    """A dropped document and the kept one it duplicates."""
+    url: HttpUrl
+    duplicate_of: HttpUrl
+    similarity: float
+
+
+class DedupeResponse(BaseModel):
+    """Output for /tools/dedupe_docs (`signatures` of the returned docs, for `kept`)."""
+    docs: List[Doc]
+    signatures: List[DocSignature]
+    duplicates: List[DuplicateInfo]
+
+
 class SummarizeRequest(BaseModel):
     """Input for /tools/summarize_with_citations."""
     topic: str
@@ -127,37 +222,58 @@ class SummarizeResponse(BaseModel):
     sources: List[SourceInfo]
 
 
+class StatsResponse(BaseModel):
+    """Output for /stats."""
+    cache: dict
+
+
+class BriefJobRequest(BaseModel):
+    """Input for POST /briefs."""
+    topic: str
+
+
+class BriefJobResponse(BaseModel):
+    """State of a background briefing job."""
+    id: str
+    topic: str
+    status: str
+    created_at: datetime
+    updated_at: datetime
+    path: Optional[str] = None
+    error: Optional[str] = None
+    deduplicated: bool = False
+
+
 class SaveMarkdownRequest(BaseModel):
     """Input for /tools/save_markdown."""
     filename: str
     content: str
+    topic: Optional[str] = None  # defaults to the "# Briefing: ..." heading
 
 
 class SaveMarkdownResponse(BaseModel):
     """Output for /tools/save_markdown."""
     path: str
+    sha256: str
+    written: bool  # False when identical content was already saved
 
 
-# ### Helper functions
+class BriefIndexEntry(BaseModel):
+    """One saved brief from the output index."""
+    filename: str
+    path: str
+    topic: str
+    date: str
+    sha256: str
+    saved_at: str
 
 
-def strip_html(html: str) -> str:
-    """Very simple HTML to text: remove tags and compress spaces."""
-    text = re.sub(r"<script.*?</script>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r"<style.*?</style>", "", text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r"<[^>]+>", " ", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+class BriefIndexResponse(BaseModel):
+    """Output for GET /briefs."""
+    briefs: List[BriefIndexEntry]
 
 
-def extract_title(html: str) -> str:
-    """Extract <title> tag from HTML."""
-    m = re.search(r"<title>(.*?)</title>", html, flags=re.IGNORECASE | re.DOTALL)
-    if not m:
-        return ""
-    title = m.group(1)
-    title = re.sub(r"\s+", " ", title)
-    return title.strip()
+# ### Helper functions
 
 
 def call_tavily(query: str, k: int) -> List[SearchResult]:
@@ -202,12 +318,13 @@ def call_tavily(query: str, k: int) -> List[SearchResult]:
     return results
 
 
-def call_llm_summarize(topic: str, docs: List[Doc]) -> str:
-    """Call local LLM (Ollama or compatible) to get a bullet summary text."""
+def build_summary_prompt(topic: str, docs: List[Doc]) -> str:
+    """Build the briefing prompt with indexed sources."""
     # Build a compact context for the model
+    # Most relevant sentences of every doc, sharing one token budget
+    snippets = pack_context(topic, [doc.text for doc in docs], SUMMARY_TOKEN_BUDGET)
     docs_summary_parts = []
-    for idx, doc in enumerate(docs, start=1):
-        snippet = doc.text[:2000]
+    for idx, (doc, snippet) in enumerate(zip(docs, snippets), start=1):
         docs_summary_parts.append(
             f"Source [{idx}] - {doc.title} ({doc.url}):\n{snippet}\n"
         )
@@ -234,15 +351,26 @@ Task:
 Sources:
 {context_block}
 """.strip()
+    return prompt
 
-    # Ollama /api/chat
-    url = f"{LLM_BASE_URL.rstrip('/')}/api/chat"
-    body = {
+
+def llm_chat_body(prompt: str, stream: bool) -> dict:
+    """Request body for Ollama /api/chat."""
+    return {
         "model": LLM_MODEL,
         "messages": [{"role": "user", "content": prompt}],
-        "stream": False,
+        "stream": stream,
     }
 
+
+def call_llm_summarize(topic: str, docs: List[Doc]) -> str:
+    """Call local LLM (Ollama or compatible) to get a bullet summary text."""
+    prompt = build_summary_prompt(topic, docs)
+
+    # Ollama /api/chat
+    url = f"{LLM_BASE_URL.rstrip('/')}/api/chat"
+    body = llm_chat_body(prompt, stream=False)
+
     try:
         resp = requests.post(url, json=body, timeout=60)
     except requests.RequestException as e:
@@ -262,31 +390,155 @@ Sources:
     return content
 
 
+MAX_BULLETS = 5
+MAX_BULLET_CHARS = 200
+MISSING_BULLET = "Additional detail not provided by the model."
+
+
+def _clip_bullet(bullet: str) -> str:
+    """Cut a bullet to MAX_BULLET_CHARS, ending with '...' when cut."""
+    if len(bullet) > MAX_BULLET_CHARS:
+        bullet = bullet[: MAX_BULLET_CHARS - 3] + "..."
+    return bullet
+
+
+class BulletStreamParser:
+    """
+    Incremental version of the bullet rules: feed text deltas as they
+    arrive and get back each bullet as soon as its line is complete.
+    """
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._text_parts: List[str] = []
+        self.bullets: List[str] = []
+
+    def feed(self, delta: str) -> List[str]:
+        """Add a text delta; return the bullets completed by it."""
+        self._text_parts.append(delta)
+        self._pending += delta
+        *lines, self._pending = self._pending.split("\n")
+        return [b for b in (self._take_line(line) for line in lines) if b is not None]
+
+    def finish(self) -> List[str]:
+        """Flush the last line and return exactly MAX_BULLETS bullets."""
+        self._take_line(self._pending)
+        self._pending = ""
+        bullets = list(self.bullets)
+        if not bullets:
+            # Fallback: use whole text as one bullet if parsing fails
+            bullets = [_clip_bullet("".join(self._text_parts).strip())]
+        while len(bullets) < MAX_BULLETS:
+            bullets.append(MISSING_BULLET)
+        return bullets
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return "".join(self._text_parts)
+
+    def _take_line(self, line: str) -> Optional[str]:
+        line = line.strip()
+        if not line.startswith("- ") or len(self.bullets) >= MAX_BULLETS:
+            return None
+        bullet = _clip_bullet(line[2:].strip())
+        self.bullets.append(bullet)
+        return bullet
+
+
 def parse_bullets(text: str) -> List[str]:
     """Extract bullet lines from LLM text and enforce 5 bullets <= 200 chars."""
-    lines = text.splitlines()
-    bullets = []
-    for line in lines:
-        line = line.strip()
-        if line.startswith("- "):
-            bullet = line[2:].strip()
-            if len(bullet) > 200:
-                bullet = bullet[:197] + "..."
-            bullets.append(bullet)
-    if not bullets:
-        # Fallback: use whole text as one bullet if parsing fails
-        bullet = text.strip()
-        if len(bullet) > 200:
-            bullet = bullet[:197] + "..."
-        bullets = [bullet]
-
-    # Enforce exactly 5 bullets
-    if len(bullets) > 5:
-        bullets = bullets[:5]
-    else:
-        while len(bullets) < 5:
-            bullets.append("Additional detail not provided by the model.")
-    return bullets
+    parser = BulletStreamParser()
+    parser.feed(text)
+    return parser.finish()
+
+
+def dedupe(docs: List[Doc], kept: Optional[List[DocSignature]] = None) -> DedupeResponse:
+    """
+    Drop documents whose text nearly duplicates an earlier one. `kept` are
+    signatures of documents the caller already holds: they come first, so a
+    client adding pages one by one only sends the new page.
+    """
+    kept = kept or []
+    signatures = [tuple(k.signature) for k in kept]
+    signatures += [duplicates.signature(doc.text) for doc in docs]
+    urls = [k.url for k in kept] + [doc.url for doc in docs]
+    offset = len(kept)
+    keep, dropped = duplicates.find_duplicates(signatures)
+    new = [i for i in keep if i >= offset]
+    return DedupeResponse(
+        docs=[docs[i - offset] for i in new],
+        signatures=[DocSignature(url=urls[i], signature=list(signatures[i])) for i in new],
+        duplicates=[
+            DuplicateInfo(url=urls[i], duplicate_of=urls[j], similarity=round(score, 3))
+            for i, j, score in dropped
+            if i >= offset
+        ],
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_summary_events(
+    prompt: str,
+    sources: List[SourceInfo],
+) -> AsyncIterator[str]:
+    """
+    Proxy the Ollama token stream and emit SSE events:
+    - `bullet` once per completed bullet ({"index", "text"})
+    - `done` with the final bullets and sources
+    - `error` if the LLM call fails
+    """
+    url = f"{LLM_BASE_URL.rstrip('/')}/api/chat"
+    body = llm_chat_body(prompt, stream=True)
+    parser = BulletStreamParser()
+
+    try:
+        async with httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=10.0)) as client:
+            async with client.stream("POST", url, json=body) as resp:
+                if resp.status_code != 200:
+                    detail = (await resp.aread()).decode("utf-8", "replace")[:200]
+                    yield sse_event(
+                        "error", {"detail": f"LLM error {resp.status_code}: {detail}"}
+                    )
+                    return
+
+                # Ollama streams one JSON object per line
+                async for line in resp.aiter_lines():
+                    if not line.strip():
+                        continue
+                    try:
+                        chunk = json.loads(line)
+                    except ValueError:
+                        continue
+                    delta = chunk.get("message", {}).get("content", "")
+                    # One delta can complete several bullets: number them from the first
+                    completed = parser.feed(delta)
+                    first = len(parser.bullets) - len(completed) + 1
+                    for idx, bullet in enumerate(completed, start=first):
+                        yield sse_event("bullet", {"index": idx, "text": bullet})
+                    if chunk.get("done"):
+                        break
+    except httpx.HTTPError as e:
+        yield sse_event("error", {"detail": f"LLM request failed: {e}"})
+        return
+
+    if not parser.text.strip():
+        yield sse_event("error", {"detail": "Empty LLM response."})
+        return
+
+    emitted = len(parser.bullets)
+    bullets = parser.finish()
+    for idx, bullet in enumerate(bullets[emitted:], start=emitted + 1):
+        yield sse_event("bullet", {"index": idx, "text": bullet})
+
+    yield sse_event(
+        "done",
+        {"bullets": bullets, "sources": jsonable_encoder(sources)},
+    )
 
 
 def sanitize_filename(name: str) -> str:
@@ -318,6 +570,19 @@ def list_tools(_: None = Depends(check_auth)) -> ToolsResponse:
                 "required": ["query"],
             },
         ),
+        ToolInfo(
+            name="search_multi",
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string"},
+                    "k": {"type": "integer"},
+                    "variants": {"type": "integer"},
+                    "budget_seconds": {"type": "number"},
+                },
+                "required": ["query"],
+            },
+        ),
         ToolInfo(
             name="fetch_readable",
             input_schema={
@@ -328,6 +593,17 @@ def list_tools(_: None = Depends(check_auth)) -> ToolsResponse:
                 "required": ["url"],
             },
         ),
+        ToolInfo(
+            name="dedupe_docs",
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "docs": {"type": "array"},
+                    "kept": {"type": "array"},
+                },
+                "required": ["docs"],
+            },
+        ),
         ToolInfo(
             name="summarize_with_citations",
             input_schema={
@@ -362,8 +638,71 @@ def search_web(request: SearchRequest, _: None = Depends(check_auth)) -> SearchR
     """Search the web via Tavily and return normalized results."""
     if request.k <= 0:
         raise HTTPException(status_code=400, detail="k must be > 0")
-    results = call_tavily(request.query, request.k)
-    return SearchResponse(results=results)
+    return SearchResponse(results=cached_search(request.query, request.k))
+
+
+def cached_search(query: str, k: int) -> List[SearchResult]:
+    """Tavily search through the response cache."""
+    key = f"search:{k}:{normalize_query(query)}"
+    entry = cache.get(key)
+    if entry is not None and entry.is_fresh():
+        cache.record("search", "hit")
+        return SearchResponse(**entry.value).results
+
+    cache.record("search", "miss")
+    results = call_tavily(query, k)
+    cache.put(key, jsonable_encoder(SearchResponse(results=results)), ttl=CACHE_TTL_SEARCH)
+    return results
+
+
+@app.post(
+    "/tools/search_multi",
+    response_model=SearchMultiResponse,
+)
+def search_multi(
+    request: SearchMultiRequest,
+    _: None = Depends(check_auth),
+) -> SearchMultiResponse:
+    """
+    Search several variants of the query in parallel and fuse the rankings
+    (reciprocal rank fusion, deduplicated by canonical URL).
+    Variants still running when the budget ends are left out.
+    """
+    return fused_search(request)
+
+
+def fused_search(request: SearchMultiRequest) -> SearchMultiResponse:
+    """Service behind /tools/search_multi (also used by background jobs)."""
+    if request.k <= 0:
+        raise HTTPException(status_code=400, detail="k must be > 0")
+    if request.variants <= 0:
+        raise HTTPException(status_code=400, detail="variants must be > 0")
+
+    queries = expand_queries(request.query, request.variants)
+    futures = [search_pool.submit(cached_search, q, request.k) for q in queries]
+    done, _not_done = wait(futures, timeout=request.budget_seconds)
+
+    # Keep the variant order so the plain query wins ties
+    ranked_lists = []
+    errors = []
+    for future in futures:
+        if future not in done:
+            continue
+        try:
+            ranked_lists.append(future.result())
+        except HTTPException as e:
+            errors.append(e.detail)
+
+    if not ranked_lists:
+        detail = errors[0] if errors else "No search variant finished within the budget."
+        raise HTTPException(status_code=502 if errors else 504, detail=detail)
+
+    fused = reciprocal_rank_fusion(ranked_lists, key=lambda r: canonical_url(str(r.url)))
+    return SearchMultiResponse(
+        results=fused[: request.k],
+        queries=queries,
+        completed=len(ranked_lists),
+    )
 
 
 @app.post(
@@ -375,23 +714,80 @@ def fetch_readable(
     _: None = Depends(check_auth),
 ) -> FetchReadableResponse:
     """Fetch a web page and return a simplified readable text."""
+    return fetch_page(request)
+
+
+def fetch_page(request: FetchReadableRequest) -> FetchReadableResponse:
+    """Service behind /tools/fetch_readable: cached, revalidated, size-capped fetch."""
+    key = f"fetch:{canonical_url(str(request.url))}"
+    entry = cache.get(key)
+    if entry is not None and entry.is_fresh():
+        cache.record("fetch", "hit")
+        return FetchReadableResponse(**entry.value)
+
+    # Stale entry with validators: ask the origin whether it changed.
+    headers = {}
+    if entry is not None and entry.has_validators():
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
     try:
-        resp = requests.get(str(request.url), timeout=15)
+        resp = requests.get(str(request.url), headers=headers, timeout=15, stream=True)
     except requests.RequestException as e:
         raise HTTPException(status_code=502, detail=f"Fetch failed: {e}")
 
-    if resp.status_code != 200:
-        raise HTTPException(
-            status_code=502,
-            detail=f"Fetch error {resp.status_code}",
-        )
+    # Stream the body through the incremental parser with a byte cap,
+    # so large pages never sit in memory as one string.
+    with resp:
+        if resp.status_code == 304 and entry is not None:
+            cache.refresh(key, ttl=CACHE_TTL_FETCH)
+            cache.record("fetch", "revalidated")
+            return FetchReadableResponse(**entry.value)
+
+        if resp.status_code != 200:
+            raise HTTPException(
+                status_code=502,
+                detail=f"Fetch error {resp.status_code}",
+            )
 
-    html = resp.text
-    title = extract_title(html) or str(request.url)
-    text = strip_html(html)
+        cache.record("fetch", "miss")
+        try:
+            title, text, _truncated = extract_readable(
+                resp.iter_content(chunk_size=FETCH_CHUNK_SIZE),
+                encoding=resp.encoding,
+                max_bytes=FETCH_MAX_BYTES,
+                max_text_chars=FETCH_MAX_TEXT_CHARS,
+            )
+        except requests.RequestException as e:
+            raise HTTPException(status_code=502, detail=f"Fetch failed: {e}")
+
+    title = title or str(request.url)
     if not text:
         raise HTTPException(status_code=502, detail="No readable text extracted.")
-    return FetchReadableResponse(url=request.url, title=title, text=text)
+
+    response = FetchReadableResponse(url=request.url, title=title, text=text)
+    cache.put(
+        key,
+        jsonable_encoder(response),
+        ttl=CACHE_TTL_FETCH,
+        etag=resp.headers.get("ETag"),
+        last_modified=resp.headers.get("Last-Modified"),
+    )
+    return response
+
+
+@app.post(
+    "/tools/dedupe_docs",
+    response_model=DedupeResponse,
+)
+def dedupe_docs(
+    request: DedupeRequest,
+    _: None = Depends(check_auth),
+) -> DedupeResponse:
+    """Drop near-duplicate documents (earlier docs win) and report what was dropped."""
+    return dedupe(request.docs, request.kept)
 
 
 @app.post(
@@ -403,19 +799,49 @@ def summarize_with_citations(
     _: None = Depends(check_auth),
 ) -> SummarizeResponse:
     """Call LLM to create a 5-bullet briefing with inline citations."""
+    return summarize(request)
+
+
+def summarize(request: SummarizeRequest) -> SummarizeResponse:
+    """Service behind /tools/summarize_with_citations."""
     if not request.docs:
         raise HTTPException(status_code=400, detail="docs must not be empty")
 
-    llm_text = call_llm_summarize(request.topic, request.docs)
+    # Near-duplicates would only repeat tokens; sources are numbered after dropping them
+    docs = dedupe(request.docs).docs
+    llm_text = call_llm_summarize(request.topic, docs)
     bullets = parse_bullets(llm_text)
 
     sources = [
         SourceInfo(i=idx, title=doc.title, url=doc.url)
-        for idx, doc in enumerate(request.docs, start=1)
+        for idx, doc in enumerate(docs, start=1)
     ]
     return SummarizeResponse(bullets=bullets, sources=sources)
 
 
+@app.post("/tools/summarize_with_citations/stream")
+async def summarize_with_citations_stream(
+    request: SummarizeRequest,
+    _: None = Depends(check_auth),
+) -> StreamingResponse:
+    """Same as summarize_with_citations, streamed bullet by bullet over SSE."""
+    if not request.docs:
+        raise HTTPException(status_code=400, detail="docs must not be empty")
+
+    # MinHash and BM25 packing are CPU-bound: keep them off the event loop
+    docs = (await run_in_threadpool(dedupe, request.docs)).docs
+    prompt = await run_in_threadpool(build_summary_prompt, request.topic, docs)
+    sources = [
+        SourceInfo(i=idx, title=doc.title, url=doc.url)
+        for idx, doc in enumerate(docs, start=1)
+    ]
+    return StreamingResponse(
+        stream_summary_events(prompt, sources),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post(
     "/tools/save_markdown",
     response_model=SaveMarkdownResponse,
@@ -425,16 +851,132 @@ def save_markdown(
     _: None = Depends(check_auth),
 ) -> SaveMarkdownResponse:
     """Save Markdown content to disk and return the file path."""
+    return save_brief(request)
+
+
+def save_brief(request: SaveMarkdownRequest) -> SaveMarkdownResponse:
+    """Service behind /tools/save_markdown: one atomic write through the storage writer."""
     filename = sanitize_filename(request.filename)
-    path = os.path.join(OUTPUT_DIR, filename)
 
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(request.content)
-    except OSError as e:
+        result = storage.save(filename, request.content, topic=request.topic).result(
+            timeout=SAVE_TIMEOUT
+        )
+    except (OSError, FutureTimeoutError) as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
 
-    return SaveMarkdownResponse(path=os.path.abspath(path))
+    return SaveMarkdownResponse(path=result.path, sha256=result.sha256, written=result.written)
+
+
+@app.get("/stats", response_model=StatsResponse)
+def stats(_: None = Depends(check_auth)) -> StatsResponse:
+    """Report cache size and hit rates for search and fetch."""
+    return StatsResponse(cache=cache.stats())
+
+
+@app.get("/briefs", response_model=BriefIndexResponse)
+def list_briefs(
+    topic: Optional[str] = None,
+    day: Optional[str] = None,
+    _: None = Depends(check_auth),
+) -> BriefIndexResponse:
+    """List saved briefs, newest first; filter by topic substring and/or date (YYYY-MM-DD)."""
+    entries = storage.entries(topic=topic, day=day)
+    return BriefIndexResponse(briefs=[BriefIndexEntry(**vars(e)) for e in entries])
+
+
+# ### Background briefing jobs
+
+
+def run_brief_pipeline(topic: str) -> str:
+    """
+    Server-side version of brief.py: search, fetch up to 3 distinct domains
+    with distinct content (backfilling from later results), summarize, save.
+    Returns the saved path.
+    """
+    search = fused_search(SearchMultiRequest(query=topic, k=8))
+    candidates = distinct_domains(jsonable_encoder(search.results))
+    if not candidates:
+        raise RuntimeError("No search results.")
+
+    docs: List[Doc] = []
+    kept: List[DocSignature] = []
+    for item in candidates:
+        if len(docs) >= 3:
+            break
+        try:
+            page = fetch_page(FetchReadableRequest(url=item["url"]))
+        except HTTPException:
+            continue  # one unreachable page should not fail the whole brief
+        doc = Doc(title=page.title, url=page.url, text=page.text)
+        result = dedupe([doc], kept)
+        if result.docs:
+            docs.append(doc)
+            kept.extend(result.signatures)
+    if not docs:
+        raise RuntimeError("Could not fetch any of the picked pages.")
+
+    summary = summarize(SummarizeRequest(topic=topic, docs=docs))
+    content = build_markdown(topic, summary.bullets, jsonable_encoder(summary.sources))
+
+    # One file per topic and day, so a nightly batch does not overwrite itself
+    filename = brief_filename(topic)
+    saved = save_brief(SaveMarkdownRequest(filename=filename, content=content, topic=topic))
+    return saved.path
+
+
+job_queue = BriefJobQueue(JobStore(JOBS_DB_PATH), run_brief_pipeline, BRIEF_WORKERS)
+
+
+def job_response(job: Job, deduplicated: bool = False) -> BriefJobResponse:
+    """API view of a stored job (timestamps as datetimes)."""
+    return BriefJobResponse(
+        id=job.id,
+        topic=job.topic,
+        status=job.status,
+        created_at=datetime.fromtimestamp(job.created_at),
+        updated_at=datetime.fromtimestamp(job.updated_at),
+        path=job.path,
+        error=job.error,
+        deduplicated=deduplicated,
+    )
+
+
+@app.on_event("startup")
+def resume_jobs() -> None:
+    """Pick up jobs left queued or running by a previous process."""
+    job_queue.resume()
+
+
+@app.on_event("shutdown")
+def stop_jobs() -> None:
+    job_queue.shutdown()
+
+
+@app.post(
+    "/briefs",
+    response_model=BriefJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_brief(
+    request: BriefJobRequest,
+    _: None = Depends(check_auth),
+) -> BriefJobResponse:
+    """Queue a briefing; identical topics already in flight share one job."""
+    topic = request.topic.strip()
+    if not topic:
+        raise HTTPException(status_code=400, detail="topic must not be empty")
+    job, created = job_queue.submit(topic)
+    return job_response(job, deduplicated=not created)
+
+
+@app.get("/briefs/{job_id}", response_model=BriefJobResponse)
+def get_brief(job_id: str, _: None = Depends(check_auth)) -> BriefJobResponse:
+    """Return the status of a briefing job (and the saved path once done)."""
+    job = job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job_response(job)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,255 @@
+# storage.py
+"""
+### Briefing storage for save_markdown
+
+- writes are atomic (temp file in the same directory + os.replace)
+- content is hashed (SHA-256): saving the same bytes under the same filename
+  again is a no-op, and a brief identical to one saved under another name is
+  hard-linked to it instead of written again (the requested path is always
+  the one returned, and rewriting either file later never changes the other)
+- all writes go through one background writer thread, so two requests for
+  the same sanitized filename cannot race; pending writes to the same file
+  are coalesced and only the latest content is written
+- `index.json` in the output directory lists every brief with its topic,
+  date and hash, so briefs can be found without scanning the directory
+"""
+
+import hashlib
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+INDEX_FILENAME = "index.json"
+TOPIC_PREFIX = "# Briefing:"
+TOPIC_FILENAME_CHARS = 60
+
+
+@dataclass
+class IndexEntry:
+    """One saved brief."""
+    filename: str
+    path: str
+    topic: str
+    date: str
+    sha256: str
+    saved_at: str
+
+
+@dataclass
+class SaveResult:
+    path: str
+    sha256: str
+    written: bool  # False when identical content was already on disk (same file or linked)
+
+
+@dataclass
+class _PendingWrite:
+    content: str
+    topic: Optional[str]
+    futures: List[Future] = field(default_factory=list)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def topic_from_markdown(content: str) -> str:
+    """Read the topic from the '# Briefing: <topic>' heading, if present."""
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith(TOPIC_PREFIX):
+            return line[len(TOPIC_PREFIX):].strip()
+        if line:
+            break
+    return ""
+
+
+def brief_filename(topic: str, day: Optional[date] = None) -> str:
+    """
+    Filename for a topic's brief of the day: brief_<date>_<topic>_<hash>.md,
+    filesystem-safe. The topic is cut for readability; the short hash of the
+    full topic keeps topics sharing a prefix in separate files.
+    """
+    day = day or date.today()
+    topic = topic.strip()
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", topic)[:TOPIC_FILENAME_CHARS].strip("_.")
+    return f"brief_{day.isoformat()}_{slug or 'brief'}_{content_hash(topic)[:8]}.md"
+
+
+def atomic_link(source: str, path: str) -> bool:
+    """Hard-link `source` to `path` (replacing it atomically); False if links are not supported."""
+    directory = os.path.dirname(path) or "."
+    tmp_path = os.path.join(directory, f".tmp-link-{os.getpid()}-{threading.get_ident()}.part")
+    try:
+        os.link(source, tmp_path)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def atomic_write(path: str, content: str) -> None:
+    """Write to a temp file next to `path`, then rename over it."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class BriefStorage:
+    """Content-addressed, single-writer storage for Markdown briefs."""
+
+    def __init__(self, output_dir: str) -> None:
+        self.output_dir = output_dir
+        self.index_path = os.path.join(output_dir, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, _PendingWrite] = {}
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._entries: Dict[str, IndexEntry] = self._load_index()
+        self._by_hash: Dict[str, str] = {e.sha256: name for name, e in self._entries.items()}
+
+        self._writer = threading.Thread(target=self._writer_loop, name="brief-writer", daemon=True)
+        self._writer.start()
+
+    # ### Public API
+
+    def save(self, filename: str, content: str, topic: Optional[str] = None) -> "Future[SaveResult]":
+        """
+        Queue a write and return a Future with the result.
+        `filename` must already be sanitized.
+        """
+        future: "Future[SaveResult]" = Future()
+        with self._lock:
+            pending = self._pending.get(filename)
+            if pending is not None:
+                # Coalesce: the newest content wins, every caller gets the result
+                pending.content = content
+                pending.topic = topic
+                pending.futures.append(future)
+                return future
+            self._pending[filename] = _PendingWrite(content, topic, [future])
+        self._queue.put(filename)
+        return future
+
+    def entries(self, topic: Optional[str] = None, day: Optional[str] = None) -> List[IndexEntry]:
+        """Indexed briefs, newest first, optionally filtered by topic and date."""
+        with self._lock:
+            entries = list(self._entries.values())
+        if topic:
+            needle = topic.strip().lower()
+            entries = [e for e in entries if needle in e.topic.lower()]
+        if day:
+            entries = [e for e in entries if e.date == day]
+        return sorted(entries, key=lambda e: e.saved_at, reverse=True)
+
+    # ### Writer thread
+
+    def _writer_loop(self) -> None:
+        while True:
+            filename = self._queue.get()
+            with self._lock:
+                pending = self._pending.pop(filename, None)
+            if pending is None:
+                continue
+            try:
+                result = self._write(filename, pending.content, pending.topic)
+            except Exception as exc:  # noqa: BLE001
+                for future in pending.futures:
+                    future.set_exception(exc)
+            else:
+                for future in pending.futures:
+                    future.set_result(result)
+
+    def _write(self, filename: str, content: str, topic: Optional[str]) -> SaveResult:
+        digest = content_hash(content)
+        path = os.path.abspath(os.path.join(self.output_dir, filename))
+
+        # Same file, same bytes: nothing to do
+        current = self._entries.get(filename)
+        if current is not None and current.sha256 == digest and os.path.exists(path):
+            return SaveResult(path=path, sha256=digest, written=False)
+
+        # Same bytes under another name: link to that file rather than store a copy.
+        # Writes replace files (never modify them in place), so a later save to either
+        # name gives it a new inode and leaves the other one intact.
+        other = self._entries.get(self._by_hash.get(digest, ""))
+        written = not (
+            other is not None
+            and other.filename != filename
+            and os.path.exists(other.path)
+            and atomic_link(other.path, path)
+        )
+        if written:
+            atomic_write(path, content)
+
+        now = datetime.now()
+        entry = IndexEntry(
+            filename=filename,
+            path=path,
+            topic=topic or topic_from_markdown(content),
+            date=date.today().isoformat(),
+            sha256=digest,
+            saved_at=now.isoformat(timespec="seconds"),
+        )
+        with self._lock:
+            self._entries[filename] = entry
+            if current is not None and self._by_hash.get(current.sha256) == filename:
+                # This file no longer holds that content: point to another copy, if any
+                self._by_hash.pop(current.sha256)
+                for e in self._entries.values():
+                    if e.sha256 == current.sha256:
+                        self._by_hash[e.sha256] = e.filename
+                        break
+            self._by_hash.setdefault(digest, filename)
+            snapshot = [asdict(e) for e in self._entries.values()]
+        atomic_write(self.index_path, json.dumps({"briefs": snapshot}, indent=2, ensure_ascii=False))
+        return SaveResult(path=path, sha256=digest, written=written)
+
+    # ### Index loading
+
+    def _load_index(self) -> Dict[str, IndexEntry]:
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    data = json.load(f)
+                return {e["filename"]: IndexEntry(**e) for e in data.get("briefs", [])}
+            except (OSError, ValueError, TypeError, KeyError, AttributeError):
+                pass  # unreadable index: rebuild it from the files below
+        return self._scan_output_dir()
+
+    def _scan_output_dir(self) -> Dict[str, IndexEntry]:
+        """Index the .md files already in the output directory (first run or broken index)."""
+        entries: Dict[str, IndexEntry] = {}
+        for name in sorted(os.listdir(self.output_dir)):
+            if not name.endswith(".md"):
+                continue
+            path = os.path.abspath(os.path.join(self.output_dir, name))
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+            modified = datetime.fromtimestamp(os.path.getmtime(path))
+            entries[name] = IndexEntry(
+                filename=name,
+                path=path,
+                topic=topic_from_markdown(content),
+                date=modified.date().isoformat(),
+                sha256=content_hash(content),
+                saved_at=modified.isoformat(timespec="seconds"),
+            )
+        return entries
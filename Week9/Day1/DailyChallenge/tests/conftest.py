@@ -0,0 +1,18 @@
+# The briefing bot modules are flat scripts next to this folder: import them directly.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """server.py imported with its output directory and job database in a temp folder."""
+    data = tmp_path_factory.mktemp("server")
+    os.environ.setdefault("OUTPUT_DIR", str(data / "output"))
+    os.environ.setdefault("JOBS_DB_PATH", str(data / "jobs.sqlite3"))
+    import server as module
+
+    return module
@@ -0,0 +1,29 @@
+from briefing import build_markdown, distinct_domains
+
+
+def test_distinct_domains_keeps_first_result_per_domain():
+    results = [
+        {"url": "https://a.com/1"},
+        {"url": "https://b.com/1"},
+        {"url": "https://a.com/2"},
+    ]
+    assert [r["url"] for r in distinct_domains(results)] == ["https://a.com/1", "https://b.com/1"]
+
+
+def test_build_markdown_lists_bullets_and_numbered_sources():
+    content = build_markdown(
+        "AI chips",
+        ["First [1]", "Second [2]"],
+        [{"i": 1, "title": "A", "url": "https://a.com"}, {"i": 2, "title": "B", "url": "https://b.com"}],
+    )
+    assert content.splitlines() == [
+        "# Briefing: AI chips",
+        "",
+        "- First [1]",
+        "- Second [2]",
+        "",
+        "## Sources",
+        "",
+        "1. [A](https://a.com)",
+        "2. [B](https://b.com)",
+    ]
@@ -0,0 +1,70 @@
+from cache import CacheEntry, ResponseCache, canonical_url, normalize_query
+
+
+def test_normalize_query_collapses_case_and_spaces():
+    assert normalize_query("  AI   Chips\tNews ") == "ai chips news"
+
+
+def test_canonical_url_drops_tracking_fragment_and_default_port():
+    assert (
+        canonical_url("HTTPS://Example.COM:443/a?b=2&utm_source=x&a=1&fbclid=y#top")
+        == "https://example.com/a?a=1&b=2"
+    )
+    assert canonical_url("http://example.com:8080") == "http://example.com:8080/"
+
+
+def test_entry_freshness_and_validators():
+    entry = CacheEntry(value={}, expires_at=100.0)
+    assert entry.is_fresh(now=99.0)
+    assert not entry.is_fresh(now=100.0)
+    assert not entry.has_validators()
+    assert CacheEntry(value={}, expires_at=0, etag='"v1"').has_validators()
+
+
+def test_stale_entries_are_returned_for_revalidation():
+    cache = ResponseCache()
+    cache.put("k", {"v": 1}, ttl=-1, etag='"v1"')
+
+    entry = cache.get("k")
+    assert entry is not None and not entry.is_fresh()
+    assert cache.refresh("k", ttl=60).is_fresh()
+    assert cache.refresh("missing", ttl=60) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", {}, ttl=60)
+    cache.put("b", {}, ttl=60)
+    cache.get("a")
+    cache.put("c", {}, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_sqlite_backing_survives_restart_and_stays_bounded(tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    first = ResponseCache(max_entries=2, db_path=db)
+    for key in ("a", "b", "c"):
+        first.put(key, {"key": key}, ttl=60, last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+    second = ResponseCache(max_entries=2, db_path=db)
+    entry = second.get("c")
+    assert entry.value == {"key": "c"}
+    assert entry.last_modified == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert second.get("a") is None
+    rows = second._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    assert rows == 2
+
+
+def test_stats_count_revalidations_as_served():
+    cache = ResponseCache()
+    for event in ("hit", "revalidated", "miss", "miss"):
+        cache.record("fetch", event)
+    cache.put("k", {}, ttl=60)
+
+    stats = cache.stats()
+    assert stats["entries"] == 1 and not stats["persistent"]
+    assert stats["namespaces"]["fetch"] == {
+        "hit": 1, "miss": 2, "revalidated": 1, "hit_rate": 0.5,
+    }
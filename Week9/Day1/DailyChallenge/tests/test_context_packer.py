@@ -0,0 +1,72 @@
+from context_packer import MAX_SENTENCE_CHARS, estimate_tokens, pack_context, split_sentences, tokenize
+
+
+def doc(label, relevant, filler=20):
+    """Sentences mentioning `label`; the `relevant` ones also mention the topic."""
+    sentences = [f"{label} remark number {i} about gardening and weather." for i in range(filler)]
+    sentences[filler // 2:filler // 2] = [f"{label} reports quantum chips result {i}." for i in range(relevant)]
+    return " ".join(sentences)
+
+
+def packed_tokens(snippets):
+    return sum(estimate_tokens(s) for snippet in snippets for s in split_sentences(snippet))
+
+
+def test_split_sentences_cuts_long_runs():
+    assert split_sentences("One. Two!  Three?") == ["One.", "Two!", "Three?"]
+    pieces = split_sentences("word " * 300)
+    assert all(len(p) <= MAX_SENTENCE_CHARS for p in pieces)
+    assert " ".join(pieces) == ("word " * 300).strip()
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("The chips of the Future") == ["chips", "future"]
+
+
+def test_stays_within_the_token_budget():
+    texts = [doc("alpha", 5), doc("beta", 5), doc("gamma", 5)]
+    for budget in (10, 50, 200):
+        assert packed_tokens(pack_context("quantum chips", texts, budget)) <= budget
+
+
+def test_relevant_sentences_come_first_in_original_order():
+    snippet = pack_context("quantum chips", [doc("alpha", 3)], 40)[0]
+    assert snippet == (
+        "alpha reports quantum chips result 0. "
+        "alpha reports quantum chips result 1. "
+        "alpha reports quantum chips result 2."
+    )
+
+
+def test_budget_is_shared_fairly_across_documents():
+    # One long, very relevant document must not starve the others
+    texts = [doc("alpha", 40), doc("beta", 2), doc("gamma", 2)]
+    snippets = pack_context("quantum chips", texts, 60)
+
+    counts = [len(split_sentences(s)) for s in snippets]
+    assert all(c > 0 for c in counts)
+    assert max(counts) - min(counts) <= 1
+
+
+def test_short_documents_leave_room_for_others():
+    texts = ["Quantum chips.", doc("beta", 30)]
+    short, long = pack_context("quantum chips", texts, 100)
+    assert short == "Quantum chips."
+    assert packed_tokens([long]) > 80
+
+
+def test_positions_are_kept_for_citations():
+    texts = [doc("alpha", 2), "", doc("gamma", 2)]
+    snippets = pack_context("quantum chips", texts, 100)
+
+    assert len(snippets) == 3
+    assert snippets[0].startswith("alpha") and snippets[2].startswith("gamma")
+    assert snippets[1] == ""
+    assert pack_context("quantum chips", [], 100) == []
+
+
+def test_stopword_only_topic_and_documents_still_pack():
+    texts = ["The and of the. It is that.", "Plain text here. More text there."]
+    snippets = pack_context("the of and", texts, 100)
+    assert snippets == texts
+    assert pack_context("topic", texts, 0) == ["", ""]
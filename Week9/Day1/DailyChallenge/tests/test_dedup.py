@@ -0,0 +1,64 @@
+import random
+
+from dedup import NearDuplicateDetector, minhash_signature, shingles, similarity
+
+WORDS = "chip model data market energy policy launch network cloud robot".split()
+
+
+def article(seed, length=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(length))
+
+
+def test_shingles_short_and_empty_text():
+    assert shingles("") == set()
+    assert shingles("Only three words") == {"only three words"}
+    assert len(shingles("a b c d e f")) == 2
+
+
+def test_identical_texts_have_identical_signatures():
+    text = article(1)
+    assert minhash_signature(text) == minhash_signature(text)
+    assert similarity(minhash_signature(text), minhash_signature(text)) == 1.0
+
+
+def test_unrelated_texts_are_not_similar():
+    assert similarity(minhash_signature(article(1)), minhash_signature(article(2))) < 0.3
+
+
+def test_find_duplicates_keeps_earlier_document():
+    detector = NearDuplicateDetector(threshold=0.8)
+    base = article(1)
+    syndicated = base + " Originally published elsewhere."
+    signatures = [detector.signature(t) for t in (base, article(2), syndicated)]
+
+    kept, dropped = detector.find_duplicates(signatures)
+
+    assert kept == [0, 1]
+    assert [(i, j) for i, j, _ in dropped] == [(2, 0)]
+    assert dropped[0][2] >= 0.8
+
+
+def test_find_duplicates_accepts_lists_from_json():
+    detector = NearDuplicateDetector()
+    signature = detector.signature(article(1))
+    kept, dropped = detector.find_duplicates([list(signature), signature])
+    assert kept == [0]
+    assert [(i, j) for i, j, _ in dropped] == [(1, 0)]
+
+
+def test_signature_cache_is_keyed_by_content_not_url():
+    detector = NearDuplicateDetector()
+    first = detector.signature(article(1))
+    # Same length, different words: must not reuse the cached signature
+    other = article(1).replace("chip", "chap")
+    assert len(other) == len(article(1))
+    assert detector.signature(other) != first
+    assert detector.signature(article(1)) is first
+
+
+def test_signature_cache_is_bounded():
+    detector = NearDuplicateDetector(max_cached=2)
+    for seed in range(5):
+        detector.signature(article(seed))
+    assert len(detector._signatures) == 2
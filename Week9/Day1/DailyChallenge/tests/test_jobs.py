@@ -0,0 +1,103 @@
+import threading
+import time
+
+from jobs import DONE, FAILED, QUEUED, RUNNING, BriefJobQueue, JobStore, topic_key
+
+
+def wait_for(store, job_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job.status == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} is {store.get(job_id).status}, expected {status}")
+
+
+def test_topic_key_normalizes_case_and_spaces():
+    assert topic_key("  AI   Chips ") == "ai chips"
+
+
+def test_duplicate_topic_in_flight_shares_one_job(tmp_path):
+    release = threading.Event()
+    runs = []
+
+    def pipeline(topic):
+        runs.append(topic)
+        release.wait(5)
+        return f"/briefs/{topic}.md"
+
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    queue = BriefJobQueue(store, pipeline, max_workers=2)
+    try:
+        first, created = queue.submit("AI chips")
+        wait_for(store, first.id, RUNNING)
+        again, created_again = queue.submit("  ai   CHIPS ")
+        assert created and not created_again
+        assert again.id == first.id
+
+        release.set()
+        done = wait_for(store, first.id, DONE)
+        assert done.path == "/briefs/AI chips.md"
+        assert runs == ["AI chips"]
+
+        # Once finished, the same topic starts a new job
+        later, created_later = queue.submit("AI chips")
+        assert created_later and later.id != first.id
+        wait_for(store, later.id, DONE)
+    finally:
+        release.set()
+        queue.shutdown()
+
+
+def test_interrupted_jobs_are_requeued_after_restart(tmp_path):
+    db = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(db)
+    running, _ = store.create_or_get_in_flight("running topic")
+    store.update(running.id, RUNNING)
+    queued, _ = store.create_or_get_in_flight("queued topic")
+    finished, _ = store.create_or_get_in_flight("finished topic")
+    store.update(finished.id, DONE, path="/briefs/x.md")
+
+    # Simulated restart: a new store on the same file
+    restarted = JobStore(db)
+    jobs = restarted.requeue_interrupted()
+    assert [j.id for j in jobs] == [running.id, queued.id]
+    assert all(j.status == QUEUED for j in jobs)
+    assert restarted.get(finished.id).status == DONE
+
+    queue = BriefJobQueue(restarted, lambda topic: f"/briefs/{topic}.md")
+    try:
+        assert queue.resume() == 2
+        assert wait_for(restarted, running.id, DONE).path == "/briefs/running topic.md"
+        wait_for(restarted, queued.id, DONE)
+    finally:
+        queue.shutdown()
+
+
+class DetailError(Exception):
+    def __init__(self, detail):
+        super().__init__("generic")
+        self.detail = detail
+
+
+def test_failed_job_stores_its_error(tmp_path):
+    def pipeline(topic):
+        if topic == "detail":
+            raise DetailError("Fetch failed: timeout")
+        if topic == "long":
+            raise RuntimeError("x" * 1000)
+        raise ValueError()
+
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    queue = BriefJobQueue(store, pipeline)
+    try:
+        jobs = {topic: queue.submit(topic)[0] for topic in ("detail", "long", "empty")}
+        failed = {topic: wait_for(store, job.id, FAILED) for topic, job in jobs.items()}
+    finally:
+        queue.shutdown()
+
+    assert failed["detail"].error == "Fetch failed: timeout"
+    assert failed["long"].error == "x" * 500
+    assert failed["empty"].error == "ValueError"
+    assert all(job.path is None for job in failed.values())
@@ -0,0 +1,73 @@
+from readable import ReadableTextParser, extract_readable
+
+PAGE = (
+    "<html><head><title> Chip   news </title>"
+    "<style>body { color: red }</style>"
+    "<script>var hidden = '<p>not text</p>';</script></head>"
+    "<body><h1>Héllo</h1><p>first&nbsp;para</p><noscript>enable js</noscript>"
+    "<p>second   para</p></body></html>"
+)
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_title_is_captured_and_scripts_styles_are_skipped():
+    title, text, truncated = extract_readable([PAGE.encode("utf-8")])
+
+    assert title == "Chip news"
+    assert text == "Héllo first para second para"
+    assert not truncated
+
+
+def test_same_result_whatever_the_chunk_boundaries():
+    data = PAGE.encode("utf-8")
+    expected = extract_readable([data])
+    for size in (1, 2, 3, 7):
+        assert extract_readable(chunked(data, size)) == expected
+
+
+def test_multibyte_characters_split_across_chunks():
+    data = "<p>漢字 — café 🚀</p>".encode("utf-8")
+    # One byte per chunk splits every multi-byte character
+    _, text, _ = extract_readable(chunked(data, 1))
+    assert text == "漢字 — café 🚀"
+    assert "�" not in text
+
+
+def test_declared_encoding_and_unknown_encoding_fallback():
+    assert extract_readable(["<p>déjà</p>".encode("latin-1")], encoding="latin-1")[1] == "déjà"
+    assert extract_readable(["<p>ok</p>".encode()], encoding="no-such-codec")[1] == "ok"
+
+
+def test_byte_cap_truncates_without_a_broken_character():
+    data = ("<p>" + "é" * 100 + "</p>").encode("utf-8")
+    # 3 bytes of markup + 10 bytes of text, cut in the middle of a 2-byte character
+    title, text, truncated = extract_readable(chunked(data, 4), max_bytes=14)
+
+    assert truncated
+    assert text == "é" * 5
+    assert title == ""
+
+
+def test_text_cap_stops_reading_early():
+    consumed = []
+
+    def chunks():
+        for i in range(1000):
+            consumed.append(i)
+            yield f"<p>word{i} </p>".encode()
+
+    _, text, truncated = extract_readable(chunks(), max_text_chars=50)
+    assert truncated
+    # The cap counts raw text (block spaces included) before whitespace is collapsed
+    assert 0 < len(text) <= 50 and text.startswith("word0 word1")
+    assert len(consumed) < 20
+
+
+def test_parser_can_be_fed_directly():
+    parser = ReadableTextParser()
+    parser.feed("<title>T</title><div>a</div><div>b</div>")
+    parser.close()
+    assert (parser.title, parser.text) == ("T", "a b")
@@ -0,0 +1,31 @@
+from search_fusion import QUERY_TEMPLATES, expand_queries, reciprocal_rank_fusion
+
+
+def test_expand_queries_starts_with_the_topic():
+    assert expand_queries("  AI   chips ", 3) == ["AI chips", "AI chips latest news", "AI chips explained"]
+
+
+def test_expand_queries_bounds_variants():
+    assert expand_queries("AI", 0) == ["AI"]
+    assert len(expand_queries("AI", 100)) == len(QUERY_TEMPLATES)
+
+
+def test_rrf_rewards_items_found_by_several_lists():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"], ["c"]], key=str)
+    assert fused[0] == "c"
+    assert sorted(fused) == ["a", "b", "c", "d"]
+
+
+def test_rrf_keeps_first_occurrence_and_counts_a_key_once_per_list():
+    first = {"url": "https://a.com/x?utm_source=1", "rank": "first"}
+    later = {"url": "https://a.com/x", "rank": "later"}
+    canonical = lambda r: r["url"].split("?")[0]  # noqa: E731
+
+    fused = reciprocal_rank_fusion([[first, later], [later]], key=canonical)
+
+    assert fused == [first]
+
+
+def test_rrf_ties_keep_first_seen_order():
+    assert reciprocal_rank_fusion([["a"], ["b"]], key=str) == ["a", "b"]
+    assert reciprocal_rank_fusion([], key=str) == []
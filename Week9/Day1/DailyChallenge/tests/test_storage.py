@@ -0,0 +1,100 @@
+import json
+import os
+from datetime import date
+
+from storage import BriefStorage, brief_filename, topic_from_markdown
+
+
+def save(storage, filename, content, topic=None):
+    return storage.save(filename, content, topic=topic).result(timeout=5)
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_save_writes_file_and_index(tmp_path):
+    storage = BriefStorage(str(tmp_path))
+    result = save(storage, "a.md", "# Briefing: AI chips\n\nbody")
+
+    assert result.written
+    assert read(result.path) == "# Briefing: AI chips\n\nbody"
+    index = json.loads((tmp_path / "index.json").read_text(encoding="utf-8"))
+    assert [e["filename"] for e in index["briefs"]] == ["a.md"]
+    assert index["briefs"][0]["topic"] == "AI chips"
+
+
+def test_same_file_same_content_is_not_rewritten(tmp_path):
+    storage = BriefStorage(str(tmp_path))
+    first = save(storage, "a.md", "X")
+    second = save(storage, "a.md", "X")
+
+    assert first.written and not second.written
+    assert second.path == first.path
+
+
+def test_same_content_under_another_name_is_linked_not_copied(tmp_path):
+    storage = BriefStorage(str(tmp_path))
+    a = save(storage, "a.md", "X")
+    b = save(storage, "b.md", "X")
+
+    assert not b.written
+    assert b.path == str(tmp_path / "b.md")
+    assert read(b.path) == "X"
+    assert os.path.samefile(a.path, b.path)
+    assert sorted(e.filename for e in storage.entries()) == ["a.md", "b.md"]
+
+    # Changing a.md must not lose the content saved as b.md
+    save(storage, "a.md", "Y")
+    assert read(a.path) == "Y"
+    assert read(b.path) == "X"
+
+    # b.md now holds the only copy of "X": a third name links to it
+    c = save(storage, "c.md", "X")
+    assert not c.written and os.path.samefile(b.path, c.path)
+
+
+def test_link_is_skipped_when_the_other_file_is_gone(tmp_path):
+    storage = BriefStorage(str(tmp_path))
+    a = save(storage, "a.md", "X")
+    os.remove(a.path)
+
+    b = save(storage, "b.md", "X")
+    assert b.written and read(b.path) == "X"
+
+
+def test_brief_filename_is_safe_and_per_topic():
+    day = date(2025, 11, 25)
+    name = brief_filename("AI chips / Europe?", day)
+    assert name.startswith("brief_2025-11-25_AI_chips_Europe_") and name.endswith(".md")
+    assert brief_filename("  AI chips / Europe? ", day) == name
+    assert brief_filename("   ", day).startswith("brief_2025-11-25_brief_")
+    assert len(brief_filename("x" * 500, day)) < 100
+
+    # Topics sharing a long prefix do not overwrite each other
+    prefix = "artificial intelligence regulation in the european union and " * 2
+    assert brief_filename(prefix + "France", day) != brief_filename(prefix + "Germany", day)
+
+
+def test_corrupt_index_is_rebuilt_from_files(tmp_path):
+    (tmp_path / "old.md").write_text("# Briefing: rust\n", encoding="utf-8")
+    (tmp_path / "index.json").write_text("{not json", encoding="utf-8")
+
+    storage = BriefStorage(str(tmp_path))
+
+    entries = storage.entries()
+    assert [e.filename for e in entries] == ["old.md"]
+    assert entries[0].topic == "rust"
+
+
+def test_index_survives_restart(tmp_path):
+    save(BriefStorage(str(tmp_path)), "a.md", "# Briefing: kept\n")
+    reloaded = BriefStorage(str(tmp_path))
+    assert [e.topic for e in reloaded.entries(topic="KEP")] == ["kept"]
+    assert os.path.exists(reloaded.entries()[0].path)
+
+
+def test_topic_from_markdown_only_reads_first_heading():
+    assert topic_from_markdown("\n# Briefing: x\n") == "x"
+    assert topic_from_markdown("intro\n# Briefing: x\n") == ""
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import random
+
+import httpx
+
+AsyncClient = httpx.AsyncClient  # before any test patches it
+
+LLM_TEXT = (
+    "Here is the briefing:\n"
+    "- First point about chips [1]\n"
+    "- Second point, with a longer sentence that goes on [2]\n"
+    "  - Third point indented [1][3]\n"
+    "not a bullet\n"
+    "- Fourth point [2]\n"
+    "- Fifth point [3]\n"
+    "- Sixth point is dropped [1]"
+)
+
+
+def fragments(text, seed):
+    """Split text at random places, including inside '- ' markers and words."""
+    rng = random.Random(seed)
+    cuts = sorted(rng.sample(range(1, len(text)), min(25, len(text) - 1)))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+def test_bullets_split_mid_line_are_emitted_once(server):
+    expected = server.parse_bullets(LLM_TEXT)
+    for seed in range(20):
+        parser = server.BulletStreamParser()
+        emitted = [b for part in fragments(LLM_TEXT, seed) for b in parser.feed(part)]
+
+        assert emitted == expected[:len(emitted)]
+        assert parser.finish() == expected
+        assert parser.text == LLM_TEXT
+
+
+def test_parse_bullets_pads_and_falls_back(server):
+    assert server.parse_bullets("- only one") == ["only one"] + [server.MISSING_BULLET] * 4
+    assert server.parse_bullets("no bullets at all")[0] == "no bullets at all"
+    assert server.parse_bullets("- " + "x" * 300)[0].endswith("...")
+
+
+def ollama_stream(parts):
+    lines = [json.dumps({"message": {"content": p}, "done": False}) for p in parts]
+    lines.append(json.dumps({"message": {"content": ""}, "done": True}))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def run_stream(server, monkeypatch, handler):
+    monkeypatch.setattr(
+        server.httpx, "AsyncClient",
+        lambda **kwargs: AsyncClient(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    sources = [server.SourceInfo(i=1, title="A", url="https://a.com")]
+
+    async def collect():
+        return [e async for e in server.stream_summary_events("prompt", sources)]
+
+    events = []
+    for raw in asyncio.run(collect()):
+        head, data = raw.strip().split("\n")
+        events.append((head[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_sse_emits_each_bullet_once_then_done(server, monkeypatch):
+    parts = fragments(LLM_TEXT, seed=7)
+    events = run_stream(
+        server, monkeypatch, lambda request: httpx.Response(200, content=ollama_stream(parts))
+    )
+
+    bullets = [data for name, data in events if name == "bullet"]
+    assert [b["index"] for b in bullets] == [1, 2, 3, 4, 5]
+    assert [b["text"] for b in bullets] == server.parse_bullets(LLM_TEXT)
+    assert events[-1] == (
+        "done",
+        {"bullets": server.parse_bullets(LLM_TEXT), "sources": [{"i": 1, "title": "A", "url": "https://a.com/"}]},
+    )
+
+
+def test_sse_pads_missing_bullets_at_the_end(server, monkeypatch):
+    text = "- one [1]\n- two [1]"
+    events = run_stream(
+        server, monkeypatch, lambda request: httpx.Response(200, content=ollama_stream(fragments(text, 1)))
+    )
+    bullets = [data for name, data in events if name == "bullet"]
+    assert [b["index"] for b in bullets] == [1, 2, 3, 4, 5]
+    assert [b["text"] for b in bullets[2:]] == [server.MISSING_BULLET] * 3
+
+
+def test_sse_reports_llm_errors(server, monkeypatch):
+    events = run_stream(server, monkeypatch, lambda request: httpx.Response(500, text="boom"))
+    assert events == [("error", {"detail": "LLM error 500: boom"})]
+
+    events = run_stream(
+        server, monkeypatch, lambda request: httpx.Response(200, content=ollama_stream([""]))
+    )
+    assert events == [("error", {"detail": "Empty LLM response."})]
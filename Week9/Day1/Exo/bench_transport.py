@@ -0,0 +1,132 @@
+"""
+Microbenchmark of the stdio transports in llm_client.py.
+
+Usage:
+  python bench_transport.py
+  python bench_transport.py --requests 1000 --concurrency 1 8 32 --out bench_transport.json
+
+For each transport (the current connect_to_server and the previous
+thread-hop connect_to_server_threaded) the script starts mcp_server.py with
+the fixture provider, then measures JSON-RPC round trips:
+- ping and tools/list latency (p50/p95/p99) one request at a time
+- messages/sec with several pings in flight at once
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import time
+from pathlib import Path
+
+import anyio
+
+from llm_client import ROOT, connect_to_server, connect_to_server_threaded
+
+TRANSPORTS = {
+    "async": connect_to_server,
+    "threaded": connect_to_server_threaded,
+}
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_stats(latencies: list[float]) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def sequential(call, total: int) -> dict:
+    latencies = []
+    for _ in range(total):
+        start = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - start)
+    return latency_stats(latencies)
+
+
+async def concurrent(call, total: int, concurrency: int) -> dict:
+    """`total` calls with at most `concurrency` in flight; returns messages/sec."""
+    limiter = anyio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with limiter:
+            await call()
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        for _ in range(total):
+            tg.start_soon(one)
+    wall = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "messages_per_sec": round(total / wall, 1) if wall else 0.0,
+    }
+
+
+async def bench_transport(name: str, server_path: Path, total: int, levels: list[int]) -> dict:
+    async with TRANSPORTS[name](server_path) as session:
+        for _ in range(20):  # warm up
+            await session.send_ping()
+
+        result = {
+            "ping": await sequential(session.send_ping, total),
+            "list_tools": await sequential(session.list_tools, max(1, total // 5)),
+            "ping_concurrent": [],
+        }
+        for concurrency in levels:
+            result["ping_concurrent"].append(await concurrent(session.send_ping, total, concurrency))
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the MCP stdio transports.")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), action="append")
+    parser.add_argument("--server-path", type=Path, default=ROOT / "mcp_server.py")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    # No network: the server answers from the bundled fixture.
+    os.environ.setdefault("STOCK_PROVIDER", "fixture")
+    os.environ.setdefault("STOCK_FIXTURE_PATH", str(ROOT / "fixtures" / "quotes.json"))
+
+    results = {}
+    for name in args.transport or list(TRANSPORTS):
+        results[name] = await bench_transport(name, args.server_path, args.requests, args.concurrency)
+        r = results[name]
+        print(
+            f"{name:9s} ping p50={r['ping']['p50_ms']:.3f}ms p95={r['ping']['p95_ms']:.3f}ms  "
+            f"list_tools p50={r['list_tools']['p50_ms']:.3f}ms"
+        )
+        for level in r["ping_concurrent"]:
+            print(f"{'':9s} c={level['concurrency']:<4d} {level['messages_per_sec']:>10.1f} msg/s")
+
+    if args.out:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {"requests": args.requests, "concurrency": args.concurrency},
+            "results": results,
+        }
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(args.out)
+
+
+if __name__ == "__main__":
+    anyio.run(main)
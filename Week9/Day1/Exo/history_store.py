@@ -0,0 +1,275 @@
+"""
+Local daily-history store for get_stock_history.
+
+Each symbol is kept as one NumPy structured array on disk (SYMBOL.npy) with
+a small JSON sidecar (SYMBOL.json) recording which date range has already
+been fetched. Reads memory-map the file and slice the requested window with
+a binary search, so only the rows that are needed are touched.
+
+Only missing ranges are fetched from the provider:
+- nothing stored yet          -> fetch the requested window
+- window starts earlier       -> fetch the older gap only
+- store ends before today     -> fetch the newer gap only (at most once per
+                                 STOCK_HISTORY_REFRESH seconds, default 900)
+
+The aggregate helpers (summary, OHLC resampling, returns, rolling stats)
+work on the sliced arrays so the tool can answer with a few lines instead
+of the whole CSV.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from quotes import HISTORY_COLUMNS, QuoteProvider, normalize_symbol
+
+HISTORY_DTYPE = np.dtype(
+    [
+        ("date", "datetime64[D]"),
+        ("open", "f8"),
+        ("high", "f8"),
+        ("low", "f8"),
+        ("close", "f8"),
+        ("volume", "f8"),
+    ]
+)
+
+TRADING_DAYS_PER_YEAR = 252
+
+# yfinance periods. "1d" and "5d" count trading days: a wider calendar window is
+# read (weekends, holidays) and trimmed to the last rows by last_trading_days().
+TRADING_DAY_PERIODS = {
+    "1d": 1,
+    "5d": 5,
+}
+
+PERIOD_DAYS = {
+    "1mo": 31,
+    "3mo": 92,
+    "6mo": 183,
+    "1y": 366,
+    "2y": 731,
+    "5y": 1827,
+    "10y": 3653,
+}
+
+
+def period_start(period: str, today: date) -> date:
+    """First calendar day covered by a yfinance-style period string."""
+    period = period.strip().lower()
+    if period == "ytd":
+        return date(today.year, 1, 1)
+    if period == "max":
+        return date(1970, 1, 1)
+    if period in TRADING_DAY_PERIODS:
+        return today - timedelta(days=TRADING_DAY_PERIODS[period] * 7 // 5 + 7)
+    if period not in PERIOD_DAYS:
+        names = [*TRADING_DAY_PERIODS, *PERIOD_DAYS, "ytd", "max"]
+        raise ValueError(f"Unsupported period '{period}'. Use one of: {', '.join(names)}.")
+    return today - timedelta(days=PERIOD_DAYS[period])
+
+
+def last_trading_days(period: str) -> int | None:
+    """Rows to keep for trading-day periods ('1d' -> 1, '5d' -> 5), else None."""
+    return TRADING_DAY_PERIODS.get(period.strip().lower())
+
+
+def frame_to_records(frame) -> np.ndarray:
+    """Convert a provider DataFrame (HISTORY_COLUMNS) to HISTORY_DTYPE rows."""
+    if frame is None or frame.empty:
+        return np.empty(0, dtype=HISTORY_DTYPE)
+    records = np.empty(len(frame), dtype=HISTORY_DTYPE)
+    records["date"] = frame.index.values.astype("datetime64[D]")
+    for column in HISTORY_COLUMNS:
+        records[column.lower()] = frame[column].to_numpy(dtype="f8")
+    return records
+
+
+class HistoryStore:
+    """On-disk, incrementally refreshed daily bars per symbol."""
+
+    def __init__(self, root: str | Path, provider: QuoteProvider, refresh_seconds: float = 900.0) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.provider = provider
+        self.refresh_seconds = refresh_seconds
+        # One lock per symbol: a slow download never blocks the other symbols
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ### Public API
+
+    def window(self, symbol: str, start: date, end: date | None = None) -> np.ndarray:
+        """Rows with start <= date <= end (end defaults to today), fetching gaps first."""
+        symbol = normalize_symbol(symbol)
+        end = end or date.today()
+        with self._symbol_lock(symbol):
+            self._ensure(symbol, start)
+            data = self._load(symbol)
+        if data is None or len(data) == 0:
+            return np.empty(0, dtype=HISTORY_DTYPE)
+        lo = np.searchsorted(data["date"], np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(data["date"], np.datetime64(end, "D"), side="right")
+        return np.array(data[lo:hi])  # copy the slice out of the memory map
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    # ### Storage
+
+    def _paths(self, symbol: str) -> tuple[Path, Path]:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol)
+        return self.root / f"{safe}.npy", self.root / f"{safe}.json"
+
+    def _load(self, symbol: str, mmap: bool = True) -> np.ndarray | None:
+        data_path, _ = self._paths(symbol)
+        if not data_path.exists():
+            return None
+        return np.load(data_path, mmap_mode="r" if mmap else None)
+
+    def _meta(self, symbol: str) -> dict:
+        _, meta_path = self._paths(symbol)
+        if not meta_path.exists():
+            return {}
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+
+    def _write(self, symbol: str, data: np.ndarray, meta: dict) -> None:
+        data_path, meta_path = self._paths(symbol)
+        for path, writer in (
+            (data_path, lambda f: np.save(f, data)),
+            (meta_path, lambda f: f.write(json.dumps(meta).encode("utf-8"))),
+        ):
+            fd, tmp = tempfile.mkstemp(dir=str(self.root), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                writer(f)
+            os.replace(tmp, path)
+
+    # ### Incremental refresh
+
+    def _ensure(self, symbol: str, start: date) -> None:
+        today = date.today()
+        meta = self._meta(symbol)
+        covered_from = date.fromisoformat(meta["covered_from"]) if meta else None
+        refreshed_at = float(meta.get("refreshed_at", 0)) if meta else 0.0
+
+        gaps: list[tuple[date, date]] = []
+        if covered_from is None:
+            gaps.append((start, today + timedelta(days=1)))
+        else:
+            if start < covered_from:
+                gaps.append((start, covered_from))
+            if time.time() - refreshed_at >= self.refresh_seconds:
+                # Re-fetch from the last stored day: its bar may have been partial.
+                covered_to = date.fromisoformat(meta["covered_to"])
+                gaps.append((covered_to, today + timedelta(days=1)))
+
+        if not gaps:
+            return
+
+        # Read fully (not mapped) since the file is about to be replaced
+        existing = self._load(symbol, mmap=False)
+        parts = [existing] if existing is not None else []
+        for gap_start, gap_end in gaps:
+            if gap_start < gap_end:
+                parts.append(frame_to_records(self.provider.fetch_history(symbol, gap_start, gap_end)))
+
+        merged = np.concatenate(parts) if parts else np.empty(0, dtype=HISTORY_DTYPE)
+        # Newest fetch wins for a repeated day: keep the last occurrence of each date.
+        reversed_dates = merged["date"][::-1]
+        _, last_idx = np.unique(reversed_dates, return_index=True)
+        merged = merged[len(merged) - 1 - last_idx]  # np.unique sorts by date
+
+        new_from = min(start, covered_from) if covered_from else start
+        self._write(
+            symbol,
+            merged,
+            {
+                "covered_from": new_from.isoformat(),
+                "covered_to": today.isoformat(),
+                "refreshed_at": time.time(),
+            },
+        )
+
+
+# ### Vectorized aggregates
+
+
+def summary(rows: np.ndarray) -> dict:
+    """Headline numbers for a window of daily bars."""
+    close = rows["close"]
+    log_returns = np.diff(np.log(close))
+    return {
+        "start": str(rows["date"][0]),
+        "end": str(rows["date"][-1]),
+        "days": int(len(rows)),
+        "first_close": round(float(close[0]), 4),
+        "last_close": round(float(close[-1]), 4),
+        "change_pct": round(float((close[-1] / close[0] - 1) * 100), 2),
+        "high": round(float(rows["high"].max()), 4),
+        "low": round(float(rows["low"].min()), 4),
+        "avg_volume": round(float(rows["volume"].mean()), 0),
+        "annualized_volatility_pct": (
+            round(float(log_returns.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100), 2)
+            if len(log_returns) > 1
+            else None
+        ),
+    }
+
+
+def _period_keys(dates: np.ndarray, interval: str) -> np.ndarray:
+    """Bucket id per row: calendar week ('W'), month ('M') or day ('D')."""
+    if interval == "D":
+        return dates.astype("datetime64[D]").astype("int64")
+    if interval == "W":
+        # datetime64[W] weeks start on Thursday (1970-01-01); shift to Monday-based weeks
+        return (dates.astype("datetime64[D]") + np.timedelta64(3, "D")).astype("datetime64[W]").astype("int64")
+    if interval == "M":
+        return dates.astype("datetime64[M]").astype("int64")
+    raise ValueError("interval must be 'D', 'W' or 'M'.")
+
+
+def resample_ohlc(rows: np.ndarray, interval: str = "W") -> np.ndarray:
+    """OHLC + volume per bucket, using reduceat over bucket boundaries."""
+    keys = _period_keys(rows["date"], interval)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(rows)] - 1
+    out = np.empty(len(starts), dtype=HISTORY_DTYPE)
+    out["date"] = rows["date"][ends]  # label each bucket with its last trading day
+    out["open"] = rows["open"][starts]
+    out["high"] = np.maximum.reduceat(rows["high"], starts)
+    out["low"] = np.minimum.reduceat(rows["low"], starts)
+    out["close"] = rows["close"][ends]
+    out["volume"] = np.add.reduceat(rows["volume"], starts)
+    return out
+
+
+def period_returns(rows: np.ndarray, interval: str = "W") -> tuple[np.ndarray, np.ndarray]:
+    """(bucket end dates, simple returns in %) of closes per bucket."""
+    bars = resample_ohlc(rows, interval)
+    closes = bars["close"]
+    return bars["date"][1:], (closes[1:] / closes[:-1] - 1) * 100
+
+
+def rolling_stats(rows: np.ndarray, window: int = 20) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(dates, rolling mean, rolling std) of closes over `window` rows."""
+    if window < 2:
+        raise ValueError("window must be at least 2 trading days (a standard deviation needs 2 points).")
+    close = rows["close"]
+    if len(close) < window:
+        return rows["date"][:0], close[:0], close[:0]
+    csum = np.cumsum(np.r_[0.0, close])
+    csum2 = np.cumsum(np.r_[0.0, close * close])
+    total = csum[window:] - csum[:-window]
+    total2 = csum2[window:] - csum2[:-window]
+    mean = total / window
+    var = np.maximum(total2 / window - mean * mean, 0.0) * window / max(window - 1, 1)
+    return rows["date"][window - 1:], mean, np.sqrt(var)
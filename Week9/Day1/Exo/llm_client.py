@@ -6,16 +6,28 @@ Usage:
 Optional flags:
   --model gemini-1.5-flash
   --server-path path/to/mcp_server.py
+  --max-steps 6         tool-call rounds per question (GEMINI_MAX_TOOL_STEPS)
+  --time-budget 60      seconds of tool use per question (GEMINI_TOOL_TIME_BUDGET)
+  --tool-cache FILE     converted tool declarations (GEMINI_TOOL_CACHE, default .cache/gemini_tools.json)
+  --log-level INFO      log per-step timings to stderr
+Tool results are reused for GEMINI_TOOL_RESULT_TTL seconds (default 60), except
+for the live-quote tools listed in GEMINI_TOOL_CACHE_SKIP.
 Type 'exit' or Ctrl+C to quit.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import logging
 import os
 import sys
+import tempfile
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
+from collections.abc import Iterable, Mapping
 from typing import Any
 
 import anyio
@@ -27,6 +39,27 @@ import subprocess
 
 ROOT = Path(__file__).resolve().parent
 
+# stdio transport: queued messages per direction, and messages per pipe write.
+STREAM_BUFFER_SIZE = 32
+MAX_WRITE_BATCH = 64
+
+# Tool loop limits per user question.
+MAX_TOOL_STEPS = int(os.environ.get("GEMINI_MAX_TOOL_STEPS", "6"))
+TOOL_TIME_BUDGET = float(os.environ.get("GEMINI_TOOL_TIME_BUDGET", "60"))
+
+# Tool result reuse within a chat: seconds a result stays valid (the server's
+# quote cache uses 60 too), and tools never reused because they read live quotes.
+TOOL_RESULT_TTL = float(os.environ.get("GEMINI_TOOL_RESULT_TTL", "60"))
+LIVE_TOOLS = frozenset(
+    name.strip()
+    for name in os.environ.get(
+        "GEMINI_TOOL_CACHE_SKIP", "get_stock_price,get_stock_prices,compare_stocks"
+    ).split(",")
+    if name.strip()
+)
+
+logger = logging.getLogger("llm_client")
+
 # JSON Schema keys that Gemini's Schema proto does not support.
 UNSUPPORTED_SCHEMA_KEYS = {
     "title",
@@ -77,6 +110,119 @@ def _as_gemini_tools(tools: list[Any]) -> list[dict[str, Any]]:
     return [{"function_declarations": declarations}]
 
 
+def catalog_key(server_info: Any, tools: list[Any]) -> str:
+    """
+    Cache key of a converted tool list: server name and version, each tool's
+    name and argument names, and the conversion rules. Cheap on purpose (no
+    schema is serialized): hashing the full list_tools output costs more than
+    converting it. A changed argument type under the same names is only picked
+    up after notifications/tools/list_changed or with a new cache file.
+    """
+    signature = []
+    for tool in tools:
+        schema = tool.inputSchema or {}
+        signature.append(
+            [tool.name, sorted(schema.get("properties") or {}), sorted(schema.get("required") or [])]
+        )
+    payload = {
+        "server": [getattr(server_info, "name", None), getattr(server_info, "version", None)],
+        "unsupported": sorted(UNSUPPORTED_SCHEMA_KEYS),
+        "tools": signature,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+class GeminiToolCatalog:
+    """
+    Gemini declarations for the server's tools.
+
+    The server is asked for its tools only on the first refresh and after it
+    sends notifications/tools/list_changed. On the first refresh of a
+    connection, declarations saved under catalog_key (in memory and, when
+    `path` is set, in a JSON file) are reused, so a reconnect or a restarted
+    client skips the schema walk. After a notification the schemas may have
+    changed under the same names, so they are always converted again.
+    """
+
+    def __init__(self, path: str | Path | None = None, max_entries: int = 16) -> None:
+        self.path = Path(path) if path else None
+        self.max_entries = max(1, max_entries)
+        self.key: str | None = None
+        self.tool_names: list[str] = []
+        self._stale = True
+        self._declarations: dict[str, list[dict[str, Any]]] = self._load()
+
+    async def message_handler(self, message) -> None:
+        """ClientSession message_handler: mark the tool list stale on list_changed."""
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            self._stale = True
+        await anyio.lowlevel.checkpoint()
+
+    async def refresh(self, session: ClientSession) -> list[dict[str, Any]] | None:
+        """Declarations if the server announced a tool list change since the last refresh, else None."""
+        if not self._stale:
+            return None
+        self._stale = False  # a notification during the listing marks it stale again
+
+        tools: list[Any] = []
+        cursor = None
+        while True:
+            page = await session.list_tools(cursor)
+            tools.extend(page.tools)
+            cursor = page.nextCursor
+            if not cursor:
+                break
+
+        self.tool_names = [tool.name for tool in tools]
+        first_listing = self.key is None
+        self.key = catalog_key(getattr(session, "server_info", None), tools)
+
+        declarations = self._declarations.get(self.key) if first_listing else None
+        if declarations is None:
+            declarations = _as_gemini_tools(tools)
+            self._declarations.pop(self.key, None)
+            self._declarations[self.key] = declarations
+            while len(self._declarations) > self.max_entries:
+                self._declarations.pop(next(iter(self._declarations)))
+            self._save()
+        return declarations
+
+    # ### Persistence
+
+    def _load(self) -> dict[str, list[dict[str, Any]]]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}  # a broken cache file is just a cold cache
+        return data if isinstance(data, dict) else {}
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._declarations, f)
+        os.replace(tmp, self.path)
+
+
+def _to_plain(value: Any) -> Any:
+    """Turn Gemini proto maps/lists (e.g. function_call.args) into plain JSON types."""
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, Mapping):
+        return {k: _to_plain(v) for k, v in value.items()}
+    if isinstance(value, Iterable):
+        return [_to_plain(v) for v in value]
+    return value
+
+
 def _format_tool_result(result) -> str:
     """Flatten CallToolResult content into text."""
     parts: list[str] = []
@@ -100,9 +246,7 @@ def _format_tool_result(result) -> str:
     return "\n".join(parts)
 
 
-@asynccontextmanager
-async def connect_to_server(server_path: Path):
-    """Spawn the MCP server over stdio (blocking pipes) and yield a ready session."""
+def _server_env() -> dict[str, str]:
     env = os.environ.copy()
     env.update(
         {
@@ -111,6 +255,108 @@ async def connect_to_server(server_path: Path):
             "FASTMCP_LOG_LEVEL": "DEBUG",
         }
     )
+    return env
+
+
+@asynccontextmanager
+async def connect_to_server(server_path: Path, message_handler=None):
+    """
+    Spawn the MCP server over stdio and yield a ready session.
+
+    The pipes are read and written on the event loop (anyio.open_process), not
+    in worker threads. stdout is read in large chunks and split into
+    newline-delimited JSON-RPC messages. Outgoing messages that are already
+    queued are joined into a single pipe write. Both memory streams are
+    bounded but buffered, so a burst of concurrent requests does not
+    serialize on the hand-off.
+    """
+    process = await anyio.open_process(
+        [sys.executable, str(server_path)],
+        cwd=str(server_path.parent),
+        env=_server_env(),
+        stderr=sys.stderr,
+    )
+
+    server_to_client_send, server_to_client_recv = anyio.create_memory_object_stream(STREAM_BUFFER_SIZE)
+    client_to_server_send, client_to_server_recv = anyio.create_memory_object_stream(STREAM_BUFFER_SIZE)
+
+    async def forward_stdout():
+        buffer = bytearray()
+        try:
+            async for chunk in process.stdout:  # type: ignore[union-attr]
+                buffer += chunk
+                start = 0
+                while (newline := buffer.find(b"\n", start)) != -1:
+                    line = bytes(buffer[start:newline]).strip()
+                    start = newline + 1
+                    if not line:
+                        continue
+                    try:
+                        msg = types.JSONRPCMessage.model_validate_json(line)
+                    except Exception as exc:  # noqa: BLE001
+                        await server_to_client_send.send(exc)
+                        continue
+                    await server_to_client_send.send(SessionMessage(msg))
+                del buffer[:start]
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+            pass
+        finally:
+            await server_to_client_send.aclose()
+
+    async def forward_stdin():
+        try:
+            async with client_to_server_recv:
+                async for session_message in client_to_server_recv:
+                    batch = [session_message]
+                    # Drain whatever else is already queued into the same write.
+                    while len(batch) < MAX_WRITE_BATCH:
+                        try:
+                            batch.append(client_to_server_recv.receive_nowait())
+                        except (anyio.WouldBlock, anyio.EndOfStream):
+                            break
+                    data = b"".join(
+                        m.message.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8") + b"\n"
+                        for m in batch
+                    )
+                    await process.stdin.send(data)  # type: ignore[union-attr]
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+            pass
+        finally:
+            await process.stdin.aclose()  # type: ignore[union-attr]
+
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(forward_stdout)
+            tg.start_soon(forward_stdin)
+
+            session = ClientSession(
+                server_to_client_recv, client_to_server_send, message_handler=message_handler
+            )
+            await session.__aenter__()
+            session.server_info = (await session.initialize()).serverInfo  # GeminiToolCatalog key
+            try:
+                yield session
+            finally:
+                await session.__aexit__(None, None, None)
+                tg.cancel_scope.cancel()
+    finally:
+        with anyio.CancelScope(shield=True):
+            if process.returncode is None:
+                process.terminate()
+            with anyio.move_on_after(2):
+                await process.wait()
+            if process.returncode is None:
+                process.kill()
+            await process.aclose()
+
+
+@asynccontextmanager
+async def connect_to_server_threaded(server_path: Path, message_handler=None):
+    """
+    Previous transport, kept for bench_transport.py: blocking text pipes with
+    every readline/write/flush moved to a worker thread, unbuffered streams.
+    """
+    env = _server_env()
 
     proc = subprocess.Popen(
         [sys.executable, str(server_path)],
@@ -166,9 +412,11 @@ async def connect_to_server(server_path: Path):
         tg.start_soon(forward_stdin)
 
         # ClientSession reads from server_to_client_recv and writes to client_to_server_send
-        session = ClientSession(server_to_client_recv, client_to_server_send)
+        session = ClientSession(
+            server_to_client_recv, client_to_server_send, message_handler=message_handler
+        )
         await session.__aenter__()
-        await session.initialize()
+        session.server_info = (await session.initialize()).serverInfo  # GeminiToolCatalog key
         try:
             yield session
         finally:
@@ -186,13 +434,82 @@ async def call_mcp_tool(session: ClientSession, name: str, arguments: dict[str,
     return text
 
 
-async def send_user_and_maybe_call_tool(chat, user_text: str, session: ClientSession) -> str:
+class ToolCallCache:
     """
-    Send a user message to Gemini, handle at most one round of tool calls, and return the final text reply.
+    Results of successful tool calls in one chat session, keyed by name + canonical
+    JSON args, reused for `ttl` seconds. Tools in `skip` (live quotes) are never stored.
     """
-    # Gemini client is synchronous; run it off-thread.
-    response = await anyio.to_thread.run_sync(chat.send_message, user_text)
 
+    def __init__(
+        self,
+        ttl: float = TOOL_RESULT_TTL,
+        skip: Iterable[str] = LIVE_TOOLS,
+        clock=time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.skip = frozenset(skip)
+        self._clock = clock
+        self._results: dict[tuple[str, str], tuple[str, float]] = {}
+        self.hits = 0
+
+    @staticmethod
+    def key(name: str, arguments: dict[str, Any]) -> tuple[str, str]:
+        return name, json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, name: str, arguments: dict[str, Any]) -> str | None:
+        key = self.key(name, arguments)
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        result, stored_at = entry
+        if self._clock() - stored_at >= self.ttl:
+            del self._results[key]
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, name: str, arguments: dict[str, Any], result: str) -> None:
+        if name in self.skip or self.ttl <= 0 or result.startswith("[tool error]"):
+            return
+        self._results[self.key(name, arguments)] = (result, self._clock())
+
+
+async def call_mcp_tools_concurrently(
+    session: ClientSession,
+    calls: list[tuple[str, dict[str, Any]]],
+    cache: ToolCallCache | None = None,
+) -> list[str]:
+    """
+    Run independent tool calls at the same time; results keep the call order.
+    Identical calls run once, and calls already in `cache` do not run at all.
+    """
+    keys = [ToolCallCache.key(name, arguments) for name, arguments in calls]
+    results: dict[tuple[str, str], str] = {}
+    for key, (name, arguments) in zip(keys, calls):
+        cached = cache.get(name, arguments) if cache else None
+        if cached is not None:
+            results[key] = cached
+
+    async def run(key: tuple[str, str], name: str, arguments: dict[str, Any]) -> None:
+        try:
+            results[key] = await call_mcp_tool(session, name, arguments)
+        except Exception as exc:  # one failing call must not cancel the others
+            results[key] = f"[tool error]\n{exc}"
+        if cache is not None:
+            cache.put(name, arguments, results[key])
+
+    async with anyio.create_task_group() as tg:
+        started: set[tuple[str, str]] = set()
+        for key, (name, arguments) in zip(keys, calls):
+            if key not in results and key not in started:
+                started.add(key)
+                tg.start_soon(run, key, name, arguments)
+
+    return [results[key] for key in keys]
+
+
+def _function_calls(response) -> list[tuple[str, dict[str, Any]]]:
+    """(name, plain args) of every function call in a Gemini response."""
     # Prefer response.function_calls if available (newer SDKs).
     function_calls = list(getattr(response, "function_calls", []) or [])
 
@@ -204,41 +521,98 @@ async def send_user_and_maybe_call_tool(chat, user_text: str, session: ClientSes
                 parts = response.candidates[0].content.parts
             except Exception:
                 parts = None
-        parts = parts or []
-        for p in parts:
+        for p in parts or []:
             fc = getattr(p, "function_call", None)
-            name = getattr(fc, "name", None) if fc is not None else None
-            if fc is not None and name:
+            if fc is not None and getattr(fc, "name", None):
                 function_calls.append(fc)
 
-    # If there are no valid function calls, just return the model's text.
-    if not function_calls:
-        return getattr(response, "text", "") or ""
+    return [
+        (fc.name, _to_plain(getattr(fc, "args", {}) or {}))
+        for fc in function_calls
+        # Skip invalid/empty names to avoid 400 errors and MCP warnings.
+        if getattr(fc, "name", None)
+    ]
+
+
+async def send_user_and_maybe_call_tool(
+    chat,
+    user_text: str,
+    session: ClientSession,
+    cache: ToolCallCache | None = None,
+    max_steps: int = MAX_TOOL_STEPS,
+    time_budget: float = TOOL_TIME_BUDGET,
+) -> str:
+    """
+    Send a user message to Gemini and run tool calls until the model answers in text.
 
-    # Handle each function call once.
-    for fc in function_calls:
-        name = getattr(fc, "name", None)
-        if not name:
-            # Skip invalid/empty names to avoid 400 errors and MCP warnings.
-            continue
+    Each step runs all function calls of the model's turn concurrently and sends
+    their results back in one message. Repeated calls are answered from `cache`.
+    After `max_steps` steps, or once `time_budget` seconds have passed, the last
+    results are sent with function calling disabled so the model must answer.
+    """
+    started = time.perf_counter()
+    # Gemini client is synchronous; run it off-thread.
+    response = await anyio.to_thread.run_sync(chat.send_message, user_text)
+    logger.info("model: %.2fs", time.perf_counter() - started)
 
-        args = dict(getattr(fc, "args", {}) or {})
-        tool_output = await call_mcp_tool(session, name, args)
+    for step in range(1, max_steps + 1):
+        calls = _function_calls(response)
+        if not calls:
+            break
 
-        # Send the function result back to Gemini for a final answer.
-        response = await anyio.to_thread.run_sync(
-            chat.send_message,
+        step_started = time.perf_counter()
+        hits_before = cache.hits if cache else 0
+        if step_started - started < time_budget:
+            outputs = await call_mcp_tools_concurrently(session, calls, cache)
+        else:
+            # Every function call still needs a response.
+            outputs = ["[tool error]\nSkipped: time budget for this question is used up."] * len(calls)
+        tools_done = time.perf_counter()
+
+        final = step == max_steps or tools_done - started >= time_budget
+        # On the last step, disable function calling so the reply is text.
+        options = {"tool_config": {"function_calling_config": {"mode": "NONE"}}} if final else {}
+        function_responses = [
             {
                 "function_response": {
                     "name": name,
-                    "response": {"result": tool_output},
+                    "response": {"result": output},
                 }
-            },
+            }
+            for (name, _), output in zip(calls, outputs)
+        ]
+        response = await anyio.to_thread.run_sync(
+            lambda: chat.send_message(function_responses, **options)
+        )
+        logger.info(
+            "step %d: %d call(s) [%s], %d cached, tools %.2fs, model %.2fs",
+            step,
+            len(calls),
+            ", ".join(name for name, _ in calls),
+            (cache.hits - hits_before) if cache else 0,
+            tools_done - step_started,
+            time.perf_counter() - tools_done,
         )
+        if final:
+            break
 
+    logger.info("turn finished in %.2fs", time.perf_counter() - started)
     return getattr(response, "text", "") or ""
 
 
+def _build_model(model_name: str, gemini_tools: list[dict[str, Any]]):
+    return genai.GenerativeModel(
+        model_name,
+        tools=gemini_tools,
+        system_instruction=(
+            "You are an assistant that uses MCP tools to answer stock questions. "
+            "When several tool results are needed and they do not depend on each other, "
+            "request all of those function calls in the same turn. "
+            "Chain further calls on their results yourself instead of asking the user."
+        ),
+    )
+
+
 async def main() -> None:
     parser = argparse.ArgumentParser(
         description="Gemini-backed MCP client for the stock server."
@@ -254,8 +628,32 @@ async def main() -> None:
         default=ROOT / "mcp_server.py",
         help="Path to the MCP server file to run.",
     )
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        default=MAX_TOOL_STEPS,
+        help="Maximum rounds of tool calls per question.",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=TOOL_TIME_BUDGET,
+        help="Seconds of tool use per question before the model must answer.",
+    )
+    parser.add_argument(
+        "--tool-cache",
+        default=os.environ.get("GEMINI_TOOL_CACHE", str(ROOT / ".cache" / "gemini_tools.json")),
+        help="JSON file caching converted tool declarations ('' to keep them in memory only).",
+    )
+    parser.add_argument(
+        "--log-level",
+        default=os.environ.get("LOG_LEVEL", "WARNING"),
+        help="Logging level; INFO shows per-step timings.",
+    )
     args = parser.parse_args()
 
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s %(name)s: %(message)s")
+
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         print("Please set GEMINI_API_KEY in your environment.")
@@ -263,18 +661,15 @@ async def main() -> None:
 
     genai.configure(api_key=api_key)
 
+    catalog = GeminiToolCatalog(args.tool_cache or None)
+
     print("Connecting to MCP server...")
-    async with connect_to_server(args.server_path) as session:
-        tools_response = await session.list_tools()
-        gemini_tools = _as_gemini_tools(tools_response.tools)
-        print("Connected. Available tools:", ", ".join(tool.name for tool in tools_response.tools))
-
-        model = genai.GenerativeModel(
-            args.model,
-            tools=gemini_tools,
-            system_instruction="You are an assistant that uses MCP tools to answer stock questions.",
-        )
-        chat = model.start_chat(history=[])
+    async with connect_to_server(args.server_path, message_handler=catalog.message_handler) as session:
+        gemini_tools = await catalog.refresh(session)
+        print("Connected. Available tools:", ", ".join(catalog.tool_names))
+
+        chat = _build_model(args.model, gemini_tools).start_chat(history=[])
+        cache = ToolCallCache()  # this chat session; entries expire after TOOL_RESULT_TTL
 
         while True:
             try:
@@ -285,8 +680,22 @@ async def main() -> None:
             if user_text.lower() in {"exit", "quit"}:
                 break
 
+            # Only after notifications/tools/list_changed; the chat history is kept.
+            gemini_tools = await catalog.refresh(session)
+            if gemini_tools is not None:
+                chat = _build_model(args.model, gemini_tools).start_chat(history=chat.history)
+                cache = ToolCallCache()
+                print("Tool list changed. Available tools:", ", ".join(catalog.tool_names))
+
             try:
-                reply = await send_user_and_maybe_call_tool(chat, user_text, session)
+                reply = await send_user_and_maybe_call_tool(
+                    chat,
+                    user_text,
+                    session,
+                    cache=cache,
+                    max_steps=args.max_steps,
+                    time_budget=args.time_budget,
+                )
             except Exception as exc:
                 reply = f"Error: {exc}"
             print(f"Assistant: {reply}")
@@ -1,37 +1,62 @@
-import yfinance as yf
+import json
+import os
 import sys
+from datetime import date
+from pathlib import Path
+
 from mcp.server.fastmcp import FastMCP
 
+from history_store import (
+    HistoryStore,
+    last_trading_days,
+    period_returns,
+    period_start,
+    resample_ohlc,
+    rolling_stats,
+    summary,
+)
+from quotes import normalize_symbol, quote_service_from_env
+
+ROOT = Path(__file__).resolve().parent
+MAX_CSV_ROWS = 250
+
 # Create an MCP server with a custom name
 mcp = FastMCP("Stock Price Server")
 
 print("Stock Price Server starting (stdio)...", file=sys.stderr, flush=True)
 
+# One quote cache + provider shared by every tool and resource (see quotes.py)
+quotes = quote_service_from_env()
+
+# Daily bars stored per symbol under STOCK_HISTORY_DIR (see history_store.py)
+history = HistoryStore(
+    os.environ.get("STOCK_HISTORY_DIR", str(ROOT / ".history")),
+    quotes.provider,
+    refresh_seconds=float(os.environ.get("STOCK_HISTORY_REFRESH", "900")),
+)
+
 @mcp.tool()
 def get_stock_price(symbol: str) -> float:
     """
     Retrieve the current stock price for the given ticker symbol.
     Returns the latest closing price as a float.
     """
-    try:
-        ticker = yf.Ticker(symbol)
-        # Get today's historical data; may return empty if market is closed or symbol is invalid.
-        data = ticker.history(period="1d")
-        if not data.empty:
-            # Use the last closing price from today's data
-            price = data['Close'].iloc[-1]
-            return float(price)
-        else:
-            # As a fallback, try using the regular market price from the ticker info
-            info = ticker.info
-            price = info.get("regularMarketPrice", None)
-            if price is not None:
-                return float(price)
-            else:
-                return -1.0  # Indicate failure
-    except Exception:
-        # Return -1.0 to indicate an error occurred when fetching the stock price
-        return -1.0
+    price = quotes.get_price(symbol)
+    # Return -1.0 to indicate an error occurred when fetching the stock price
+    return price if price is not None else -1.0
+
+@mcp.tool()
+def get_stock_prices(symbols: list[str]) -> dict[str, float]:
+    """
+    Retrieve the current stock prices for several ticker symbols at once.
+    Returns a mapping of symbol -> latest closing price (-1.0 if unavailable).
+    Prefer this over repeated get_stock_price calls.
+
+    Parameters:
+        symbols: The stock ticker symbols, e.g. ["AAPL", "MSFT"].
+    """
+    prices = quotes.get_prices(symbols)
+    return {symbol: (price if price is not None else -1.0) for symbol, price in prices.items()}
 
 @mcp.resource("stock://{symbol}",)
 def stock_resource(symbol: str) -> str:
@@ -44,24 +69,81 @@ def stock_resource(symbol: str) -> str:
         return f"Error: Could not retrieve price for symbol '{symbol}'."
     return f"The current price of '{symbol}' is ${price:.2f}."
 
+def _csv(header: list[str], columns: list) -> str:
+    """Small CSV text from equally long columns, floats rounded for the LLM."""
+    lines = [",".join(header)]
+    for row in zip(*columns):
+        lines.append(",".join(f"{v:.4g}" if isinstance(v, float) else str(v) for v in row))
+    return "\n".join(lines)
+
 @mcp.tool()
-def get_stock_history(symbol: str, period: str = "1mo") -> str:
+def get_stock_history(
+    symbol: str,
+    period: str = "1mo",
+    view: str = "summary",
+    interval: str = "W",
+    window: int = 20,
+    start: str | None = None,
+    end: str | None = None,
+) -> str:
     """
     Retrieve historical data for a stock given a ticker symbol and a period.
-    Returns the historical data as a CSV formatted string.
-    
+    Data comes from a local store that only downloads missing days.
+
     Parameters:
         symbol: The stock ticker symbol.
-        period: The period over which to retrieve historical data (e.g., '1mo', '3mo', '1y').
+        period: The period over which to retrieve historical data
+                ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max').
+        view: 'summary' (default, JSON headline numbers), 'ohlc' (OHLC bars per interval),
+              'returns' (% return per interval), 'rolling' (rolling mean/std of close)
+              or 'csv' (daily rows, capped at 250 most recent).
+        interval: Bucket for 'ohlc' and 'returns': 'D', 'W' (default) or 'M'.
+        window: Number of trading days for 'rolling'.
+        start: Optional start date YYYY-MM-DD (overrides period).
+        end: Optional end date YYYY-MM-DD (defaults to today).
     """
+    view = view.lower()
+    if view == "rolling" and window < 2:
+        return f"Invalid window {window}: 'rolling' needs at least 2 trading days."
     try:
-        ticker = yf.Ticker(symbol)
-        data = ticker.history(period=period)
-        if data.empty:
+        today = date.today()
+        start_day = date.fromisoformat(start) if start else period_start(period, today)
+        end_day = date.fromisoformat(end) if end else today
+        rows = history.window(symbol, start_day, end_day)
+        keep = None if start else last_trading_days(period)
+        if keep:
+            rows = rows[-keep:]
+        if len(rows) == 0:
             return f"No historical data found for symbol '{symbol}' with period '{period}'."
-        # Convert the DataFrame to a CSV formatted string
-        csv_data = data.to_csv()
-        return csv_data
+
+        interval = interval.upper()
+        if view == "summary":
+            return json.dumps(summary(rows))
+        if view == "ohlc":
+            bars = resample_ohlc(rows, interval)
+            return _csv(
+                ["date", "open", "high", "low", "close", "volume"],
+                [bars["date"].astype(str), *(bars[c].tolist() for c in ("open", "high", "low", "close", "volume"))],
+            )
+        if view == "returns":
+            dates, returns = period_returns(rows, interval)
+            return _csv(["date", "return_pct"], [dates.astype(str), returns.tolist()])
+        if view == "rolling":
+            dates, mean, std = rolling_stats(rows, window)
+            if len(dates) == 0:
+                return f"Not enough data for a {window}-day rolling window."
+            step = max(1, len(dates) // 30)  # about 30 points is plenty for the model
+            return _csv(
+                ["date", f"mean_{window}d", f"std_{window}d"],
+                [dates[::-step][::-1].astype(str), mean[::-step][::-1].tolist(), std[::-step][::-1].tolist()],
+            )
+        if view == "csv":
+            rows = rows[-MAX_CSV_ROWS:]
+            return _csv(
+                ["date", "open", "high", "low", "close", "volume"],
+                [rows["date"].astype(str), *(rows[c].tolist() for c in ("open", "high", "low", "close", "volume"))],
+            )
+        return f"Unknown view '{view}'. Use summary, ohlc, returns, rolling or csv."
     except Exception as e:
         return f"Error fetching historical data: {str(e)}"
 
@@ -75,8 +157,9 @@ def compare_stocks(symbol1: str, symbol2: str) -> str:
         symbol1: The first stock ticker symbol.
         symbol2: The second stock ticker symbol.
     """
-    price1 = get_stock_price(symbol1)
-    price2 = get_stock_price(symbol2)
+    prices = get_stock_prices([symbol1, symbol2])  # one batched lookup
+    price1 = prices.get(normalize_symbol(symbol1), -1.0)
+    price2 = prices.get(normalize_symbol(symbol2), -1.0)
     if price1 < 0 or price2 < 0:
         return f"Error: Could not retrieve data for comparison of '{symbol1}' and '{symbol2}'."
     if price1 > price2:
@@ -0,0 +1,250 @@
+"""
+Quote providers and a shared quote cache for the stock MCP server.
+
+- QuoteProvider: where prices (and daily history, see history_store.py)
+  come from. YFinanceProvider downloads many tickers in one batched request;
+  FixtureProvider reads a local JSON file so tests and demos run without
+  the network.
+- QuoteCache: bounded LRU with a TTL per quote, optionally persisted to a
+  JSON file so a restarted server keeps its warm cache.
+- QuoteService: what the tools use; serves cached quotes and fetches all
+  missing symbols in a single provider call.
+
+Environment:
+  STOCK_PROVIDER       yfinance (default) or fixture
+  STOCK_FIXTURE_PATH   JSON fixture for the fixture provider
+  STOCK_QUOTE_TTL      seconds a quote stays fresh (default 60)
+  STOCK_CACHE_SIZE     max cached symbols (default 512)
+  STOCK_CACHE_PATH     optional JSON file to persist the cache
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Columns of a daily history frame (DatetimeIndex, one row per trading day)
+HISTORY_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def normalize_symbol(symbol: str) -> str:
+    return symbol.strip().upper()
+
+
+class QuoteProvider(Protocol):
+    """Source of latest prices. Symbols it cannot price are left out."""
+
+    def fetch_prices(self, symbols: list[str]) -> dict[str, float]:
+        ...
+
+    def fetch_history(self, symbol: str, start: date, end: date) -> "pd.DataFrame":
+        """Daily bars with HISTORY_COLUMNS for start <= day < end."""
+        ...
+
+
+class YFinanceProvider:
+    """Yahoo Finance through yfinance, one batched download per call."""
+
+    def fetch_prices(self, symbols: list[str]) -> dict[str, float]:
+        import pandas as pd
+        import yfinance as yf
+
+        if not symbols:
+            return {}
+
+        # A few days so the last close is found on weekends and holidays too.
+        data = yf.download(
+            tickers=symbols,
+            period="5d",
+            interval="1d",
+            progress=False,
+            threads=True,
+            auto_adjust=False,
+        )
+        prices: dict[str, float] = {}
+        if data is not None and not data.empty and "Close" in data:
+            close = data["Close"]
+            if isinstance(close, pd.Series):
+                close = close.to_frame(symbols[0])
+            for symbol in symbols:
+                if symbol not in close.columns:
+                    continue
+                series = close[symbol].dropna()
+                if not series.empty:
+                    prices[symbol] = float(series.iloc[-1])
+
+        # Rare: no bars at all (e.g. just listed); ask for the live quote.
+        for symbol in symbols:
+            if symbol in prices:
+                continue
+            try:
+                price = yf.Ticker(symbol).info.get("regularMarketPrice")
+            except Exception:
+                price = None
+            if price is not None:
+                prices[symbol] = float(price)
+        return prices
+
+    def fetch_history(self, symbol: str, start: date, end: date) -> "pd.DataFrame":
+        import yfinance as yf
+
+        data = yf.Ticker(symbol).history(
+            start=start.isoformat(),
+            end=end.isoformat(),
+            interval="1d",
+            auto_adjust=False,
+        )
+        if data.empty:
+            return data
+        data.index = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        return data[HISTORY_COLUMNS]
+
+
+class FixtureProvider:
+    """
+    Prices from a JSON file, e.g. {"prices": {"AAPL": 190.5, "MSFT": 410.2}},
+    and optional daily bars:
+    {"history": {"AAPL": [{"date": "2024-05-01", "open": 1, "high": 2,
+                           "low": 1, "close": 2, "volume": 100}, ...]}}
+    The file is re-read on every call so tests can change it on the fly.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def _load(self) -> dict:
+        with self.path.open(encoding="utf-8") as f:
+            return json.load(f)
+
+    def fetch_prices(self, symbols: list[str]) -> dict[str, float]:
+        prices = self._load().get("prices", {})
+        return {s: float(prices[s]) for s in symbols if s in prices}
+
+    def fetch_history(self, symbol: str, start: date, end: date) -> "pd.DataFrame":
+        import pandas as pd
+
+        rows = self._load().get("history", {}).get(symbol, [])
+        frame = pd.DataFrame(
+            [[r[c.lower()] for c in HISTORY_COLUMNS] for r in rows],
+            index=pd.to_datetime([r["date"] for r in rows]),
+            columns=HISTORY_COLUMNS,
+            dtype="float64",
+        )
+        mask = (frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))
+        return frame[mask].sort_index()
+
+
+class QuoteCache:
+    """Thread-safe LRU of symbol -> (price, fetched_at) with a TTL."""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 512, path: str | None = None) -> None:
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.path = Path(path) if path else None
+        self._entries: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def get_many(self, symbols: list[str]) -> tuple[dict[str, float], list[str]]:
+        """Split symbols into fresh cached prices and symbols to fetch."""
+        now = time.time()
+        hits: dict[str, float] = {}
+        misses: list[str] = []
+        with self._lock:
+            for symbol in symbols:
+                entry = self._entries.get(symbol)
+                if entry is not None and now - entry[1] < self.ttl:
+                    self._entries.move_to_end(symbol)
+                    hits[symbol] = entry[0]
+                else:
+                    misses.append(symbol)
+        return hits, misses
+
+    def put_many(self, prices: dict[str, float]) -> None:
+        if not prices:
+            return
+        now = time.time()
+        with self._lock:
+            for symbol, price in prices.items():
+                self._entries[symbol] = (price, now)
+                self._entries.move_to_end(symbol)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    # ### Persistence (caller holds the lock)
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            entries = [(str(s), (float(p), float(t))) for s, (p, t) in data.items()]
+        except (OSError, ValueError, TypeError, AttributeError):
+            return  # a broken or foreign cache file is just a cold cache
+        self._entries.update(entries)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({s: list(v) for s, v in self._entries.items()}, f)
+        os.replace(tmp, self.path)
+
+
+class QuoteService:
+    """Cached, batched price lookups shared by every tool and resource."""
+
+    def __init__(self, provider: QuoteProvider, cache: QuoteCache) -> None:
+        self.provider = provider
+        self.cache = cache
+
+    def get_prices(self, symbols: list[str]) -> dict[str, float | None]:
+        """Latest price per symbol (None when unavailable); one provider call at most."""
+        wanted = list(dict.fromkeys(normalize_symbol(s) for s in symbols if s.strip()))
+        prices, misses = self.cache.get_many(wanted)
+        if misses:
+            try:
+                fetched = self.provider.fetch_prices(misses)
+            except Exception:
+                fetched = {}
+            self.cache.put_many(fetched)
+            prices.update(fetched)
+        return {s: prices.get(s) for s in wanted}
+
+    def get_price(self, symbol: str) -> float | None:
+        return self.get_prices([symbol]).get(normalize_symbol(symbol))
+
+
+def load_provider_from_env() -> QuoteProvider:
+    name = os.environ.get("STOCK_PROVIDER", "yfinance").lower()
+    if name == "fixture":
+        path = os.environ.get("STOCK_FIXTURE_PATH")
+        if not path:
+            raise RuntimeError("STOCK_FIXTURE_PATH must be set when STOCK_PROVIDER=fixture.")
+        return FixtureProvider(path)
+    if name == "yfinance":
+        return YFinanceProvider()
+    raise ValueError(f"Unsupported STOCK_PROVIDER: {name}")
+
+
+def quote_service_from_env() -> QuoteService:
+    cache = QuoteCache(
+        ttl=float(os.environ.get("STOCK_QUOTE_TTL", "60")),
+        max_entries=int(os.environ.get("STOCK_CACHE_SIZE", "512")),
+        path=os.environ.get("STOCK_CACHE_PATH"),
+    )
+    return QuoteService(load_provider_from_env(), cache)
@@ -0,0 +1,5 @@
+# The stock client and server modules are flat scripts next to this folder: import them directly.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
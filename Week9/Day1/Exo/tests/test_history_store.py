@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from history_store import (
+    HISTORY_DTYPE,
+    HistoryStore,
+    last_trading_days,
+    period_start,
+    resample_ohlc,
+    rolling_stats,
+    summary,
+)
+from quotes import HISTORY_COLUMNS
+
+TODAY = date(2024, 6, 12)  # a Wednesday
+YFINANCE_PERIODS = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"]
+
+
+def bars(closes, first=date(2024, 1, 1)):
+    """Consecutive business-day rows with the given closes."""
+    rows = np.zeros(len(closes), dtype=HISTORY_DTYPE)
+    rows["date"] = np.busday_offset(np.datetime64(first, "D"), np.arange(len(closes)), roll="forward")
+    for column in ("open", "high", "low", "close"):
+        rows[column] = closes
+    rows["volume"] = 100
+    return rows
+
+
+class FakeProvider:
+    """Business-day bars with close = day number; records every fetch."""
+
+    def __init__(self, delays=None):
+        self.calls = []
+        self.delays = delays or {}  # symbol -> seconds per fetch
+
+    def fetch_prices(self, symbols):
+        return {}
+
+    def fetch_history(self, symbol, start, end):
+        self.calls.append((symbol, start, end))
+        time.sleep(self.delays.get(symbol, 0.0))
+        days = pd.bdate_range(start, end - timedelta(days=1))
+        values = np.arange(len(days), dtype="float64") + 1
+        return pd.DataFrame({c: values for c in HISTORY_COLUMNS}, index=days)
+
+
+@pytest.mark.parametrize("period", YFINANCE_PERIODS)
+def test_every_yfinance_period_is_supported(period):
+    assert period_start(period, TODAY) <= TODAY
+
+
+def test_trading_day_periods_cover_a_weekend():
+    # Monday: "1d" must still reach back to Friday
+    monday = date(2024, 6, 10)
+    assert period_start("1d", monday) <= monday - timedelta(days=3)
+    assert period_start("5d", monday) <= monday - timedelta(days=7)
+    assert last_trading_days("1D") == 1
+    assert last_trading_days("5d") == 5
+    assert last_trading_days("1mo") is None
+
+
+def test_unknown_period_lists_valid_ones():
+    with pytest.raises(ValueError, match="1d"):
+        period_start("2d", TODAY)
+
+
+def test_ytd_starts_on_january_first():
+    assert period_start("ytd", TODAY) == date(2024, 1, 1)
+
+
+@pytest.mark.parametrize("window", [-1, 0, 1])
+def test_rolling_stats_rejects_small_windows(window):
+    with pytest.raises(ValueError, match="at least 2"):
+        rolling_stats(bars([1.0, 2.0, 3.0]), window)
+
+
+def test_rolling_stats_matches_pandas():
+    closes = [10.0, 11.0, 9.5, 12.0, 12.5, 11.0, 13.0]
+    dates, mean, std = rolling_stats(bars(closes), 3)
+    expected = pd.Series(closes).rolling(3)
+    assert len(dates) == 5
+    np.testing.assert_allclose(mean, expected.mean().dropna().to_numpy())
+    np.testing.assert_allclose(std, expected.std().dropna().to_numpy())
+
+
+def test_rolling_stats_window_longer_than_data_is_empty():
+    dates, mean, std = rolling_stats(bars([1.0, 2.0]), 5)
+    assert len(dates) == len(mean) == len(std) == 0
+
+
+def test_resample_weekly_ohlc():
+    rows = bars([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])  # Mon 1 Jan .. Tue 9 Jan
+    weekly = resample_ohlc(rows, "W")
+    assert weekly["close"].tolist() == [5.0, 7.0]
+    assert weekly["open"].tolist() == [1.0, 6.0]
+    assert str(weekly["date"][0]) == "2024-01-05"
+
+
+def test_summary_change():
+    assert summary(bars([100.0, 110.0]))["change_pct"] == 10.0
+
+
+def test_window_only_fetches_missing_days(tmp_path):
+    provider = FakeProvider()
+    store = HistoryStore(tmp_path, provider, refresh_seconds=3600)
+    today = date.today()
+
+    first = store.window("aapl", today - timedelta(days=30))
+    assert len(provider.calls) == 1
+    again = store.window("AAPL", today - timedelta(days=20))
+    assert len(provider.calls) == 1  # covered and fresh: no fetch
+    assert len(again) <= len(first)
+
+    store.window("AAPL", today - timedelta(days=60))
+    assert len(provider.calls) == 2
+    assert provider.calls[-1][2] == today - timedelta(days=30)  # only the older gap
+
+
+def test_slow_symbol_does_not_block_others(tmp_path):
+    provider = FakeProvider(delays={"SLOW": 2.0})
+    store = HistoryStore(tmp_path, provider)
+    start = date.today() - timedelta(days=10)
+
+    thread = threading.Thread(target=store.window, args=("SLOW", start))
+    thread.start()
+    time.sleep(0.1)  # SLOW is now downloading
+    began = time.perf_counter()
+    store.window("FAST", start)
+    elapsed = time.perf_counter() - began
+    thread.join()
+
+    assert elapsed < 1.0  # a store-wide lock would wait for SLOW's download
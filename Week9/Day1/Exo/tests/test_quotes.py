@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+import quotes
+from quotes import FixtureProvider, QuoteCache, QuoteService
+
+
+class CountingProvider(FixtureProvider):
+    """FixtureProvider that records the symbols of every fetch_prices call."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.calls = []
+
+    def fetch_prices(self, symbols):
+        self.calls.append(list(symbols))
+        return super().fetch_prices(symbols)
+
+
+@pytest.fixture
+def fixture_file(tmp_path):
+    path = tmp_path / "quotes.json"
+    path.write_text(json.dumps({"prices": {"AAPL": 190.5, "MSFT": 410.2, "NVDA": 120.0}}))
+    return path
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(quotes.time, "time", lambda: now[0])
+    return now
+
+
+def test_cache_expires_after_ttl(clock):
+    cache = QuoteCache(ttl=60)
+    cache.put_many({"AAPL": 190.5})
+
+    clock[0] += 59
+    assert cache.get_many(["AAPL"]) == ({"AAPL": 190.5}, [])
+    clock[0] += 1
+    assert cache.get_many(["AAPL"]) == ({}, ["AAPL"])
+
+
+def test_cache_evicts_least_recently_used():
+    cache = QuoteCache(max_entries=2)
+    cache.put_many({"AAPL": 1.0, "MSFT": 2.0})
+    cache.get_many(["AAPL"])  # MSFT is now the oldest
+    cache.put_many({"NVDA": 3.0})
+
+    hits, misses = cache.get_many(["AAPL", "MSFT", "NVDA"])
+    assert hits == {"AAPL": 1.0, "NVDA": 3.0}
+    assert misses == ["MSFT"]
+
+
+def test_cache_persists_across_restarts(tmp_path, clock):
+    path = tmp_path / "cache.json"
+    QuoteCache(ttl=60, path=str(path)).put_many({"AAPL": 190.5, "MSFT": 410.2})
+
+    clock[0] += 30
+    restarted = QuoteCache(ttl=60, path=str(path))
+    assert restarted.get_many(["AAPL", "MSFT"]) == ({"AAPL": 190.5, "MSFT": 410.2}, [])
+    # The fetch time survives too, so a restart does not refresh stale quotes
+    clock[0] += 30
+    assert restarted.get_many(["AAPL"]) == ({}, ["AAPL"])
+
+
+def test_restart_keeps_only_max_entries(tmp_path):
+    path = tmp_path / "cache.json"
+    QuoteCache(path=str(path)).put_many({"AAPL": 1.0, "MSFT": 2.0, "NVDA": 3.0})
+
+    hits, _ = QuoteCache(max_entries=2, path=str(path)).get_many(["AAPL", "MSFT", "NVDA"])
+    assert hits == {"MSFT": 2.0, "NVDA": 3.0}
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["{not json", "[]", '["AAPL", 190.5]', '{"AAPL": 190.5}', '{"AAPL": [1, 2, 3]}', '{"AAPL": ["x", 1]}'],
+)
+def test_unexpected_cache_file_is_a_cold_cache(tmp_path, content):
+    path = tmp_path / "cache.json"
+    path.write_text(content)
+
+    cache = QuoteCache(path=str(path))
+    assert cache.get_many(["AAPL"]) == ({}, ["AAPL"])
+    cache.put_many({"AAPL": 190.5})  # and it is overwritten with a valid file
+    assert QuoteCache(path=str(path)).get_many(["AAPL"]) == ({"AAPL": 190.5}, [])
+
+
+def test_service_fetches_all_misses_in_one_call(fixture_file):
+    provider = CountingProvider(fixture_file)
+    service = QuoteService(provider, QuoteCache())
+
+    assert service.get_prices([" aapl", "MSFT", "AAPL", ""]) == {"AAPL": 190.5, "MSFT": 410.2}
+    assert provider.calls == [["AAPL", "MSFT"]]
+
+    prices = service.get_prices(["msft", "nvda", "TSLA"])
+    assert prices == {"MSFT": 410.2, "NVDA": 120.0, "TSLA": None}
+    assert provider.calls[-1] == ["NVDA", "TSLA"]  # MSFT came from the cache
+
+
+def test_service_does_not_cache_unknown_symbols(fixture_file):
+    provider = CountingProvider(fixture_file)
+    service = QuoteService(provider, QuoteCache())
+
+    assert service.get_price("TSLA") is None
+    fixture_file.write_text(json.dumps({"prices": {"TSLA": 250.0}}))
+    assert service.get_price("tsla") == 250.0
+    assert len(provider.calls) == 2
+
+
+def test_service_survives_provider_errors(tmp_path):
+    service = QuoteService(FixtureProvider(tmp_path / "missing.json"), QuoteCache())
+    assert service.get_prices(["AAPL"]) == {"AAPL": None}
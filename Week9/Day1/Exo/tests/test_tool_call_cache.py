@@ -0,0 +1,88 @@
+import anyio
+import mcp.types as types
+import pytest
+
+pytest.importorskip("google.generativeai")  # llm_client configures Gemini at import
+
+from llm_client import LIVE_TOOLS, ToolCallCache, call_mcp_tools_concurrently
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSession:
+    """Counts call_tool requests; answers 'name:args'."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=f"{name}:{sorted(arguments.items())}")],
+            isError=name in self.fail,
+        )
+
+
+def test_hit_with_reordered_arguments():
+    cache = ToolCallCache(ttl=60, skip=())
+    cache.put("get_stock_history", {"symbol": "AAPL", "period": "1mo"}, "rows")
+    assert cache.get("get_stock_history", {"period": "1mo", "symbol": "AAPL"}) == "rows"
+    assert cache.hits == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = ToolCallCache(ttl=60, skip=(), clock=clock)
+    cache.put("get_stock_history", {"symbol": "AAPL"}, "rows")
+    clock.now = 59.9
+    assert cache.get("get_stock_history", {"symbol": "AAPL"}) == "rows"
+    clock.now = 60.0
+    assert cache.get("get_stock_history", {"symbol": "AAPL"}) is None
+
+
+def test_live_quote_tools_are_not_cached_by_default():
+    cache = ToolCallCache(ttl=60)
+    assert "get_stock_price" in LIVE_TOOLS and "get_stock_prices" in LIVE_TOOLS
+    cache.put("get_stock_price", {"symbol": "AAPL"}, "190.0")
+    assert cache.get("get_stock_price", {"symbol": "AAPL"}) is None
+
+
+def test_errors_are_not_cached():
+    cache = ToolCallCache(ttl=60, skip=())
+    cache.put("get_stock_history", {}, "[tool error]\nboom")
+    assert cache.get("get_stock_history", {}) is None
+
+
+def test_concurrent_calls_dedupe_and_use_cache():
+    session = FakeSession()
+    cache = ToolCallCache(ttl=60, skip=("get_stock_price",))
+    calls = [
+        ("get_stock_history", {"symbol": "AAPL"}),
+        ("get_stock_price", {"symbol": "MSFT"}),
+        ("get_stock_history", {"symbol": "AAPL"}),
+    ]
+
+    first = anyio.run(call_mcp_tools_concurrently, session, calls, cache)
+    assert first[0] == first[2]
+    assert len(session.calls) == 2  # identical calls run once
+
+    anyio.run(call_mcp_tools_concurrently, session, calls, cache)
+    # history comes from the cache, the live quote is asked again
+    assert session.calls[2:] == [("get_stock_price", {"symbol": "MSFT"})]
+
+
+def test_failed_call_is_retried_next_time():
+    session = FakeSession(fail={"get_stock_history"})
+    cache = ToolCallCache(ttl=60, skip=())
+    calls = [("get_stock_history", {"symbol": "X"})]
+    result = anyio.run(call_mcp_tools_concurrently, session, calls, cache)
+    assert result[0].startswith("[tool error]")
+    anyio.run(call_mcp_tools_concurrently, session, calls, cache)
+    assert len(session.calls) == 2
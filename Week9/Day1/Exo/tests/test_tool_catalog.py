@@ -0,0 +1,155 @@
+import anyio
+import mcp.types as types
+import pytest
+
+pytest.importorskip("google.generativeai")  # llm_client configures Gemini at import
+
+import llm_client
+from llm_client import GeminiToolCatalog, catalog_key
+
+
+class FakeSession:
+    """Counts list_tools requests; the tools are served over two pages."""
+
+    def __init__(self, names, version="1.0"):
+        self.names = names
+        self.listings = 0
+        self.server_info = types.Implementation(name="stock", version=version)
+
+    async def list_tools(self, cursor=None):
+        if cursor is None:
+            self.listings += 1
+        half = len(self.names) // 2
+        if cursor is None and half:
+            return types.ListToolsResult(tools=self._tools(self.names[:half]), nextCursor="2")
+        return types.ListToolsResult(tools=self._tools(self.names[half:] if cursor else self.names))
+
+    @staticmethod
+    def _tools(names):
+        return [
+            types.Tool(
+                name=name,
+                description=f"{name} tool",
+                inputSchema={
+                    "type": "object",
+                    "title": "Args",
+                    "properties": {"symbol": {"type": "string", "title": "Symbol"}},
+                },
+            )
+            for name in names
+        ]
+
+
+def list_changed():
+    return types.ServerNotification(types.ToolListChangedNotification(method="notifications/tools/list_changed"))
+
+
+def test_first_refresh_lists_all_pages_and_cleans_schemas():
+    catalog = GeminiToolCatalog()
+    session = FakeSession(["a", "b", "c"])
+
+    declarations = anyio.run(catalog.refresh, session)
+
+    functions = declarations[0]["function_declarations"]
+    assert [f["name"] for f in functions] == ["a", "b", "c"]
+    assert catalog.tool_names == ["a", "b", "c"]
+    assert "title" not in functions[0]["parameters"]
+    assert "title" not in functions[0]["parameters"]["properties"]["symbol"]
+
+
+def test_refresh_lists_again_only_after_list_changed():
+    catalog = GeminiToolCatalog()
+    session = FakeSession(["a", "b"])
+
+    async def scenario():
+        assert await catalog.refresh(session) is not None
+        assert await catalog.refresh(session) is None
+        assert session.listings == 1
+
+        session.names = ["a", "b", "c"]
+        await catalog.message_handler(list_changed())
+        declarations = await catalog.refresh(session)
+        assert session.listings == 2
+        assert [f["name"] for f in declarations[0]["function_declarations"]] == ["a", "b", "c"]
+        assert await catalog.refresh(session) is None
+
+    anyio.run(scenario)
+
+
+def test_other_messages_do_not_mark_the_list_stale():
+    catalog = GeminiToolCatalog()
+    session = FakeSession(["a"])
+
+    async def scenario():
+        await catalog.refresh(session)
+        await catalog.message_handler(RuntimeError("transport error"))
+        assert await catalog.refresh(session) is None
+
+    anyio.run(scenario)
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    """Counts _as_gemini_tools calls."""
+    calls = []
+    convert = llm_client._as_gemini_tools
+
+    def counting(tools):
+        calls.append([t.name for t in tools])
+        return convert(tools)
+
+    monkeypatch.setattr(llm_client, "_as_gemini_tools", counting)
+    return calls
+
+
+def test_restarted_client_reuses_saved_declarations(tmp_path, conversions):
+    path = tmp_path / "tools.json"
+    first = anyio.run(GeminiToolCatalog(path).refresh, FakeSession(["a", "b"]))
+
+    restarted = GeminiToolCatalog(path)
+    assert anyio.run(restarted.refresh, FakeSession(["a", "b"])) == first
+    assert restarted.tool_names == ["a", "b"]
+    assert len(conversions) == 1
+
+
+def test_new_server_version_or_tool_list_is_converted(tmp_path, conversions):
+    path = tmp_path / "tools.json"
+    anyio.run(GeminiToolCatalog(path).refresh, FakeSession(["a"]))
+    anyio.run(GeminiToolCatalog(path).refresh, FakeSession(["a"], version="2.0"))
+    anyio.run(GeminiToolCatalog(path).refresh, FakeSession(["a", "b"]))
+    assert len(conversions) == 3
+
+
+def test_list_changed_converts_again_under_the_same_names(tmp_path, conversions):
+    catalog = GeminiToolCatalog(tmp_path / "tools.json")
+    session = FakeSession(["a"])
+
+    async def scenario():
+        await catalog.refresh(session)
+        await catalog.message_handler(list_changed())
+        await catalog.refresh(session)
+
+    anyio.run(scenario)
+    assert len(conversions) == 2
+
+
+def test_broken_or_wrong_shape_cache_file_is_a_cold_cache(tmp_path):
+    path = tmp_path / "tools.json"
+    for content in ("{not json", "[1, 2]"):
+        path.write_text(content, encoding="utf-8")
+        assert anyio.run(GeminiToolCatalog(path).refresh, FakeSession(["a"])) is not None
+
+
+def test_catalog_key_follows_names_arguments_and_version():
+    info = types.Implementation(name="stock", version="1.0")
+    tools = FakeSession._tools(["a", "b"])
+
+    def key(tools, info=info):
+        return catalog_key(info, tools)
+
+    assert key(tools) == key(FakeSession._tools(["a", "b"]))
+    assert key(tools) != key(tools[::-1])
+    assert key(tools) != key(tools, types.Implementation(name="stock", version="1.1"))
+    renamed = [t.model_copy(update={"inputSchema": {"properties": {"ticker": {}}}}) for t in tools]
+    assert key(tools) != key(renamed)
+    assert catalog_key(None, tools)  # sessions without server info still get a key
@@ -6,17 +6,33 @@
 # - mcp_multi_client.py     → multi-server MCP client (external + custom)
 # - llm_client.py           → LLM planning (Groq/Ollama)
 # - orchestrator.py         → agentic orchestration using all tools.
-# This UI calls run_agent_sync(...) from orchestrator.py.
+# This UI calls run_agent_sync(...) from orchestrator.py, on a resident
+# MCPPool (mcp_pool.py) so the MCP servers are not respawned on every click.
 
 
 from __future__ import annotations
 
+import atexit
+import os
+
 import streamlit as st
 
 from config import load_llm_config
+from mcp_pool import MCPPool
 from orchestrator import run_agent_sync
 
 
+# ### Resident MCP servers, shared by every rerun and session of this process
+@st.cache_resource(show_spinner="Starting MCP servers...")
+def get_mcp_pool() -> MCPPool:
+    pool = MCPPool(
+        size=int(os.getenv("MCP_POOL_SIZE", "2")),
+        health_interval=float(os.getenv("MCP_HEALTH_INTERVAL", "30")),
+    ).start()
+    atexit.register(pool.close)
+    return pool
+
+
 def main() -> None:
     if "init" not in st.session_state:
         st.session_state["init"] = True
@@ -54,12 +70,15 @@ def main() -> None:
         else:
             with st.spinner("Running agent with MCP tools..."):
                 try:
-                    result = run_agent_sync(user_goal)
+                    result = run_agent_sync(user_goal, pool=get_mcp_pool())
                 except Exception as e:  # noqa: BLE001
                     st.error("Agent crashed while running.")
                     st.exception(e)
                     return
 
+            for server_name, reason in result.degraded_servers.items():
+                st.warning(f"MCP server `{server_name}` was skipped: {reason}")
+
             st.subheader("✅ Final answer")
             st.write(result.final_answer)
 
@@ -68,9 +87,10 @@ def main() -> None:
                 st.write("No tool calls were recorded.")
             else:
                 for log in result.tool_logs:
+                    cached = f" – cached ×{log.cache_hits}" if log.cache_hits else ""
                     with st.expander(
                         f"Step {log.step} – {log.tool_name} "
-                        f"({'OK' if log.success else 'ERROR'})"
+                        f"({'OK' if log.success else 'ERROR'}){cached}"
                     ):
                         st.markdown(f"**Server:** `{log.server_name}`")
                         st.markdown("**Arguments:**")
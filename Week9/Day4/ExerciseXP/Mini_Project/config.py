@@ -1,6 +1,6 @@
 # Mini Project – MCP Agentic Application (Part 1 + Part 2)
 # This module centralizes configuration:
-# - LLM backend selection (GroqCloud or Ollama) for llm_client.py
+# - LLM backend selection (GroqCloud, Ollama or the local stub) for llm_client.py
 # - MCP servers configuration for:
 #   * external servers from Part 1 (e.g. "files", "web")
 #   * custom server from Part 2 ("local_insights" implemented in my_mcp_server.py)
@@ -10,7 +10,7 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 
@@ -21,10 +21,61 @@ load_dotenv()
 # ### LLM configuration dataclass
 @dataclass
 class LLMConfig:
-    backend: str          # "groq" or "ollama"
+    backend: str          # "groq", "ollama" or "stub"
     model: str
     base_url: str
     api_key: str
+    # approximate prompt tokens before older tool outputs are compacted (context_window.py)
+    context_budget: int = field(
+        default_factory=lambda: int(os.getenv("LLM_CONTEXT_BUDGET", "6000"))
+    )
+    # most recent agent steps always sent verbatim
+    context_keep_steps: int = field(
+        default_factory=lambda: int(os.getenv("LLM_CONTEXT_KEEP_STEPS", "2"))
+    )
+    # tools sent per step, most relevant first (tool_retriever.py); 0 = all tools
+    tool_top_k: int = field(
+        default_factory=lambda: int(os.getenv("LLM_TOOL_TOP_K", "8"))
+    )
+    # HTTP: seconds per request, pooled keep-alive connections
+    timeout: float = field(
+        default_factory=lambda: float(os.getenv("LLM_TIMEOUT", "60"))
+    )
+    max_connections: int = field(
+        default_factory=lambda: int(os.getenv("LLM_MAX_CONNECTIONS", "10"))
+    )
+    # retries on 429 / 5xx / connection errors: exponential backoff with jitter
+    max_retries: int = field(
+        default_factory=lambda: int(os.getenv("LLM_MAX_RETRIES", "4"))
+    )
+    backoff_base: float = field(
+        default_factory=lambda: float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+    )
+    backoff_max: float = field(
+        default_factory=lambda: float(os.getenv("LLM_BACKOFF_MAX", "20"))
+    )
+    # client-side rate limit shared by all agent runs (0 = unlimited); off by
+    # default, except for GroqCloud (see load_llm_config)
+    requests_per_minute: float = field(
+        default_factory=lambda: float(os.getenv("LLM_RATE_LIMIT_RPM", "0"))
+    )
+    burst: int = field(
+        default_factory=lambda: int(os.getenv("LLM_RATE_LIMIT_BURST", "5"))
+    )
+    # stream planning answers and start each tool call as soon as it is complete
+    stream_plan: bool = field(
+        default_factory=lambda: os.getenv("LLM_STREAM_PLAN", "0").lower() in {"1", "true", "yes"}
+    )
+    # exact-match response cache file for replays (empty = off, see llm_response_cache.py)
+    response_cache_path: str = field(
+        default_factory=lambda: os.getenv("LLM_RESPONSE_CACHE", "")
+    )
+    response_cache_max_temperature: float = field(
+        default_factory=lambda: float(os.getenv("LLM_RESPONSE_CACHE_MAX_TEMP", "0.2"))
+    )
+    response_cache_max_entries: int = field(
+        default_factory=lambda: int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "1000"))
+    )
 
 
 # ### MCP server configuration dataclass
@@ -34,6 +85,23 @@ class MCPServerConfig:
     command: str          # e.g. "npx" or "python"
     args: List[str]       # command arguments for the server
     env: Optional[Dict[str, str]] = None
+    # seconds to spawn + initialize + list tools before the server is skipped
+    startup_timeout: float = field(
+        default_factory=lambda: float(os.getenv("MCP_STARTUP_TIMEOUT", "30"))
+    )
+    # tool calls sent to this server at the same time (the others wait)
+    max_concurrency: int = field(
+        default_factory=lambda: int(os.getenv("MCP_MAX_CONCURRENCY", "4"))
+    )
+
+
+# ### Tool result cache configuration dataclass (opt-in, see tool_cache.py)
+@dataclass
+class ToolCacheConfig:
+    scope: str                    # "off", "run" (cleared per agent run) or "global"
+    max_entries: int              # LRU bound on cached results
+    default_ttl: float            # seconds, for tools annotated read-only + idempotent
+    tool_ttls: Dict[str, float]   # explicit TTL per LLM tool name (0 = never cache)
 
 
 # ### Load LLM configuration from environment variables
@@ -50,6 +118,8 @@ def load_llm_config() -> LLMConfig:
             model=os.getenv("LLM_MODEL", "llama-3.3-70b-versatile"),
             base_url=os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1"),
             api_key=api_key,
+            # remote API with per-minute quotas; local backends are not throttled
+            requests_per_minute=float(os.getenv("LLM_RATE_LIMIT_RPM", "30")),
         )
 
     if backend == "ollama":
@@ -61,9 +131,49 @@ def load_llm_config() -> LLMConfig:
             api_key=os.getenv("OLLAMA_API_KEY", "ollama"),
         )
 
+    if backend == "stub":
+        # stub_llm_server.py: OpenAI-compatible fake for tests and load runs
+        return LLMConfig(
+            backend="stub",
+            model=os.getenv("LLM_MODEL", "stub"),
+            base_url=os.getenv("STUB_LLM_URL", "http://127.0.0.1:8765/v1"),
+            api_key="stub",
+        )
+
     raise ValueError(f"Unsupported LLM_BACKEND: {backend}")
 
 
+# ### Load tool result cache configuration from env
+def load_tool_cache_config() -> ToolCacheConfig:
+    """
+    MCP_TOOL_CACHE_SCOPE=off|run|global (default off)
+    MCP_TOOL_CACHE="files__read_file=60,web__search=0"   per-tool TTL overrides
+    MCP_TOOL_CACHE_TTL=300, MCP_TOOL_CACHE_SIZE=256
+    """
+    scope = os.getenv("MCP_TOOL_CACHE_SCOPE", "off").lower()
+    if scope not in {"off", "run", "global"}:
+        raise ValueError(f"Unsupported MCP_TOOL_CACHE_SCOPE: {scope}")
+
+    tool_ttls: Dict[str, float] = {}
+    for item in os.getenv("MCP_TOOL_CACHE", "").split(","):
+        if not item.strip():
+            continue
+        name, _, ttl = item.partition("=")
+        tool_ttls[name.strip()] = float(ttl) if ttl.strip() else float(os.getenv("MCP_TOOL_CACHE_TTL", "300"))
+
+    return ToolCacheConfig(
+        scope=scope,
+        max_entries=int(os.getenv("MCP_TOOL_CACHE_SIZE", "256")),
+        default_ttl=float(os.getenv("MCP_TOOL_CACHE_TTL", "300")),
+        tool_ttls=tool_ttls,
+    )
+
+
+# ### Per-server startup timeout: MCP_<NAME>_STARTUP_TIMEOUT, else MCP_STARTUP_TIMEOUT
+def _startup_timeout(prefix: str) -> float:
+    return float(os.getenv(f"{prefix}_STARTUP_TIMEOUT", os.getenv("MCP_STARTUP_TIMEOUT", "30")))
+
+
 # ### Load MCP servers configuration from env (Part 2)
 def load_mcp_server_configs() -> List[MCPServerConfig]:
     """
@@ -83,6 +193,7 @@ def load_mcp_server_configs() -> List[MCPServerConfig]:
                 name="files",
                 command=os.getenv("MCP_FILES_CMD", "npx"),
                 args=files_args.split(),
+                startup_timeout=_startup_timeout("MCP_FILES"),
             )
         )
         external_count += 1
@@ -95,6 +206,7 @@ def load_mcp_server_configs() -> List[MCPServerConfig]:
                 name="web",
                 command=os.getenv("MCP_WEB_CMD", "npx"),
                 args=web_args.split(),
+                startup_timeout=_startup_timeout("MCP_WEB"),
             )
         )
         external_count += 1
@@ -112,6 +224,7 @@ def load_mcp_server_configs() -> List[MCPServerConfig]:
             name="local_insights",
             command=os.getenv("MCP_LOCAL_CMD", "python"),
             args=local_args.split(),
+            startup_timeout=_startup_timeout("MCP_LOCAL"),
         )
     )
 
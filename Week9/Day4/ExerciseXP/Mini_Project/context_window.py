@@ -0,0 +1,119 @@
+# Mini Project – MCP Agentic Application (Part 1 + Part 2)
+# This module keeps the agent's conversation under a token budget:
+# - Tracks an approximate token count of every message (~4 characters per token)
+# - Beyond the budget, replaces the tool outputs of older steps with short
+#   references (tool, size, first line) and keeps the most recent steps verbatim
+# - Never removes a message, so every assistant tool_call keeps its tool answer
+#   (OpenAI-compatible APIs reject unpaired tool_call ids)
+# orchestrator.py sends ContextWindow.messages to plan_with_llm(...) at every step.
+
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4  # role, separators, ...
+ASSISTANT_TEXT_KEEP_CHARS = 300
+
+
+def approx_tokens(value: Any) -> int:
+    """Cheap token estimate: no tokenizer, good enough to stay under a budget."""
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    tokens = MESSAGE_OVERHEAD_TOKENS + approx_tokens(message.get("content") or "")
+    if message.get("tool_calls"):
+        tokens += approx_tokens(message["tool_calls"])
+    return tokens
+
+
+class ContextWindow:
+    """
+    Messages sent to the LLM, compacted oldest-first once they exceed `budget` tokens.
+
+    - the first `pinned` messages (system prompt + user goal) are never touched
+    - the last `keep_recent_steps` steps (assistant message + its tool messages)
+      stay verbatim
+    - `reserved` tokens are counted for what is sent with every request (tools spec)
+    """
+
+    def __init__(
+        self,
+        budget: int = 6000,
+        keep_recent_steps: int = 2,
+        reserved: int = 0,
+        pinned: int = 2,
+    ) -> None:
+        self.budget = budget
+        self.keep_recent_steps = keep_recent_steps
+        self.reserved = reserved
+        self.pinned = pinned
+        self.messages: List[Dict[str, Any]] = []
+        self._tokens: List[int] = []
+        self.compacted_messages = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.reserved + sum(self._tokens)
+
+    def append(self, message: Dict[str, Any]) -> None:
+        self.messages.append(message)
+        self._tokens.append(message_tokens(message))
+
+    def compact(self) -> None:
+        """Shrink older steps until the conversation fits the budget (or nothing is left to shrink)."""
+        if self.total_tokens <= self.budget:
+            return
+
+        old = self._older_indexes()
+        # 1) Old tool outputs → references
+        for i in old:
+            if self.total_tokens <= self.budget:
+                return
+            if self.messages[i].get("role") == "tool":
+                self._replace_content(i, _tool_reference(self.messages[i]))
+        # 2) Long assistant texts of old steps → truncated (their tool_calls stay)
+        for i in old:
+            if self.total_tokens <= self.budget:
+                return
+            content = self.messages[i].get("content") or ""
+            if self.messages[i].get("role") == "assistant" and len(content) > ASSISTANT_TEXT_KEEP_CHARS:
+                self._replace_content(i, content[:ASSISTANT_TEXT_KEEP_CHARS] + " […]")
+
+    def _older_indexes(self) -> List[int]:
+        """Indexes of messages before the last `keep_recent_steps` assistant messages."""
+        assistant_indexes = [
+            i for i in range(self.pinned, len(self.messages))
+            if self.messages[i].get("role") == "assistant"
+        ]
+        if len(assistant_indexes) <= self.keep_recent_steps:
+            return []
+        cutoff = (
+            assistant_indexes[-self.keep_recent_steps]
+            if self.keep_recent_steps > 0
+            else len(self.messages)
+        )
+        return list(range(self.pinned, cutoff))
+
+    def _replace_content(self, index: int, content: str) -> None:
+        if self.messages[index].get("content") == content:
+            return
+        # Copy so callers holding the original dict (e.g. logs) keep the full text
+        self.messages[index] = {**self.messages[index], "content": content}
+        self._tokens[index] = message_tokens(self.messages[index])
+        self.compacted_messages += 1
+
+
+def _tool_reference(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if content.startswith("[compacted"):
+        return content
+    first_line = content.strip().splitlines()[0][:120] if content.strip() else ""
+    return (
+        f"[compacted output of '{message.get('name')}', {len(content)} chars; "
+        f"starts with: {first_line!r}. Call the tool again if the full result is needed.]"
+    )
@@ -3,17 +3,39 @@
 # - Uses OpenAI-compatible API (GroqCloud or Ollama) with config from config.py
 # - Provides planning for the agent (tool selection via function calling)
 # - Is used directly by orchestrator.py to decide which MCP tools to call.
+# - Async (AsyncOpenAI over one pooled HTTP client per event loop), created lazily:
+#   importing this module does not need API keys
+# - Retries 429 / 5xx / connection errors with exponential backoff + jitter,
+#   honoring Retry-After, and shares one token-bucket limiter across all runs
+# - Streaming plan mode: tool_calls are rebuilt from the stream and each one is
+#   handed to the orchestrator as soon as its arguments are complete
+# - LLM_BACKEND=stub points it at stub_llm_server.py for local tests.
+# - Optional exact-match response cache (LLM_RESPONSE_CACHE) to replay runs offline
 # The MCP server with custom tools is defined separately in my_mcp_server.py.
 
 
 from __future__ import annotations
 
+import asyncio
+import json
+import random
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Set
 import logging
 
-from openai import OpenAI
-from config import load_llm_config
+import httpx
+from openai import (
+    APIConnectionError,
+    APIError,
+    APIStatusError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+)
+from config import LLMConfig, load_llm_config
+from llm_response_cache import LLMResponseCache
 
 
 logger = logging.getLogger("llm_client")
@@ -28,27 +50,167 @@ class LLMRuntimeConfig:
     api_key: str
 
 
+# Called with (index, tool_call) for each tool call of a streamed answer
+ToolCallCallback = Callable[[int, Dict[str, Any]], None]
+
+
+# ### Shared rate limiter
+class TokenBucket:
+    """
+    Token bucket shared by every LLM call of the process (all agent runs, all
+    event loops): `rate` requests per second, bursts up to `capacity`.
+    A 429 with Retry-After pauses the whole bucket, not only the caller.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return  # unlimited
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+_bucket: Optional[TokenBucket] = None
+_bucket_lock = threading.Lock()
+
+
+def shared_bucket(cfg: LLMConfig) -> TokenBucket:
+    global _bucket
+    with _bucket_lock:
+        if _bucket is None:
+            _bucket = TokenBucket(cfg.requests_per_minute / 60.0, cfg.burst)
+        return _bucket
+
+
+def _arguments_complete(call: Dict[str, Any]) -> bool:
+    """A streamed tool call is ready once it has an id, a name and a JSON object as arguments."""
+    arguments = call["function"]["arguments"].rstrip()
+    if not call["id"] or not call["function"]["name"] or not arguments.endswith("}"):
+        return False
+    try:
+        return isinstance(json.loads(arguments), dict)
+    except ValueError:
+        return False
+
+
+def _retry_after_seconds(response: Optional[httpx.Response]) -> Optional[float]:
+    """Retry-After (seconds or HTTP date) / retry-after-ms from an error response."""
+    if response is None:
+        return None
+    headers = response.headers
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
 class LLMClient:
     """
     Wrapper autour de l'API OpenAI-compatible (GroqCloud ou Ollama).
     - Validation stricte des inputs
-    - Gestion d’erreur robuste
+    - Gestion d’erreur robuste (retries + backoff, Retry-After, rate limit partagé)
     - Logging propre
     """
 
     def __init__(self) -> None:
-        cfg = load_llm_config()
-        self.config = LLMRuntimeConfig(
-            backend=cfg.backend,
-            model=cfg.model,
-            base_url=cfg.base_url,
-            api_key=cfg.api_key,
-        )
+        # Rien n'est chargé ici : la config (et donc les clés) est lue au premier appel
+        self.config: Optional[LLMRuntimeConfig] = None
+        self._llm_cfg: Optional[LLMConfig] = None
+        self._client: Optional[AsyncOpenAI] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._response_cache: Optional[LLMResponseCache] = None
 
-        self.client = OpenAI(
-            api_key=self.config.api_key,
-            base_url=self.config.base_url,
-        )
+    def _get_client(self) -> AsyncOpenAI:
+        """One pooled client per event loop (httpx connections belong to a loop)."""
+        if self._llm_cfg is None:
+            cfg = load_llm_config()
+            self._llm_cfg = cfg
+            self.config = LLMRuntimeConfig(
+                backend=cfg.backend,
+                model=cfg.model,
+                base_url=cfg.base_url,
+                api_key=cfg.api_key,
+            )
+            if cfg.response_cache_path:
+                self._response_cache = LLMResponseCache(
+                    cfg.response_cache_path,
+                    cfg.response_cache_max_temperature,
+                    cfg.response_cache_max_entries,
+                )
+
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._release_foreign_client()
+            cfg = self._llm_cfg
+            self._client = AsyncOpenAI(
+                api_key=cfg.api_key,
+                base_url=cfg.base_url,
+                max_retries=0,  # retries are done below, with the shared limiter
+                timeout=cfg.timeout,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=cfg.max_connections,
+                        max_keepalive_connections=cfg.max_connections,
+                    ),
+                ),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the HTTP pool; call it before the event loop that created it ends."""
+        if self._client is None:
+            return
+        if self._client_loop is asyncio.get_running_loop():
+            client, self._client, self._client_loop = self._client, None, None
+            await client.close()
+        else:
+            self._release_foreign_client()
+
+    def _release_foreign_client(self) -> None:
+        """Close a client created on another event loop (its connections belong to that loop)."""
+        client, loop = self._client, self._client_loop
+        self._client, self._client_loop = None, None
+        if client is None or loop is None:
+            return
+        if loop.is_running():
+            # e.g. the MCP pool thread: close it there
+            asyncio.run_coroutine_threadsafe(client.close(), loop)
+        else:
+            logger.warning(
+                "LLM client dropped after its event loop closed; "
+                "await close_llm_client() before the loop ends."
+            )
 
     @staticmethod
     def _validate_messages(messages: List[Dict[str, Any]]) -> None:
@@ -71,7 +233,7 @@ class LLMClient:
             if "name" not in fn or "parameters" not in fn:
                 raise ValueError("Each tool must define 'name' and 'parameters'.")
 
-    def plan(
+    async def plan(
         self,
         messages: List[Dict[str, Any]],
         tools_for_llm: List[Dict[str, Any]],
@@ -82,14 +244,22 @@ class LLMClient:
 
         self._validate_messages(messages)
         self._validate_tools(tools_for_llm)
+        client = self._get_client()
+
+        cache_key = self._cache_key(messages, tools_for_llm, temperature, max_tokens)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"LLM response cache hit ({cache_key[:12]})")
+                return cached
 
         logger.info(
             f"LLM request: backend={self.config.backend}, model={self.config.model}, "
             f"messages={len(messages)}, tools={len(tools_for_llm)}"
         )
 
-        try:
-            response = self.client.chat.completions.create(
+        response = await self._with_retries(
+            lambda: client.chat.completions.create(
                 model=self.config.model,
                 messages=messages,
                 tools=tools_for_llm,
@@ -97,9 +267,7 @@ class LLMClient:
                 temperature=temperature,
                 max_tokens=max_tokens,
             )
-        except Exception as e:  # noqa: BLE001
-            logger.exception("LLM call failed.")
-            raise RuntimeError(f"LLM call failed: {e}") from e
+        )
 
         msg = response.choices[0].message.to_dict()
 
@@ -108,22 +276,184 @@ class LLMClient:
             f"tool_calls={bool(msg.get('tool_calls'))}"
         )
 
+        if cache_key is not None:
+            self._response_cache.put(cache_key, msg)
+        return msg
+
+    async def plan_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tools_for_llm: List[Dict[str, Any]],
+        on_tool_call: ToolCallCallback,
+        temperature: float = 0.15,
+        max_tokens: int = 800,
+    ) -> Dict[str, Any]:
+        """
+        Comme plan(), mais en streaming : on_tool_call(index, tool_call) est appelé
+        dès que les arguments d'un appel forment un objet JSON complet, pendant que
+        le modèle écrit la suite. Les appels dont les arguments ne se décodent
+        jamais sont passés en fin de flux (l'orchestrateur rapporte l'erreur).
+        Chaque appel est passé exactement une fois.
+        """
+
+        self._validate_messages(messages)
+        self._validate_tools(tools_for_llm)
+        client = self._get_client()
+
+        cache_key = self._cache_key(messages, tools_for_llm, temperature, max_tokens)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"LLM response cache hit ({cache_key[:12]})")
+                for index, call in enumerate(cached.get("tool_calls") or []):
+                    on_tool_call(index, call)
+                return cached
+
+        logger.info(
+            f"LLM stream request: backend={self.config.backend}, model={self.config.model}, "
+            f"messages={len(messages)}, tools={len(tools_for_llm)}"
+        )
+
+        # Only opening the stream is retried: once a call is dispatched it cannot be undone
+        stream = await self._with_retries(
+            lambda: client.chat.completions.create(
+                model=self.config.model,
+                messages=messages,
+                tools=tools_for_llm,
+                tool_choice="auto",
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+        )
+
+        content_parts: List[str] = []
+        calls: Dict[int, Dict[str, Any]] = {}
+        dispatched: Set[int] = set()
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content_parts.append(delta.content)
+                for part in delta.tool_calls or []:
+                    call = calls.setdefault(
+                        part.index,
+                        {"id": "", "type": "function", "function": {"name": "", "arguments": ""}},
+                    )
+                    if part.id:
+                        call["id"] = part.id
+                    if part.function is not None:
+                        call["function"]["name"] += part.function.name or ""
+                        call["function"]["arguments"] += part.function.arguments or ""
+                    if part.index not in dispatched and _arguments_complete(call):
+                        dispatched.add(part.index)
+                        on_tool_call(part.index, call)
+        except (APIError, httpx.HTTPError) as e:
+            logger.error(f"LLM stream failed: {e}")
+            raise RuntimeError(f"LLM stream failed: {e}") from e
+        finally:
+            await stream.close()
+
+        for index in sorted(calls):
+            if index not in dispatched:
+                on_tool_call(index, calls[index])
+
+        msg: Dict[str, Any] = {"role": "assistant", "content": "".join(content_parts) or None}
+        if calls:
+            msg["tool_calls"] = [calls[i] for i in sorted(calls)]
+
+        logger.info(
+            f"LLM stream returned tool_calls={len(calls)} "
+            f"(dispatched early: {len(dispatched)})"
+        )
+
+        if cache_key is not None:
+            self._response_cache.put(cache_key, msg)
         return msg
 
+    def _cache_key(
+        self,
+        messages: List[Dict[str, Any]],
+        tools_for_llm: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+    ) -> Optional[str]:
+        if self._response_cache is None:
+            return None
+        return self._response_cache.key(
+            self.config.model, messages, tools_for_llm, temperature, max_tokens
+        )
+
+    async def _with_retries(self, request):
+        """
+        Run `request()` after taking a token from the shared bucket; retry 429,
+        5xx and connection errors with exponential backoff + full jitter.
+        """
+        cfg = self._llm_cfg
+        bucket = shared_bucket(cfg)
+        for attempt in range(cfg.max_retries + 1):
+            await bucket.acquire()
+            try:
+                return await request()
+            except APIStatusError as e:
+                retryable = e.status_code == 429 or e.status_code >= 500
+                error: Exception = e
+                retry_after = _retry_after_seconds(e.response)
+            except APIConnectionError as e:  # includes timeouts
+                retryable, error, retry_after = True, e, None
+            except Exception as e:  # noqa: BLE001
+                retryable, error, retry_after = False, e, None
+
+            if not retryable or attempt == cfg.max_retries:
+                logger.error(f"LLM call failed after {attempt + 1} attempt(s): {error}")
+                raise RuntimeError(f"LLM call failed: {error}") from error
+
+            delay = random.uniform(0, min(cfg.backoff_max, cfg.backoff_base * 2 ** attempt))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+                bucket.pause(retry_after)  # the limit applies to every concurrent run
+            logger.warning(
+                f"LLM call failed ({error}); retry {attempt + 1}/{cfg.max_retries} in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
 
-# Instance globale utilisée par l’orchestrateur
+
+# Instance globale utilisée par l’orchestrateur (partagée par les runs concurrents)
 _global_llm = LLMClient()
 
 
-def plan_with_llm(
+async def close_llm_client() -> None:
+    """Close the shared client's HTTP pool (end of an asyncio.run, app shutdown)."""
+    await _global_llm.aclose()
+
+
+async def plan_with_llm(
+    messages: List[Dict[str, Any]],
+    tools_for_llm: List[Dict[str, Any]],
+    temperature: float = 0.15,
+    max_tokens: int = 800,
+) -> Dict[str, Any]:
+    return await _global_llm.plan(
+        messages=messages,
+        tools_for_llm=tools_for_llm,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
+
+
+async def plan_with_llm_stream(
     messages: List[Dict[str, Any]],
     tools_for_llm: List[Dict[str, Any]],
+    on_tool_call: ToolCallCallback,
     temperature: float = 0.15,
     max_tokens: int = 800,
 ) -> Dict[str, Any]:
-    return _global_llm.plan(
+    return await _global_llm.plan_stream(
         messages=messages,
         tools_for_llm=tools_for_llm,
+        on_tool_call=on_tool_call,
         temperature=temperature,
         max_tokens=max_tokens,
     )
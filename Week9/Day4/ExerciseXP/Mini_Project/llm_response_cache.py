@@ -0,0 +1,109 @@
+# Mini Project – MCP Agentic Application (Part 1 + Part 2)
+# This module implements the opt-in LLM response cache used by llm_client.py:
+# - Exact match: key = hash of model + messages + tools + temperature + max_tokens
+#   (canonical JSON, so dict key order does not matter)
+# - Only low-temperature requests are cached (LLM_RESPONSE_CACHE_MAX_TEMP):
+#   the goal is deterministic replays in tests and demos, not a semantic cache
+# - Persisted to one JSON file (LLM_RESPONSE_CACHE), written atomically, so a
+#   recorded session replays without calling the API again.
+# - Bounded LRU (LLM_RESPONSE_CACHE_SIZE entries): the least recently used
+#   responses are dropped first, so a long recording cannot grow without limit
+
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tool_cache import stable_hash
+
+
+class LLMResponseCache:
+    """Thread-safe LRU of request hash -> assistant message, backed by a JSON file."""
+
+    def __init__(self, path: str | Path, max_temperature: float = 0.2, max_entries: int = 1000) -> None:
+        self.path = Path(path)
+        self.max_temperature = max_temperature
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def key(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+    ) -> Optional[str]:
+        """Cache key of a request, or None when it is not cacheable (temperature too high)."""
+        if temperature > self.max_temperature:
+            return None
+        return stable_hash(
+            {
+                "model": model,
+                "messages": messages,
+                "tools": tools,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+            }
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            message = self._entries.get(key)
+            if message is not None:
+                self._entries.move_to_end(key)
+        # Copy: the caller appends it to its conversation
+        return copy.deepcopy(message) if message is not None else None
+
+    def put(self, key: str, message: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = copy.deepcopy(message)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            try:
+                self._save()
+            except BaseException:
+                self._entries.pop(key, None)  # do not keep what the file does not have
+                raise
+
+    # ### Persistence (file order = least recently used first)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return  # a broken file is just an empty cache
+        if not isinstance(data, dict):
+            return
+        self._entries.update((k, v) for k, v in data.items() if isinstance(v, dict))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self) -> None:
+        """Caller holds the lock. Readers see the old file or the new one, never a partial write."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
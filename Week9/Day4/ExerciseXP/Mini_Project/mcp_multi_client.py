@@ -20,14 +20,31 @@
 
 from __future__ import annotations
 
-from contextlib import AsyncExitStack
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import fastjsonschema
 from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 
-from config import MCPServerConfig, load_mcp_server_configs
+from config import MCPServerConfig, ToolCacheConfig, load_mcp_server_configs, load_tool_cache_config
+from tool_cache import ToolResultCache, cache_for_scope, stable_hash, tool_ttl
+
+
+def _compile_validator(schema: Dict[str, Any]) -> Optional[Callable[[Any], Any]]:
+    """Compile once per tool; defaults are not injected and `format` is not enforced."""
+    try:
+        return fastjsonschema.compile(schema, use_default=False, use_formats=False)
+    except Exception:  # noqa: BLE001 - unsupported schema: fall back to the required-keys check
+        return None
+
+
+def _describe_error(exc: BaseException) -> str:
+    """One line for an error, looking inside the ExceptionGroups raised by anyio task groups."""
+    while isinstance(exc, BaseExceptionGroup) and exc.exceptions:
+        exc = exc.exceptions[0]
+    return f"{type(exc).__name__}: {exc}"
 
 
 @dataclass
@@ -38,14 +55,29 @@ class ToolDescriptor:
     tool_name: str         # ex: "clean_text"
     description: str
     input_schema: Dict[str, Any]
+    cache_ttl: float = 0.0  # seconds a result may be reused (0 = not cached)
+    # compiled JSON Schema check (None: schema could not be compiled → required keys only)
+    validator: Optional[Callable[[Any], Any]] = field(default=None, repr=False, compare=False)
+
+    def validate(self, arguments: Dict[str, Any]) -> Optional[str]:
+        """Compact error for the LLM (types, enums, bounds...), or None if the arguments are valid."""
+        if self.validator is None:
+            missing = [r for r in self.input_schema.get("required", []) if r not in arguments]
+            return f"missing required parameters {missing}" if missing else None
+        try:
+            self.validator(arguments)
+        except fastjsonschema.JsonSchemaValueException as e:
+            return e.message.replace("data", "arguments", 1)
+        return None
 
 
 class MCPMultiClient:
     """
     Manage plusieurs sessions MCP en même temps :
-    - démarre les serveurs via stdio (command + args)
-    - initialise les sessions MCP
-    - découvre tous les outils
+    - démarre les serveurs via stdio (command + args), tous en parallèle
+    - initialise les sessions MCP et découvre leurs outils
+    - un serveur qui échoue ou dépasse son startup_timeout est ignoré
+      (mode dégradé, voir `degraded`)
     - fournit une API unifiée pour appeler un outil par son nom LLM (namespacé)
     """
 
@@ -53,78 +85,181 @@ class MCPMultiClient:
         self,
         server_configs: Optional[List[MCPServerConfig]] = None,
         debug: bool = False,
+        cache_config: Optional[ToolCacheConfig] = None,
     ) -> None:
         # Si pas de config fournie, on charge depuis les variables d'env
         self.server_configs = server_configs or load_mcp_server_configs()
-        self._exit_stack: Optional[AsyncExitStack] = None
+        self.cache_config = cache_config or load_tool_cache_config()
+        # Cache de résultats (opt-in) : None si MCP_TOOL_CACHE_SCOPE=off
+        self.result_cache: Optional[ToolResultCache] = cache_for_scope(self.cache_config)
         self.sessions: Dict[str, ClientSession] = {}
         self.tools: Dict[str, ToolDescriptor] = {}
+        self.degraded: Dict[str, str] = {}  # server name -> why it was skipped
         self.debug = debug
+        # server name -> (runner task, stop event) / tools listed at startup
+        self._runners: Dict[str, Tuple[asyncio.Task, asyncio.Event]] = {}
+        self._listed: Dict[str, List[types.Tool]] = {}
+        # LLM tools spec, built once per tool registry (see build_llm_tools_spec)
+        self._tools_spec: Optional[List[Dict[str, Any]]] = None
+        self.tools_spec_hash: str = ""
+        # per-server limit on concurrent tool calls, so one stdio server is not flooded
+        self._call_limits: Dict[str, asyncio.Semaphore] = {
+            cfg.name: asyncio.Semaphore(max(1, cfg.max_concurrency)) for cfg in self.server_configs
+        }
 
     async def __aenter__(self) -> "MCPMultiClient":
-        self._exit_stack = AsyncExitStack()
-
-        # Démarrage et initialisation de chaque serveur MCP
-        for cfg in self.server_configs:
-            if self.debug:
-                print(f"[MCP] Starting server '{cfg.name}' → {cfg.command} {' '.join(cfg.args)}")
-
-            server_params = StdioServerParameters(
-                command=cfg.command,
-                args=cfg.args,
-                env=cfg.env,
-            )
-
-            read_stream, write_stream = await self._exit_stack.enter_async_context(
-                stdio_client(server_params)
-            )
-
-            session = ClientSession(read_stream, write_stream)
-            await session.initialize()
-            self.sessions[cfg.name] = session
-
-        # Découverte des outils sur chaque serveur
-        await self._discover_tools()
+        # Démarrage, initialisation et list_tools de tous les serveurs en même temps :
+        # le démarrage à froid dure autant que le serveur le plus lent.
+        async with asyncio.TaskGroup() as tg:
+            for cfg in self.server_configs:
+                tg.create_task(self._start_server(cfg))
+
+        for name, reason in self.degraded.items():
+            print(f"[MCP] Degraded mode: server '{name}' skipped ({reason})")
+        if not self.sessions:
+            await self.__aexit__(None, None, None)
+            raise RuntimeError(f"No MCP server could be started: {self.degraded}")
+
+        self._register_tools()
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
-        if self._exit_stack is not None:
-            await self._exit_stack.aclose()
+        await asyncio.gather(
+            *(self._stop_server(name) for name in list(self._runners)),
+            return_exceptions=True,
+        )
         self.sessions.clear()
         self.tools.clear()
+        self._listed.clear()
+        self._tools_spec = None
+
+    # ### Health checks and restarts (used by mcp_pool.py)
+
+    async def unhealthy_servers(self, timeout: float = 5.0) -> List[str]:
+        """Servers that are down: skipped at startup, crashed, or not answering a ping."""
+        async def ping(name: str, session: ClientSession) -> Optional[str]:
+            try:
+                await asyncio.wait_for(session.send_ping(), timeout)
+                return None
+            except Exception:  # noqa: BLE001
+                return name
+
+        failed = await asyncio.gather(*(ping(n, s) for n, s in list(self.sessions.items())))
+        down = {name for name in failed if name}
+        return [cfg.name for cfg in self.server_configs if cfg.name not in self.sessions or cfg.name in down]
+
+    async def restart_server(self, name: str) -> bool:
+        """Stop and start one server again, then rebuild the tool registry."""
+        cfg = next(c for c in self.server_configs if c.name == name)
+        await self._stop_server(name)
+        self.sessions.pop(name, None)
+        self._listed.pop(name, None)
+        self.degraded.pop(name, None)
+        await self._start_server(cfg)
+        self._register_tools()
+        if name in self.degraded:
+            print(f"[MCP] Restart of server '{name}' failed ({self.degraded[name]})")
+        return name in self.sessions
+
+    # ### Server lifecycle
+
+    async def _start_server(self, cfg: MCPServerConfig) -> None:
+        """Start one server within its timeout; failures are recorded, never raised."""
+        if self.debug:
+            print(f"[MCP] Starting server '{cfg.name}' → {cfg.command} {' '.join(cfg.args)}")
+
+        ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        runner = asyncio.create_task(self._serve(cfg, ready, stop), name=f"mcp-{cfg.name}")
+        self._runners[cfg.name] = (runner, stop)
+        try:
+            session, tools = await asyncio.wait_for(asyncio.shield(ready), cfg.startup_timeout)
+        except asyncio.TimeoutError:
+            runner.cancel()
+            self.degraded[cfg.name] = f"no answer within {cfg.startup_timeout:g}s"
+            return
+        except Exception as e:  # noqa: BLE001
+            self.degraded[cfg.name] = _describe_error(e)
+            return
+
+        self.sessions[cfg.name] = session
+        self._listed[cfg.name] = tools
+        if self.debug:
+            print(f"[MCP] Server '{cfg.name}' exposes {len(tools)} tools")
+
+    async def _stop_server(self, name: str) -> None:
+        runner, stop = self._runners.pop(name, (None, None))
+        if runner is None:
+            return
+        stop.set()
+        try:
+            await asyncio.wait_for(runner, 10)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass  # wait_for cancels the runner on timeout
+
+    async def _serve(self, cfg: MCPServerConfig, ready: asyncio.Future, stop: asyncio.Event) -> None:
+        """
+        Keep one server's stdio transport and session open until `stop` is set.
 
-    async def _discover_tools(self) -> None:
-        """Discover tools on all MCP servers and build a registry."""
-        for server_name, session in self.sessions.items():
-            result: types.ListToolsResult = await session.list_tools()
-
-            if self.debug:
-                print(f"[MCP] Server '{server_name}' exposes {len(result.tools)} tools")
+        The contexts are entered and exited in this same task, as anyio
+        requires for the task groups inside stdio_client and ClientSession.
+        """
+        server_params = StdioServerParameters(
+            command=cfg.command,
+            args=cfg.args,
+            env=cfg.env,
+        )
+        try:
+            async with stdio_client(server_params) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    result: types.ListToolsResult = await session.list_tools()
+                    ready.set_result((session, result.tools))
+                    await stop.wait()
+        except Exception as e:  # noqa: BLE001
+            if not ready.done():
+                ready.set_exception(e)
+                return
+            print(f"[MCP] Server '{cfg.name}' stopped: {_describe_error(e)}")
+            self.degraded[cfg.name] = f"stopped: {_describe_error(e)}"
+            self.sessions.pop(cfg.name, None)
+
+    def _register_tools(self) -> None:
+        """Tool registry in config order (stable from one start to the next)."""
+        self.tools.clear()
+        self._tools_spec = None  # rebuilt (same bytes if the tools did not change)
+        for cfg in self.server_configs:
+            if cfg.name in self._listed:
+                self._discover_tools(cfg.name, self._listed[cfg.name])
 
-            for tool in result.tools:
-                llm_name = f"{server_name}__{tool.name}"
+    def _discover_tools(self, server_name: str, tools: List[types.Tool]) -> None:
+        """Register the tools listed by one server under namespaced LLM names."""
+        for tool in tools:
+            llm_name = f"{server_name}__{tool.name}"
 
-                input_schema = tool.inputSchema or {
-                    "type": "object",
-                    "properties": {},
-                    "required": [],
-                }
+            input_schema = tool.inputSchema or {
+                "type": "object",
+                "properties": {},
+                "required": [],
+            }
 
-                td = ToolDescriptor(
-                    llm_name=llm_name,
-                    server_name=server_name,
-                    tool_name=tool.name,
-                    description=tool.description or "",
-                    input_schema=input_schema,
-                )
+            td = ToolDescriptor(
+                llm_name=llm_name,
+                server_name=server_name,
+                tool_name=tool.name,
+                description=tool.description or "",
+                input_schema=input_schema,
+                cache_ttl=tool_ttl(self.cache_config, llm_name, tool.annotations),
+                validator=_compile_validator(input_schema),
+            )
 
-                self.tools[llm_name] = td
+            self.tools[llm_name] = td
 
-                if self.debug:
-                    print(
-                        f"  → Registered tool '{llm_name}' "
-                        f"(server={server_name}, original={tool.name})"
-                    )
+            if self.debug:
+                print(
+                    f"  → Registered tool '{llm_name}' "
+                    f"(server={server_name}, original={tool.name})"
+                )
 
     def build_llm_tools_spec(self) -> List[Dict[str, Any]]:
         """
@@ -132,7 +267,15 @@ class MCPMultiClient:
 
         Ce résultat est passé à l'LLM dans `tools=...` pour permettre à l'LLM
         de planifier des tool_calls.
+
+        Construit une seule fois par registre d'outils puis réutilisé : chaque
+        requête envoie la même liste (mêmes octets), ce qui permet au fournisseur
+        de réutiliser son cache de préfixe. Ne pas modifier la liste renvoyée.
+        `tools_spec_hash` identifie son contenu.
         """
+        if self._tools_spec is not None:
+            return self._tools_spec
+
         tools_for_llm: List[Dict[str, Any]] = []
 
         for td in self.tools.values():
@@ -152,8 +295,14 @@ class MCPMultiClient:
                 }
             )
 
+        self._tools_spec = tools_for_llm
+        self.tools_spec_hash = stable_hash(tools_for_llm)
+
         if self.debug:
-            print(f"[MCP] Built LLM tools spec with {len(tools_for_llm)} tools")
+            print(
+                f"[MCP] Built LLM tools spec with {len(tools_for_llm)} tools "
+                f"(hash {self.tools_spec_hash[:12]})"
+            )
 
         return tools_for_llm
 
@@ -162,10 +311,27 @@ class MCPMultiClient:
         Appelle un outil via son nom LLM (namespacé).
         Exemple : "local_insights__generate_insights"
         """
+        output, _ = await self.call_tool_cached(llm_tool_name, arguments)
+        return output
+
+    async def call_tool_cached(
+        self, llm_tool_name: str, arguments: Dict[str, Any]
+    ) -> Tuple[str, int]:
+        """
+        Comme call_tool, mais renvoie aussi le nombre de hits du cache pour
+        ces arguments (0 = appel réel au serveur).
+        """
         td = self.tools.get(llm_tool_name)
         if not td:
             raise ValueError(f"Unknown tool name from LLM: '{llm_tool_name}'")
 
+        if self.result_cache is not None and td.cache_ttl > 0:
+            cached = self.result_cache.get(llm_tool_name, arguments)
+            if cached is not None:
+                if self.debug:
+                    print(f"[MCP] Cache hit for '{llm_tool_name}' (hits={cached[1]})")
+                return cached
+
         session = self.sessions.get(td.server_name)
         if not session:
             raise RuntimeError(
@@ -176,7 +342,8 @@ class MCPMultiClient:
         if self.debug:
             print(f"[MCP] Calling '{llm_tool_name}' on server '{td.server_name}' with args={arguments}")
 
-        result = await session.call_tool(td.tool_name, arguments=arguments)
+        async with self._call_limits[td.server_name]:
+            result = await session.call_tool(td.tool_name, arguments=arguments)
 
         # Flatten text content from MCP result
         parts: List[str] = []
@@ -194,4 +361,8 @@ class MCPMultiClient:
             preview = output[:200].replace("\n", " ")
             print(f"[MCP] Result from '{llm_tool_name}': {preview}...")
 
-        return output
+        # Errors are never cached: the next call should really retry
+        if self.result_cache is not None and td.cache_ttl > 0 and not result.isError:
+            self.result_cache.put(llm_tool_name, arguments, output, td.cache_ttl)
+
+        return output, 0
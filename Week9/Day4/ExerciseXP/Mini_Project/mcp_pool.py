@@ -0,0 +1,161 @@
+# Mini Project – MCP Agentic Application (Part 1 + Part 2)
+# This module keeps MCP servers alive across agent runs:
+# - A background thread runs one asyncio event loop for the whole process
+# - That loop owns `size` started MCPMultiClient instances (one set of server
+#   processes each), handed out to agent runs from an idle list
+# - A health check waits for each client in turn, pings its servers and
+#   restarts the ones that crashed, stopped answering, or were skipped at
+#   startup; clients that could not start at all are retried there too
+# app.py creates one pool per Streamlit process (st.cache_resource) and
+# run_agent_sync(...) runs each goal on it, so a click only costs LLM + tool time.
+
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, TypeVar
+
+from config import MCPServerConfig, load_mcp_server_configs
+from llm_client import close_llm_client
+from mcp_multi_client import MCPMultiClient
+
+T = TypeVar("T")
+
+
+class MCPPool:
+    """
+    Pool de clients MCP résidents :
+    - start() lance la boucle asyncio de fond et démarre tous les clients
+    - run(fn) exécute fn(client) sur la boucle avec un client emprunté
+      (appelable depuis n'importe quel thread, ex: un rerun Streamlit)
+    - close() arrête les serveurs et la boucle
+    """
+
+    def __init__(
+        self,
+        server_configs: Optional[List[MCPServerConfig]] = None,
+        size: int = 2,
+        health_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+        debug: bool = False,
+    ) -> None:
+        self.server_configs = server_configs or load_mcp_server_configs()
+        self.size = max(1, size)
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.debug = debug
+        self.clients: List[MCPMultiClient] = []
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mcp-pool", daemon=True)
+        self._idle: List[MCPMultiClient] = []
+        self._idle_changed: Optional[asyncio.Condition] = None
+        self._failed = 0  # clients that could not start, retried by the health loop
+        self._health_task: Optional[asyncio.Task] = None
+
+    # ### Thread-safe API
+
+    def start(self) -> "MCPPool":
+        self._thread.start()
+        try:
+            self._submit(self._start()).result()
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def run(self, fn: Callable[[MCPMultiClient], Awaitable[T]]) -> T:
+        """Run fn(client) on the pool loop with a leased client and wait for the result."""
+
+        async def leased() -> T:
+            async with self.lease() as client:
+                return await fn(client)
+
+        return self._submit(leased()).result()
+
+    def close(self) -> None:
+        if not self._loop.is_running():
+            return
+        try:
+            self._submit(self._close()).result(timeout=30)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def _submit(self, coro: Awaitable[T]):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # ### On the pool loop
+
+    @asynccontextmanager
+    async def lease(self, client: Optional[MCPMultiClient] = None) -> AsyncIterator[MCPMultiClient]:
+        """
+        Borrow an idle client (or wait for that `client` to be idle);
+        concurrent runs beyond `size` wait for one.
+        """
+        async with self._idle_changed:
+            if client is None:
+                await self._idle_changed.wait_for(lambda: bool(self._idle))
+                client = self._idle.pop(0)
+            else:
+                await self._idle_changed.wait_for(lambda: client in self._idle)
+                self._idle.remove(client)
+        try:
+            yield client
+        finally:
+            await self._add_idle(client)
+
+    async def _add_idle(self, client: MCPMultiClient) -> None:
+        async with self._idle_changed:
+            self._idle.append(client)
+            self._idle_changed.notify_all()
+
+    async def _start_clients(self, count: int) -> int:
+        """Start `count` new clients and make them available; returns how many failed."""
+        clients = [MCPMultiClient(self.server_configs, debug=self.debug) for _ in range(count)]
+        started = await asyncio.gather(*(c.__aenter__() for c in clients), return_exceptions=True)
+        failed = 0
+        for client, result in zip(clients, started):
+            if isinstance(result, BaseException):
+                print(f"[MCP pool] Client could not start (retried by the health check): {result}")
+                failed += 1
+                continue
+            self.clients.append(client)
+            await self._add_idle(client)
+        return failed
+
+    async def _start(self) -> None:
+        self._idle_changed = asyncio.Condition()
+        self._failed = await self._start_clients(self.size)
+        if not self.clients:
+            raise RuntimeError("MCP pool: no client could be started.")
+        self._health_task = asyncio.create_task(self._health_loop(), name="mcp-pool-health")
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self._check_health()
+
+    async def _check_health(self) -> None:
+        # Each client is leased by identity, so a restart never happens under a
+        # running agent and every client is checked once per round.
+        for client in list(self.clients):
+            async with self.lease(client):
+                try:
+                    for name in await client.unhealthy_servers(self.ping_timeout):
+                        print(f"[MCP pool] Restarting server '{name}'")
+                        await client.restart_server(name)
+                except Exception as e:  # noqa: BLE001 - keep the health loop alive
+                    print(f"[MCP pool] Health check failed: {e}")
+        if self._failed:
+            print(f"[MCP pool] Retrying {self._failed} client(s) that could not start")
+            self._failed = await self._start_clients(self._failed)
+
+    async def _close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+        await asyncio.gather(*(c.__aexit__(None, None, None) for c in self.clients), return_exceptions=True)
+        self.clients.clear()
+        self._idle.clear()
+        await close_llm_client()  # agent runs made their LLM calls on this loop
@@ -15,7 +15,7 @@ import logging
 import re
 
 from mcp.server import Server
-from mcp.types import Tool
+from mcp.types import Tool, ToolAnnotations
 
 # Basic logging to stderr (MCP-friendly)
 logging.basicConfig(level=logging.INFO)
@@ -47,6 +47,8 @@ server = Server("local_insights")
             },
             "required": ["text"],
         },
+        # Deterministic and side-effect free: clients may cache the result
+        annotations=ToolAnnotations(readOnlyHint=True, idempotentHint=True),
     )
 )
 async def clean_text_tool(text: str, lowercase: bool = False) -> str:
@@ -96,6 +98,8 @@ async def clean_text_tool(text: str, lowercase: bool = False) -> str:
             },
             "required": ["text"],
         },
+        # Deterministic and side-effect free: clients may cache the result
+        annotations=ToolAnnotations(readOnlyHint=True, idempotentHint=True),
     )
 )
 async def generate_insights(text: str) -> str:
@@ -6,6 +6,9 @@
 #   * custom MCP server (Part 2): "local_insights" from my_mcp_server.py
 # - Lets the LLM decide the order of multi-step tool calls based on intermediate results
 # - Implements error handling, basic rate limiting, and detailed tool logs.
+# - Sends only the tools relevant to the goal and recent steps (tool_retriever.py)
+# - Optionally streams the LLM answer and starts each tool call as soon as it is
+#   complete, so tools run while the model is still generating (LLM_STREAM_PLAN=1).
 # app.py calls run_agent_sync(...) to run the full end-to-end agent.
 
 
@@ -15,11 +18,34 @@ import asyncio
 import json
 import traceback
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from config import load_llm_config, load_mcp_server_configs
-from llm_client import plan_with_llm
+from context_window import ContextWindow, approx_tokens
+from llm_client import close_llm_client, plan_with_llm, plan_with_llm_stream
 from mcp_multi_client import MCPMultiClient, ToolDescriptor
+from mcp_pool import MCPPool
+from tool_retriever import retriever_for
+
+
+# High-level, non-scripted system prompt. A constant so that, with the memoized
+# tools spec, every planning request starts with the same bytes (prompt caching).
+SYSTEM_PROMPT = (
+    "You are an autonomous agent that can use tools from multiple "
+    "MCP servers. Use the tools *only when helpful* to make progress.\n\n"
+    "Available server types:\n"
+    "- 'files' : listing, reading local files.\n"
+    "- 'web'   : searching the internet and fetching content.\n"
+    "- 'local_insights' : custom tools (clean_text, generate_insights).\n\n"
+    "Plan step by step. Choose tools based on their descriptions and "
+    "the user's goal. If a tool fails, adapt your strategy. "
+    "When you have enough information, provide a clear final answer."
+)
+
+
+# Recent messages (beyond the goal) used to pick the tools of the next step
+RETRIEVAL_HISTORY_MESSAGES = 4
+RETRIEVAL_HISTORY_CHARS = 500
 
 
 @dataclass
@@ -31,12 +57,23 @@ class ToolLogEntry:
     success: bool
     result_preview: str
     error: str | None = None
+    cache_hits: int = 0  # > 0: result served from the tool cache (hit count for these args)
+
+
+@dataclass
+class PendingToolCall:
+    """A tool call that passed validation and is waiting to run."""
+    tool_call_id: str
+    tool_name: str
+    server_name: str
+    arguments: Dict[str, Any]
 
 
 @dataclass
 class OrchestratorResult:
     final_answer: str
     tool_logs: List[ToolLogEntry] = field(default_factory=list)
+    degraded_servers: Dict[str, str] = field(default_factory=dict)  # skipped at startup
 
 
 class AgenticOrchestrator:
@@ -48,9 +85,11 @@ class AgenticOrchestrator:
     - Provides transparent logs for debugging and assessment.
     """
 
-    def __init__(self, max_steps: int = 8) -> None:
+    def __init__(self, max_steps: int = 8, stream_plan: Optional[bool] = None) -> None:
         self.max_steps = max_steps
         self.llm_cfg = load_llm_config()
+        # Streaming: tool calls start while the LLM is still writing the next ones
+        self.stream_plan = self.llm_cfg.stream_plan if stream_plan is None else stream_plan
         self.server_configs = load_mcp_server_configs()
         self.tool_logs: List[ToolLogEntry] = []
 
@@ -58,241 +97,271 @@ class AgenticOrchestrator:
         self.tool_call_counts: Dict[str, int] = {}
         self.max_calls_per_tool: int = 5
 
-    async def run(self, user_goal: str) -> OrchestratorResult:
+    async def run(
+        self, user_goal: str, mcp_client: Optional[MCPMultiClient] = None
+    ) -> OrchestratorResult:
+        """Run one goal, on `mcp_client` (e.g. leased from MCPPool) or on a fresh client."""
+        if mcp_client is not None:
+            return await self._run_with_client(mcp_client, user_goal)
+        async with MCPMultiClient(self.server_configs, debug=False) as client:
+            return await self._run_with_client(client, user_goal)
+
+    async def _run_with_client(
+        self, mcp_client: MCPMultiClient, user_goal: str
+    ) -> OrchestratorResult:
         self.tool_logs.clear()
+        if mcp_client.result_cache is not None and mcp_client.cache_config.scope == "run":
+            mcp_client.result_cache.clear()
+
+        tools_for_llm = mcp_client.build_llm_tools_spec()
+
+        # Static prefix first (same bytes at every step and every run), then the goal
+        messages: List[Dict[str, Any]] = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": user_goal,
+            },
+        ]
+        context = ContextWindow(
+            budget=self.llm_cfg.context_budget,
+            keep_recent_steps=self.llm_cfg.context_keep_steps,
+            pinned=len(messages),
+        )
+        for message in messages:
+            context.append(message)
+
+        # BM25 index over the tools, built once per tools spec
+        retriever = retriever_for(tools_for_llm, mcp_client.tools_spec_hash)
+        used_tools: Set[str] = set()
+
+        final_answer = ""
+
+        for step in range(1, self.max_steps + 1):
+            # Only the relevant tools (+ those already used) are sent this step
+            step_tools = retriever.select(
+                _retrieval_query(user_goal, context.messages[context.pinned:]),
+                self.llm_cfg.tool_top_k,
+                always=used_tools,
+            )
+            context.reserved = approx_tokens(step_tools)  # sent with this request
+            # Older tool outputs become references once the prompt exceeds the budget
+            context.compact()
 
-        async with MCPMultiClient(self.server_configs, debug=False) as mcp_client:
-            tools_for_llm = mcp_client.build_llm_tools_spec()
+            # One task per tool call, keyed by its index in the LLM's tool_calls:
+            # each call is validated and started as soon as it is dispatched.
+            running: Dict[int, asyncio.Future] = {}
 
-            # High-level, non-scripted system prompt
-            messages: List[Dict[str, Any]] = [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an autonomous agent that can use tools from multiple "
-                        "MCP servers. Use the tools *only when helpful* to make progress.\n\n"
-                        "Available server types:\n"
-                        "- 'files' : listing, reading local files.\n"
-                        "- 'web'   : searching the internet and fetching content.\n"
-                        "- 'local_insights' : custom tools (clean_text, generate_insights).\n\n"
-                        "Plan step by step. Choose tools based on their descriptions and "
-                        "the user's goal. If a tool fails, adapt your strategy. "
-                        "When you have enough information, provide a clear final answer."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": user_goal,
-                },
-            ]
-
-            final_answer = ""
-
-            for step in range(1, self.max_steps + 1):
-                assistant_msg = plan_with_llm(messages, tools_for_llm)
-                tool_calls = assistant_msg.get("tool_calls") or []
-
-                # No tool call requested → final answer
-                if not tool_calls:
-                    content = assistant_msg.get("content") or ""
-                    final_answer = (
-                        content
-                        if isinstance(content, str)
-                        else json.dumps(content, ensure_ascii=False)
-                    )
-                    break
-
-                messages.append(
-                    {
-                        "role": "assistant",
-                        "content": assistant_msg.get("content") or "",
-                        "tool_calls": tool_calls,
-                    }
-                )
+            def dispatch(index: int, tc: Dict[str, Any]) -> None:
+                running[index] = self._start_tool_call(step, tc, mcp_client)
 
-                # Execute tool calls one by one
-                for tc in tool_calls:
-                    f_info = tc.get("function") or {}
-                    tool_name = f_info.get("name")
-                    raw_args = f_info.get("arguments") or "{}"
-                    tool_call_id = tc.get("id", "")  # required for OpenAI-style tool messages
-
-                    # Decode arguments
-                    try:
-                        args = (
-                            json.loads(raw_args)
-                            if isinstance(raw_args, str)
-                            else raw_args
-                        )
-                        if not isinstance(args, dict):
-                            raise ValueError("Tool arguments must be a JSON object.")
-                    except Exception as e:
-                        error_text = (
-                            f"Invalid arguments for tool '{tool_name}': {raw_args}. "
-                            f"Parse error: {e}"
-                        )
-                        self.tool_logs.append(
-                            ToolLogEntry(
-                                step=step,
-                                tool_name=tool_name or "UNKNOWN",
-                                server_name="UNKNOWN",
-                                arguments={},
-                                success=False,
-                                result_preview="",
-                                error=error_text,
-                            )
-                        )
-                        messages.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "name": tool_name,
-                                "content": (
-                                    "Arguments invalid. "
-                                    + error_text
-                                    + " Please replan with valid arguments."
-                                ),
-                            }
-                        )
-                        continue
-
-                    # Validate against schema
-                    td: ToolDescriptor | None = mcp_client.tools.get(tool_name)
-                    server_name = td.server_name if td else "UNKNOWN"
-                    required_fields = td.input_schema.get("required", []) if td else []
-
-                    missing = [r for r in required_fields if r not in args]
-                    if missing:
-                        error_text = (
-                            f"Missing required parameters for tool '{tool_name}': {missing}"
-                        )
-                        self.tool_logs.append(
-                            ToolLogEntry(
-                                step=step,
-                                tool_name=tool_name,
-                                server_name=server_name,
-                                arguments=args,
-                                success=False,
-                                result_preview="",
-                                error=error_text,
-                            )
-                        )
-                        messages.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "name": tool_name,
-                                "content": (
-                                    error_text
-                                    + ". Adjust your call or choose another tool."
-                                ),
-                            }
-                        )
-                        continue
-
-                    # Rate limiting
-                    count = self.tool_call_counts.get(tool_name or "UNKNOWN", 0)
-                    if count >= self.max_calls_per_tool:
-                        error_text = (
-                            f"Rate limit reached for tool '{tool_name}' "
-                            f"({self.max_calls_per_tool}/run)."
-                        )
-                        self.tool_logs.append(
-                            ToolLogEntry(
-                                step=step,
-                                tool_name=tool_name,
-                                server_name=server_name,
-                                arguments=args,
-                                success=False,
-                                result_preview="",
-                                error=error_text,
-                            )
-                        )
-                        messages.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "name": tool_name,
-                                "content": (
-                                    error_text
-                                    + " Please switch to another tool or strategy."
-                                ),
-                            }
-                        )
-                        continue
-
-                    self.tool_call_counts[tool_name] = count + 1
-
-                    # Execute tool
-                    try:
-                        result_str = await mcp_client.call_tool(tool_name, args)
-                        preview = result_str[:800]
-
-                        self.tool_logs.append(
-                            ToolLogEntry(
-                                step=step,
-                                tool_name=tool_name,
-                                server_name=server_name,
-                                arguments=args,
-                                success=True,
-                                result_preview=preview,
-                            )
-                        )
-
-                        messages.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "name": tool_name,
-                                "content": preview,
-                            }
-                        )
-
-                    except Exception as e:
-                        tb = traceback.format_exc(limit=3)
-                        error_text = (
-                            f"Tool '{tool_name}' failed.\n"
-                            f"Server: {server_name}\n"
-                            f"Arguments: {args}\n"
-                            f"Error: {e}\n"
-                            f"Traceback:\n{tb}"
-                        )
-                        self.tool_logs.append(
-                            ToolLogEntry(
-                                step=step,
-                                tool_name=tool_name,
-                                server_name=server_name,
-                                arguments=args,
-                                success=False,
-                                result_preview="",
-                                error=error_text,
-                            )
-                        )
-                        messages.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "name": tool_name,
-                                "content": (
-                                    "Tool call failed.\n"
-                                    + error_text
-                                    + "\nReplan with a different strategy."
-                                ),
-                            }
-                        )
-
-            if not final_answer:
+            try:
+                if self.stream_plan:
+                    assistant_msg = await plan_with_llm_stream(
+                        context.messages, step_tools, dispatch
+                    )
+                else:
+                    assistant_msg = await plan_with_llm(context.messages, step_tools)
+                    for index, tc in enumerate(assistant_msg.get("tool_calls") or []):
+                        dispatch(index, tc)
+            except BaseException:
+                for task in running.values():
+                    task.cancel()
+                raise
+            tool_calls = assistant_msg.get("tool_calls") or []
+
+            # No tool call requested → final answer
+            if not tool_calls:
+                content = assistant_msg.get("content") or ""
                 final_answer = (
-                    "I could not fully complete the task within the allowed steps. "
-                    "Check the tool logs for intermediate results."
+                    content
+                    if isinstance(content, str)
+                    else json.dumps(content, ensure_ascii=False)
                 )
+                break
+
+            context.append(
+                {
+                    "role": "assistant",
+                    "content": assistant_msg.get("content") or "",
+                    "tool_calls": tool_calls,
+                }
+            )
+            used_tools.update((tc.get("function") or {}).get("name") or "" for tc in tool_calls)
+
+            # The step takes as long as its slowest tool (calls run concurrently)
+            outcomes = await asyncio.gather(*(running[i] for i in sorted(running)))
 
-            return OrchestratorResult(
-                final_answer=final_answer,
-                tool_logs=list(self.tool_logs),
+            # Logs and tool messages keep the order of the LLM's tool_calls
+            for log_entry, tool_message in outcomes:
+                self.tool_logs.append(log_entry)
+                context.append(tool_message)
+
+        if not final_answer:
+            final_answer = (
+                "I could not fully complete the task within the allowed steps. "
+                "Check the tool logs for intermediate results."
             )
 
+        return OrchestratorResult(
+            final_answer=final_answer,
+            tool_logs=list(self.tool_logs),
+            degraded_servers=dict(mcp_client.degraded),
+        )
+
+    def _start_tool_call(
+        self, step: int, tc: Dict[str, Any], mcp_client: MCPMultiClient
+    ) -> asyncio.Future:
+        """Validate now; a valid call runs in its own task, a rejected one is an already-done future."""
+        checked = self._validate_tool_call(step, tc, mcp_client)
+        if isinstance(checked, PendingToolCall):
+            return asyncio.ensure_future(self._execute_tool_call(step, checked, mcp_client))
+        done = asyncio.get_running_loop().create_future()
+        done.set_result(checked)
+        return done
+
+    def _validate_tool_call(
+        self, step: int, tc: Dict[str, Any], mcp_client: MCPMultiClient
+    ) -> PendingToolCall | Tuple[ToolLogEntry, Dict[str, Any]]:
+        """Decode, validate and rate-limit one tool call; errors come back as (log, tool message)."""
+        f_info = tc.get("function") or {}
+        tool_name = f_info.get("name")
+        raw_args = f_info.get("arguments") or "{}"
+        tool_call_id = tc.get("id", "")  # required for OpenAI-style tool messages
+
+        # Decode arguments
+        try:
+            args = (
+                json.loads(raw_args)
+                if isinstance(raw_args, str)
+                else raw_args
+            )
+            if not isinstance(args, dict):
+                raise ValueError("Tool arguments must be a JSON object.")
+        except Exception as e:
+            error_text = (
+                f"Invalid arguments for tool '{tool_name}': {raw_args}. "
+                f"Parse error: {e}"
+            )
+            return _failed_call(
+                step, tool_call_id, tool_name or "UNKNOWN", "UNKNOWN", {}, error_text,
+                "Arguments invalid. " + error_text + " Please replan with valid arguments.",
+            )
+
+        # Validate against the tool's compiled JSON Schema (locally, no round trip)
+        td: ToolDescriptor | None = mcp_client.tools.get(tool_name)
+        server_name = td.server_name if td else "UNKNOWN"
+        schema_error = td.validate(args) if td else None
+        if schema_error:
+            error_text = f"Invalid arguments for tool '{tool_name}': {schema_error}"
+            return _failed_call(
+                step, tool_call_id, tool_name, server_name, args, error_text,
+                error_text + ". Adjust your call or choose another tool.",
+            )
 
-def run_agent_sync(user_goal: str) -> OrchestratorResult:
+        # Rate limiting
+        count = self.tool_call_counts.get(tool_name or "UNKNOWN", 0)
+        if count >= self.max_calls_per_tool:
+            error_text = (
+                f"Rate limit reached for tool '{tool_name}' "
+                f"({self.max_calls_per_tool}/run)."
+            )
+            return _failed_call(
+                step, tool_call_id, tool_name, server_name, args, error_text,
+                error_text + " Please switch to another tool or strategy.",
+            )
+
+        self.tool_call_counts[tool_name] = count + 1
+        return PendingToolCall(tool_call_id, tool_name, server_name, args)
+
+    async def _execute_tool_call(
+        self, step: int, call: PendingToolCall, mcp_client: MCPMultiClient
+    ) -> Tuple[ToolLogEntry, Dict[str, Any]]:
+        """Run one validated call (MCPMultiClient applies the per-server limit)."""
+        try:
+            result_str, cache_hits = await mcp_client.call_tool_cached(call.tool_name, call.arguments)
+        except Exception as e:
+            tb = traceback.format_exc(limit=3)
+            error_text = (
+                f"Tool '{call.tool_name}' failed.\n"
+                f"Server: {call.server_name}\n"
+                f"Arguments: {call.arguments}\n"
+                f"Error: {e}\n"
+                f"Traceback:\n{tb}"
+            )
+            return _failed_call(
+                step, call.tool_call_id, call.tool_name, call.server_name, call.arguments, error_text,
+                "Tool call failed.\n" + error_text + "\nReplan with a different strategy.",
+            )
+
+        preview = result_str[:800]
+        log_entry = ToolLogEntry(
+            step=step,
+            tool_name=call.tool_name,
+            server_name=call.server_name,
+            arguments=call.arguments,
+            success=True,
+            result_preview=preview,
+            cache_hits=cache_hits,
+        )
+        tool_message = {
+            "role": "tool",
+            "tool_call_id": call.tool_call_id,
+            "name": call.tool_name,
+            "content": preview,
+        }
+        return log_entry, tool_message
+
+
+def _retrieval_query(user_goal: str, history: List[Dict[str, Any]]) -> str:
+    """Goal + the latest assistant texts / tool outputs, to rank the tools of the next step."""
+    parts = [user_goal]
+    for message in history[-RETRIEVAL_HISTORY_MESSAGES:]:
+        content = message.get("content")
+        if isinstance(content, str) and content:
+            parts.append(content[:RETRIEVAL_HISTORY_CHARS])
+    return "\n".join(parts)
+
+
+def _failed_call(
+    step: int,
+    tool_call_id: str,
+    tool_name: str,
+    server_name: str,
+    arguments: Dict[str, Any],
+    error_text: str,
+    content: str,
+) -> Tuple[ToolLogEntry, Dict[str, Any]]:
+    """Log entry + tool message telling the LLM why a call did not run."""
+    log_entry = ToolLogEntry(
+        step=step,
+        tool_name=tool_name,
+        server_name=server_name,
+        arguments=arguments,
+        success=False,
+        result_preview="",
+        error=error_text,
+    )
+    tool_message = {
+        "role": "tool",
+        "tool_call_id": tool_call_id,
+        "name": tool_name,
+        "content": content,
+    }
+    return log_entry, tool_message
+
+
+def run_agent_sync(user_goal: str, pool: Optional[MCPPool] = None) -> OrchestratorResult:
+    """Run a goal; with a pool, on its resident MCP servers instead of fresh ones."""
     orchestrator = AgenticOrchestrator()
-    return asyncio.run(orchestrator.run(user_goal))
+    if pool is not None:
+        return pool.run(lambda client: orchestrator.run(user_goal, client))
+
+    async def run_once() -> OrchestratorResult:
+        try:
+            return await orchestrator.run(user_goal)
+        finally:
+            # The LLM HTTP pool belongs to this loop, which asyncio.run is about to close
+            await close_llm_client()
+
+    return asyncio.run(run_once())
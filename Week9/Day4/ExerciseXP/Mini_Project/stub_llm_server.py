@@ -0,0 +1,189 @@
+# Mini Project – MCP Agentic Application (Part 1 + Part 2)
+# This script is a fake OpenAI-compatible LLM for local tests (no API key, no GPU):
+# - POST /v1/chat/completions only, standard library http.server
+# - Last message from the user → asks for the first tool(s) (empty arguments)
+# - Otherwise (tool results came back) → a short final text answer
+# - "stream": true → server-sent events, one small delta per chunk
+# - Optional latency and injected failures (429 with Retry-After, or 5xx)
+#   to exercise the retries and the rate limiter of llm_client.py
+#
+# Usage:
+#   python stub_llm_server.py --port 8765 --latency 0.2 --fail-rate 0.3 --fail-status 429
+#   python stub_llm_server.py --tool-calls 3 --chunk-delay 0.05   # streaming demo
+#   LLM_BACKEND=stub STUB_LLM_URL=http://127.0.0.1:8765/v1 streamlit run app.py
+
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+
+
+def completion(body: Dict[str, Any], tool_calls: int = 1) -> Dict[str, Any]:
+    messages = body.get("messages") or []
+    tools = body.get("tools") or []
+    last = messages[-1] if messages else {}
+
+    message: Dict[str, Any] = {"role": "assistant", "content": None}
+    finish_reason = "stop"
+    if last.get("role") == "user" and tools:
+        message["tool_calls"] = [
+            {
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": tool["function"]["name"], "arguments": "{}"},
+            }
+            for tool in tools[:tool_calls]
+        ]
+        finish_reason = "tool_calls"
+    else:
+        tool_count = sum(1 for m in messages if m.get("role") == "tool")
+        message["content"] = f"Stub answer after {tool_count} tool result(s)."
+
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def stream_chunks(answer: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """The same answer as chat.completion.chunk objects, split like a real model output."""
+    choice = answer["choices"][0]
+    message = choice["message"]
+
+    def chunk(delta: Dict[str, Any], finish_reason: str | None = None) -> Dict[str, Any]:
+        return {
+            "id": answer["id"],
+            "object": "chat.completion.chunk",
+            "created": answer["created"],
+            "model": answer["model"],
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    yield chunk({"role": "assistant", "content": ""})
+    words = (message.get("content") or "").split(" ") if message.get("content") else []
+    for i, word in enumerate(words):
+        yield chunk({"content": word if i == 0 else " " + word})
+    for index, call in enumerate(message.get("tool_calls") or []):
+        yield chunk({"tool_calls": [{
+            "index": index,
+            "id": call["id"],
+            "type": "function",
+            "function": {"name": call["function"]["name"], "arguments": ""},
+        }]})
+        arguments = call["function"]["arguments"]
+        for start in range(0, len(arguments), 4):
+            yield chunk({"tool_calls": [{
+                "index": index,
+                "function": {"arguments": arguments[start:start + 4]},
+            }]})
+    yield chunk({}, choice["finish_reason"])
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    options: argparse.Namespace
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server API
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        if self.options.latency:
+            time.sleep(self.options.latency)
+
+        if random.random() < self.options.fail_rate:
+            headers = {}
+            if self.options.fail_status == 429:
+                headers["Retry-After"] = str(self.options.retry_after)
+            self._send(
+                self.options.fail_status,
+                {"error": {"message": "Injected failure", "type": "stub_error"}},
+                headers,
+            )
+            return
+
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            self._send(400, {"error": {"message": "Invalid JSON body"}})
+            return
+        answer = completion(body, self.options.tool_calls)
+        chunks = list(stream_chunks(answer))
+        if body.get("stream"):
+            self._send_stream(chunks)
+        else:
+            # Same generation time as the streamed answer, delivered at once
+            time.sleep(self.options.chunk_delay * (len(chunks) + 1))
+            self._send(200, answer)
+
+    def _send_stream(self, chunks: List[Dict[str, Any]]) -> None:
+        """Server-sent events over chunked transfer encoding (keeps the connection alive)."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [f"data: {json.dumps(c)}\n\n" for c in chunks] + ["data: [DONE]\n\n"]
+        for event in events:
+            if self.options.chunk_delay:
+                time.sleep(self.options.chunk_delay)
+            data = event.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] | None = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.options.quiet:
+            super().log_message(format, *args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every answer")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests that fail (0-1)")
+    parser.add_argument("--fail-status", type=int, default=429)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429")
+    parser.add_argument("--tool-calls", type=int, default=1, help="tools requested in the first answer")
+    parser.add_argument(
+        "--chunk-delay", type=float, default=0.0,
+        help="seconds per generated chunk (streamed, or summed before a non-streamed answer)",
+    )
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    StubHandler.options = args
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Stub LLM listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
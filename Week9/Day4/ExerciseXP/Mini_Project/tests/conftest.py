@@ -0,0 +1,53 @@
+# Mini Project – tests
+# The project modules are flat scripts next to this folder: import them directly.
+# `stub_llm` starts stub_llm_server.py (the fake OpenAI-compatible LLM) on a free port.
+
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Start the stub LLM with extra CLI options and point LLM_BACKEND=stub at it."""
+    processes = []
+
+    def start(*options: str) -> str:
+        port = _free_port()
+        proc = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "stub_llm_server.py"), "--port", str(port), "--quiet", *options],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        processes.append(proc)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        url = f"http://127.0.0.1:{port}/v1"
+        monkeypatch.setenv("LLM_BACKEND", "stub")
+        monkeypatch.setenv("LLM_MODEL", "stub")
+        monkeypatch.setenv("STUB_LLM_URL", url)
+        monkeypatch.setenv("LLM_RESPONSE_CACHE", "")
+        return url
+
+    yield start
+    for proc in processes:
+        proc.terminate()
+        proc.wait(timeout=5)
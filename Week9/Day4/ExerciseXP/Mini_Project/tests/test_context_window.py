@@ -0,0 +1,87 @@
+from context_window import ASSISTANT_TEXT_KEEP_CHARS, ContextWindow, approx_tokens, message_tokens
+
+
+def step(window, index, output_chars=2000, text=""):
+    call_id = f"call_{index}"
+    window.append({
+        "role": "assistant",
+        "content": text,
+        "tool_calls": [{"id": call_id, "type": "function", "function": {"name": "read_file", "arguments": "{}"}}],
+    })
+    window.append({
+        "role": "tool",
+        "tool_call_id": call_id,
+        "name": "read_file",
+        "content": f"line one of step {index}\n" + "x" * output_chars,
+    })
+
+
+def new_window(**kwargs):
+    window = ContextWindow(**kwargs)
+    window.append({"role": "system", "content": "You are an agent."})
+    window.append({"role": "user", "content": "Summarize the files."})
+    return window
+
+
+def test_token_estimates():
+    assert approx_tokens("abcd" * 10) == 11
+    assert approx_tokens({"a": 1}) == approx_tokens('{"a": 1}')
+    assert message_tokens({"role": "assistant", "content": None}) == 5
+
+
+def test_under_budget_nothing_changes():
+    window = new_window(budget=10_000)
+    step(window, 1)
+    messages = list(window.messages)
+    window.compact()
+    assert window.messages == messages
+    assert window.compacted_messages == 0
+
+
+def test_old_tool_outputs_become_references_recent_steps_stay():
+    window = new_window(budget=1500, keep_recent_steps=2)
+    for i in range(4):
+        step(window, i)
+    original = window.messages[3]
+
+    window.compact()
+
+    assert window.total_tokens <= window.budget
+    assert window.messages[:2] == [
+        {"role": "system", "content": "You are an agent."},
+        {"role": "user", "content": "Summarize the files."},
+    ]
+    assert window.messages[3]["content"].startswith("[compacted output of 'read_file', 2019 chars")
+    assert "line one of step 0" in window.messages[3]["content"]
+    assert original["content"].endswith("x")  # callers keep the full text
+    assert window.messages[-1]["content"].endswith("x" * 2000)
+    assert window.messages[-3]["content"].endswith("x" * 2000)
+    # Every tool_call keeps its answer
+    assert len(window.messages) == 10
+    assert [m["tool_call_id"] for m in window.messages if m["role"] == "tool"] == [
+        f"call_{i}" for i in range(4)
+    ]
+
+
+def test_long_assistant_text_is_truncated_after_tool_outputs():
+    window = new_window(budget=400, keep_recent_steps=1)
+    step(window, 0, output_chars=100, text="thinking " * 200)
+    step(window, 1, output_chars=100)
+
+    window.compact()
+
+    assert window.messages[2]["content"].endswith(" […]")
+    assert len(window.messages[2]["content"]) == ASSISTANT_TEXT_KEEP_CHARS + len(" […]")
+    assert window.messages[2]["tool_calls"][0]["id"] == "call_0"
+
+
+def test_reserved_tokens_count_and_compaction_is_idempotent():
+    window = new_window(budget=1500, keep_recent_steps=1, reserved=1000)
+    step(window, 0)
+    step(window, 1)
+    window.compact()
+    compacted = window.compacted_messages
+    assert compacted == 1
+
+    window.compact()
+    assert window.compacted_messages == compacted
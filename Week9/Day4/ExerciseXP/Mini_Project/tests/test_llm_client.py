@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import pytest
+
+from config import load_llm_config
+from llm_client import LLMClient, TokenBucket, _retry_after_seconds
+
+TOOLS = [{"type": "function", "function": {"name": "files__read_file", "parameters": {"type": "object"}}}]
+GOAL = [{"role": "user", "content": "read the file"}]
+
+
+def test_plan_asks_for_a_tool_then_answers(stub_llm):
+    stub_llm()
+    client = LLMClient()
+
+    async def run():
+        try:
+            first = await client.plan(GOAL, TOOLS)
+            call = first["tool_calls"][0]
+            followup = GOAL + [
+                {"role": "assistant", "content": "", "tool_calls": [call]},
+                {"role": "tool", "tool_call_id": call["id"], "content": "hello"},
+            ]
+            return first, await client.plan(followup, TOOLS)
+        finally:
+            await client.aclose()
+
+    first, second = asyncio.run(run())
+    assert first["tool_calls"][0]["function"]["name"] == "files__read_file"
+    assert second["content"] == "Stub answer after 1 tool result(s)."
+
+
+def test_server_errors_are_retried_then_raised(stub_llm, monkeypatch):
+    stub_llm("--fail-rate", "1", "--fail-status", "503")
+    monkeypatch.setenv("LLM_MAX_RETRIES", "2")
+    monkeypatch.setenv("LLM_BACKOFF_BASE", "0.01")
+    client = LLMClient()
+
+    async def run():
+        try:
+            await client.plan(GOAL, TOOLS)
+        finally:
+            await client.aclose()
+
+    with pytest.raises(RuntimeError, match="503"):
+        asyncio.run(run())
+
+
+def test_client_is_closed_with_its_loop(stub_llm):
+    stub_llm()
+    client = LLMClient()
+    seen = []
+
+    async def run():
+        await client.plan(GOAL, TOOLS)
+        seen.append(client._client)
+        await client.aclose()
+
+    asyncio.run(run())
+    asyncio.run(run())
+    assert len(seen) == 2 and seen[0] is not seen[1]
+    assert all(c.is_closed() for c in seen)
+    assert client._client is None
+
+
+def test_rate_limit_is_off_for_local_backends(monkeypatch):
+    monkeypatch.delenv("LLM_RATE_LIMIT_RPM", raising=False)
+    monkeypatch.setenv("LLM_BACKEND", "ollama")
+    assert load_llm_config().requests_per_minute == 0
+    monkeypatch.setenv("LLM_BACKEND", "groq")
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    assert load_llm_config().requests_per_minute == 30
+
+
+def test_token_bucket_paces_after_burst():
+    bucket = TokenBucket(rate=20, capacity=2)  # 20/s after a burst of 2
+
+    async def take(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    start = time.perf_counter()
+    asyncio.run(take(4))
+    assert 0.08 <= time.perf_counter() - start < 0.5
+
+
+def test_retry_after_headers():
+    import httpx
+
+    assert _retry_after_seconds(httpx.Response(429, headers={"retry-after": "2"})) == 2
+    assert _retry_after_seconds(httpx.Response(429, headers={"retry-after-ms": "250"})) == 0.25
+    assert _retry_after_seconds(httpx.Response(429)) is None
+
@@ -0,0 +1,112 @@
+import asyncio
+import socket
+
+import pytest
+
+from llm_client import LLMClient
+from llm_response_cache import LLMResponseCache
+
+TOOLS = [{"type": "function", "function": {"name": "files__read_file", "parameters": {"type": "object"}}}]
+GOAL = [{"role": "user", "content": "read the file"}]
+ANSWER = {"role": "assistant", "content": None, "tool_calls": [{"id": "call_1", "function": {"name": "x"}}]}
+
+
+def test_key_ignores_dict_order_and_skips_high_temperatures(tmp_path):
+    cache = LLMResponseCache(tmp_path / "cache.json", max_temperature=0.2)
+    key = cache.key("m", [{"role": "user", "content": "hi"}], TOOLS, 0.1, 100)
+
+    assert key == cache.key("m", [{"content": "hi", "role": "user"}], TOOLS, 0.1, 100)
+    assert key != cache.key("other", [{"role": "user", "content": "hi"}], TOOLS, 0.1, 100)
+    assert key != cache.key("m", [{"role": "user", "content": "hi"}], [], 0.1, 100)
+    assert cache.key("m", [], TOOLS, 0.7, 100) is None
+
+
+def test_entries_are_copies_and_persisted(tmp_path):
+    path = tmp_path / "sub" / "cache.json"
+    cache = LLMResponseCache(path)
+    cache.put("k", ANSWER)
+
+    got = cache.get("k")
+    got["tool_calls"].append({"id": "call_2"})
+    assert cache.get("k") == ANSWER
+    assert LLMResponseCache(path).get("k") == ANSWER
+    assert cache.get("missing") is None
+
+
+def test_broken_file_is_an_empty_cache(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert LLMResponseCache(path).get("k") is None
+
+
+def test_unexpected_file_shape_is_an_empty_cache(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text('[["k", {"role": "assistant"}]]', encoding="utf-8")
+    cache = LLMResponseCache(path)
+    assert cache.get("k") is None
+    cache.put("k", ANSWER)
+    assert LLMResponseCache(path).get("k") == ANSWER
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = LLMResponseCache(path, max_entries=2)
+    cache.put("a", ANSWER)
+    cache.put("b", ANSWER)
+    cache.get("a")  # b is now the oldest
+    cache.put("c", ANSWER)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == ANSWER
+    # The file keeps the LRU order and a smaller bound applies on load
+    reloaded = LLMResponseCache(path, max_entries=1)
+    assert reloaded.get("a") is None
+    assert reloaded.get("c") == ANSWER
+
+
+def test_failed_write_keeps_the_old_file_and_no_temp_file(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = LLMResponseCache(path)
+    cache.put("k", ANSWER)
+    before = path.read_text(encoding="utf-8")
+
+    with pytest.raises(TypeError):
+        cache.put("bad", {"role": "assistant", "content": object()})
+
+    assert path.read_text(encoding="utf-8") == before
+    assert [p.name for p in tmp_path.iterdir()] == ["cache.json"]
+    assert cache.get("bad") is None
+    cache.put("next", ANSWER)  # the failed entry does not break later writes
+    assert LLMResponseCache(path).get("next") == ANSWER
+
+
+def test_recorded_stream_replays_without_the_server(stub_llm, monkeypatch, tmp_path):
+    stub_llm()
+    monkeypatch.setenv("LLM_RESPONSE_CACHE", str(tmp_path / "responses.json"))
+
+    def plan_stream():
+        client = LLMClient()
+        dispatched = []
+
+        async def run():
+            try:
+                message = await client.plan_stream(
+                    GOAL, TOOLS, lambda i, c: dispatched.append((i, c["id"])), temperature=0.1
+                )
+            finally:
+                await client.aclose()
+            return message
+
+        return asyncio.run(run()), dispatched
+
+    recorded, first = plan_stream()
+    # Nothing listens on this port: only the cache can answer
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        closed_port = s.getsockname()[1]
+    monkeypatch.setenv("STUB_LLM_URL", f"http://127.0.0.1:{closed_port}/v1")
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    replayed, second = plan_stream()
+
+    assert replayed == recorded
+    assert second == first == [(0, recorded["tool_calls"][0]["id"])]
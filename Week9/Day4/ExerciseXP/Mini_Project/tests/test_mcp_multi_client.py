@@ -0,0 +1,194 @@
+import asyncio
+
+import pytest
+from mcp import types
+
+from config import MCPServerConfig, ToolCacheConfig
+from mcp_multi_client import MCPMultiClient, ToolDescriptor, _compile_validator
+from orchestrator import AgenticOrchestrator
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "path": {"type": "string"},
+        "limit": {"type": "integer", "minimum": 1},
+        "mode": {"enum": ["text", "json"]},
+    },
+    "required": ["path"],
+}
+NO_CACHE = ToolCacheConfig(scope="off", max_entries=1, default_ttl=0.0, tool_ttls={})
+
+
+def descriptor(schema):
+    return ToolDescriptor("srv__read", "srv", "read", "", schema, validator=_compile_validator(schema))
+
+
+class StubSession:
+    """Records every call_tool request and answers 'ok'."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        return types.CallToolResult(content=[types.TextContent(type="text", text="ok")])
+
+
+def client_with(session, schema):
+    """An MCPMultiClient wired to a stub session instead of a stdio server."""
+    client = MCPMultiClient([MCPServerConfig(name="srv", command="unused", args=[])], cache_config=NO_CACHE)
+    client.sessions["srv"] = session
+    client._listed["srv"] = [types.Tool(name="read", inputSchema=schema)]
+    client._register_tools()
+    return client
+
+
+def test_valid_arguments_pass():
+    assert descriptor(SCHEMA).validate({"path": "a.txt", "limit": 3, "mode": "json"}) is None
+
+
+def test_missing_required_argument():
+    assert descriptor(SCHEMA).validate({"limit": 3}) == "arguments must contain ['path'] properties"
+
+
+@pytest.mark.parametrize(
+    "arguments, message",
+    [
+        ({"path": 1}, "arguments.path must be string"),
+        ({"path": "a", "limit": "3"}, "arguments.limit must be integer"),
+        ({"path": "a", "limit": 0}, "arguments.limit must be bigger than or equal to 1"),
+        ({"path": "a", "mode": "xml"}, "arguments.mode must be one of ['text', 'json']"),
+    ],
+)
+def test_wrong_type_or_value_names_the_arguments(arguments, message):
+    assert descriptor(SCHEMA).validate(arguments) == message
+
+
+def test_tool_without_schema_accepts_any_object():
+    client = client_with(StubSession(), {})
+    td = client.tools["srv__read"]
+    assert td.input_schema == {"type": "object", "properties": {}, "required": []}
+    assert td.validator is not None
+    assert td.validate({}) is None
+    assert td.validate({"anything": [1, 2]}) is None
+
+
+def test_uncompilable_schema_falls_back_to_required_keys():
+    schema = {"type": "object", "properties": {"path": {"$ref": "#/missing"}}, "required": ["path"]}
+    td = descriptor(schema)
+    assert td.validator is None
+    assert td.validate({}) == "missing required parameters ['path']"
+    assert td.validate({"path": 1}) is None
+
+
+def test_invalid_call_is_rejected_before_it_is_dispatched(monkeypatch):
+    for name, value in {
+        "LLM_BACKEND": "stub",
+        "MCP_FILES_ARGS": "unused",
+        "MCP_WEB_ARGS": "unused",
+        "MCP_LOCAL_ARGS": "unused",
+    }.items():
+        monkeypatch.setenv(name, value)
+    session = StubSession()
+    client = client_with(session, SCHEMA)
+    orchestrator = AgenticOrchestrator()
+
+    def tool_call(arguments):
+        return {"id": "call_1", "function": {"name": "srv__read", "arguments": arguments}}
+
+    async def scenario():
+        rejected = await orchestrator._start_tool_call(1, tool_call('{"limit": "3"}'), client)
+        accepted = await orchestrator._start_tool_call(1, tool_call('{"path": "a.txt"}'), client)
+        return rejected, accepted
+
+    (log, message), (ok_log, _) = asyncio.run(scenario())
+
+    assert not log.success
+    assert "arguments must contain ['path'] properties" in log.error
+    assert message["tool_call_id"] == "call_1"
+    assert ok_log.success
+    assert session.calls == [("read", {"path": "a.txt"})]  # only the valid call reached the server
+    assert orchestrator.tool_call_counts == {"srv__read": 1}
+
+
+class SlowSession(StubSession):
+    """Tracks how many calls are in flight at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+
+    async def call_tool(self, name, arguments):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        return await super().call_tool(name, arguments)
+
+
+def stub_servers(monkeypatch, outcomes):
+    """Replace the stdio runner: each server name maps to a session, an exception or 'hang'."""
+
+    async def serve(self, cfg, ready, stop):
+        outcome = outcomes[cfg.name]
+        if outcome == "hang":
+            await asyncio.Event().wait()
+        if isinstance(outcome, Exception):
+            ready.set_exception(outcome)
+            return
+        ready.set_result((outcome, [types.Tool(name="read", inputSchema={"type": "object"})]))
+        await stop.wait()
+
+    monkeypatch.setattr(MCPMultiClient, "_serve", serve)
+
+
+def configs(*names, max_concurrency=4):
+    return [
+        MCPServerConfig(name=n, command="unused", args=[], startup_timeout=0.2, max_concurrency=max_concurrency)
+        for n in names
+    ]
+
+
+def test_failing_server_does_not_stop_the_others(monkeypatch):
+    sessions = {"files": StubSession(), "web": StubSession()}
+    stub_servers(monkeypatch, {**sessions, "broken": RuntimeError("spawn failed"), "slow": "hang"})
+
+    async def scenario():
+        async with MCPMultiClient(configs("files", "broken", "slow", "web"), cache_config=NO_CACHE) as client:
+            output = await client.call_tool("web__read", {})
+            return set(client.sessions), sorted(client.tools), dict(client.degraded), output
+
+    started, tools, degraded, output = asyncio.run(scenario())
+
+    assert started == {"files", "web"}
+    assert tools == ["files__read", "web__read"]
+    assert degraded == {"broken": "RuntimeError: spawn failed", "slow": "no answer within 0.2s"}
+    assert output == "ok"
+
+
+def test_no_server_started_raises(monkeypatch):
+    stub_servers(monkeypatch, {"broken": RuntimeError("spawn failed")})
+
+    async def scenario():
+        async with MCPMultiClient(configs("broken"), cache_config=NO_CACHE):
+            pass
+
+    with pytest.raises(RuntimeError, match="No MCP server could be started"):
+        asyncio.run(scenario())
+
+
+def test_concurrent_calls_are_limited_per_server(monkeypatch):
+    sessions = {"files": SlowSession(), "web": SlowSession()}
+    stub_servers(monkeypatch, sessions)
+
+    async def scenario():
+        async with MCPMultiClient(configs("files", "web", max_concurrency=2), cache_config=NO_CACHE) as client:
+            await asyncio.gather(
+                *(client.call_tool(f"{name}__read", {"n": i}) for i in range(6) for name in sessions)
+            )
+
+    asyncio.run(scenario())
+
+    assert [s.peak for s in sessions.values()] == [2, 2]  # each server has its own limit
+    assert [len(s.calls) for s in sessions.values()] == [6, 6]
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+import mcp_pool
+from mcp_pool import MCPPool
+
+
+class FakeClient:
+    """MCPMultiClient stand-in: records health checks, can fail to start."""
+
+    fail_next = 0
+    created = []
+
+    def __init__(self, server_configs, debug=False):
+        self.checks = 0
+        FakeClient.created.append(self)
+
+    async def __aenter__(self):
+        if FakeClient.fail_next:
+            FakeClient.fail_next -= 1
+            raise RuntimeError("server did not start")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def unhealthy_servers(self, timeout):
+        self.checks += 1
+        return []
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(mcp_pool, "MCPMultiClient", FakeClient)
+    FakeClient.fail_next = 0
+    FakeClient.created = []
+    pool = MCPPool(server_configs=[object()], size=2, health_interval=3600)
+    yield pool
+    pool.close()
+
+
+def test_health_check_waits_for_each_client_once(pool):
+    pool.start()
+
+    async def scenario():
+        idle, busy = pool.clients
+        async with pool.lease(busy):
+            check = asyncio.create_task(pool._check_health())
+            await asyncio.sleep(0.05)
+            # The idle client is checked, the leased one is waited for
+            assert (idle.checks, busy.checks) == (1, 0)
+            assert not check.done()
+        await asyncio.wait_for(check, timeout=1)
+        return [c.checks for c in pool.clients]
+
+    assert pool._submit(scenario()).result(timeout=5) == [1, 1]
+
+
+def test_client_that_failed_at_startup_is_retried(pool):
+    FakeClient.fail_next = 1
+    pool.start()
+    assert len(pool.clients) == 1
+
+    pool._submit(pool._check_health()).result(timeout=5)
+
+    assert len(pool.clients) == 2
+    assert pool._failed == 0
+    assert pool.run(lambda client: asyncio.sleep(0, result=client)) in pool.clients
+
+
+def test_start_fails_when_no_client_starts(pool):
+    FakeClient.fail_next = 2
+    with pytest.raises(RuntimeError, match="no client"):
+        pool.start()
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+from llm_client import LLMClient, _arguments_complete
+
+TOOLS = [
+    {"type": "function", "function": {"name": f"files__tool_{i}", "parameters": {"type": "object"}}}
+    for i in range(3)
+]
+GOAL = [{"role": "user", "content": "read the files"}]
+
+
+def call(arguments, call_id="call_1", name="files__read_file"):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": arguments}}
+
+
+def test_arguments_complete_needs_id_name_and_a_json_object():
+    assert _arguments_complete(call('{"path": "a.txt"} '))
+    assert not _arguments_complete(call('{"path": "a.t'))
+    assert not _arguments_complete(call('{"path": {"nested": 1}'))  # ends with } but not decodable
+    assert not _arguments_complete(call("[1, 2]"))
+    assert not _arguments_complete(call("{}", call_id=""))
+    assert not _arguments_complete(call("{}", name=""))
+
+
+def stream_plan(messages, tools):
+    client = LLMClient()
+    dispatched = []
+    start = time.perf_counter()
+
+    def on_tool_call(index, tool_call):
+        dispatched.append((index, tool_call["function"]["name"], time.perf_counter() - start))
+
+    async def run():
+        try:
+            return await client.plan_stream(messages, tools, on_tool_call)
+        finally:
+            await client.aclose()
+
+    message = asyncio.run(run())
+    return message, dispatched, time.perf_counter() - start
+
+
+def test_tool_calls_are_dispatched_once_before_the_stream_ends(stub_llm):
+    stub_llm("--tool-calls", "3", "--chunk-delay", "0.05")
+
+    message, dispatched, elapsed = stream_plan(GOAL, TOOLS)
+
+    assert [(i, name) for i, name, _ in dispatched] == [
+        (0, "files__tool_0"), (1, "files__tool_1"), (2, "files__tool_2"),
+    ]
+    # 9 events at 50 ms: the first call is ready after its third event
+    assert dispatched[0][2] < elapsed - 0.15
+    assert [c["function"]["name"] for c in message["tool_calls"]] == [n for _, n, _ in dispatched]
+    assert all(c["function"]["arguments"] == "{}" and c["id"] for c in message["tool_calls"])
+
+
+def test_streamed_text_answer_has_no_tool_calls(stub_llm):
+    stub_llm("--chunk-delay", "0.01")
+    first, _, _ = stream_plan(GOAL, TOOLS[:1])
+    tool_call = first["tool_calls"][0]
+    followup = GOAL + [
+        {"role": "assistant", "content": None, "tool_calls": [tool_call]},
+        {"role": "tool", "tool_call_id": tool_call["id"], "content": "hello"},
+    ]
+
+    message, dispatched, _ = stream_plan(followup, TOOLS[:1])
+
+    assert message == {"role": "assistant", "content": "Stub answer after 1 tool result(s)."}
+    assert dispatched == []
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+from mcp import types
+
+import tool_cache
+from config import MCPServerConfig, ToolCacheConfig
+from mcp_multi_client import MCPMultiClient
+from tool_cache import ToolResultCache, canonical_key, stable_hash, tool_ttl
+
+READ_ONLY = types.ToolAnnotations(readOnlyHint=True, idempotentHint=True)
+
+
+def cache_config(**overrides):
+    values = dict(scope="run", max_entries=16, default_ttl=60.0, tool_ttls={})
+    values.update(overrides)
+    return ToolCacheConfig(**values)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(tool_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+class StubSession:
+    """Answers every call with a numbered text; tools listed in `fail` return isError."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=f"{name} #{len(self.calls)}")],
+            isError=name in self.fail,
+        )
+
+
+def client_with(session, tools, cfg):
+    """An MCPMultiClient wired to a stub session instead of a stdio server."""
+    client = MCPMultiClient([MCPServerConfig(name="srv", command="unused", args=[])], cache_config=cfg)
+    client.sessions["srv"] = session
+    client._listed["srv"] = tools
+    client._register_tools()
+    return client
+
+
+def tool(name, annotations=None):
+    return types.Tool(name=name, inputSchema={"type": "object"}, annotations=annotations)
+
+
+def test_key_ignores_argument_order():
+    first = {"path": "a.txt", "options": {"encoding": "utf-8", "lines": [1, 2]}}
+    second = {"options": {"lines": [1, 2], "encoding": "utf-8"}, "path": "a.txt"}
+    assert canonical_key("files__read", first) == canonical_key("files__read", second)
+    assert stable_hash(first) == stable_hash(second)
+
+    cache = ToolResultCache()
+    cache.put("files__read", first, "content", ttl=60)
+    assert cache.get("files__read", second) == ("content", 1)
+    assert cache.get("files__read", {**second, "path": "b.txt"}) is None
+    assert cache.get("files__stat", first) is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ToolResultCache()
+    cache.put("web__search", {"q": "mcp"}, "results", ttl=30)
+
+    clock[0] += 29
+    assert cache.get("web__search", {"q": "mcp"}) == ("results", 1)
+    clock[0] += 1
+    assert cache.get("web__search", {"q": "mcp"}) is None
+    assert cache.get("web__search", {"q": "mcp"}) is None  # the expired entry was dropped
+
+
+def test_lru_bound_and_zero_ttl():
+    cache = ToolResultCache(max_entries=2)
+    cache.put("t", {"n": 0}, "zero", ttl=0)
+    assert cache.get("t", {"n": 0}) is None
+
+    for n in range(3):
+        cache.put("t", {"n": n}, str(n), ttl=60)
+    assert cache.get("t", {"n": 0}) is None
+    assert cache.get("t", {"n": 2}) == ("2", 1)
+
+
+def test_ttl_needs_read_only_and_idempotent_annotations():
+    cfg = cache_config(tool_ttls={"srv__write": 5.0, "srv__read": 0.0})
+    assert tool_ttl(cfg, "srv__lookup", READ_ONLY) == 60.0
+    assert tool_ttl(cfg, "srv__lookup", None) == 0.0
+    assert tool_ttl(cfg, "srv__lookup", types.ToolAnnotations(readOnlyHint=True)) == 0.0
+    assert tool_ttl(cfg, "srv__lookup", types.ToolAnnotations(idempotentHint=True)) == 0.0
+    # Explicit per-tool overrides win over the annotations
+    assert tool_ttl(cfg, "srv__write", None) == 5.0
+    assert tool_ttl(cfg, "srv__read", READ_ONLY) == 0.0
+    assert tool_ttl(cache_config(scope="off"), "srv__lookup", READ_ONLY) == 0.0
+
+
+def test_client_reuses_read_only_results_only():
+    session = StubSession()
+    client = client_with(session, [tool("lookup", READ_ONLY), tool("write")], cache_config())
+
+    async def scenario():
+        results = []
+        for name in ("srv__lookup", "srv__lookup", "srv__write", "srv__write"):
+            results.append(await client.call_tool_cached(name, {"key": "a"}))
+        return results
+
+    assert asyncio.run(scenario()) == [
+        ("lookup #1", 0),
+        ("lookup #1", 1),
+        ("write #2", 0),
+        ("write #3", 0),  # not read-only: always sent to the server
+    ]
+    assert [name for name, _ in session.calls] == ["lookup", "write", "write"]
+
+
+def test_client_never_caches_errors():
+    session = StubSession(fail={"lookup"})
+    client = client_with(session, [tool("lookup", READ_ONLY)], cache_config())
+
+    async def scenario():
+        first = await client.call_tool_cached("srv__lookup", {"key": "a"})
+        session.fail.clear()
+        second = await client.call_tool_cached("srv__lookup", {"key": "a"})
+        third = await client.call_tool_cached("srv__lookup", {"key": "a"})
+        return first, second, third
+
+    assert asyncio.run(scenario()) == (("lookup #1", 0), ("lookup #2", 0), ("lookup #2", 1))
+    assert len(session.calls) == 2
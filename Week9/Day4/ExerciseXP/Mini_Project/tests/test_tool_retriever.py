@@ -0,0 +1,72 @@
+import tool_retriever
+from tool_retriever import ToolRetriever, retriever_for, tokenize, tool_document
+
+
+def tool(name, description="", **params):
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": {p: {"type": "string", "description": d} for p, d in params.items()},
+            },
+        },
+    }
+
+
+SPEC = [
+    tool("files__read_file", "Read a text file from the workspace", path="File path"),
+    tool("files__write_file", "Write text to a file", path="File path", content="Text"),
+    tool("web__search", "Search the web for pages", query="Search terms"),
+    tool("web__fetch_url", "Download a web page", url="Page URL"),
+    tool("local__get_weather", "Current weather for a city", city="City name"),
+]
+
+
+def names(tools):
+    return [t["function"]["name"] for t in tools]
+
+
+def test_tokenize_splits_identifiers_and_drops_stopwords():
+    assert tokenize("files__readFile of the web_search") == ["files", "read", "file", "web", "search"]
+
+
+def test_tool_document_weights_the_name():
+    doc = tool_document(SPEC[2])
+    assert doc.count("search") == tool_retriever.NAME_WEIGHT + 2  # name + description + parameter
+
+
+def test_select_keeps_top_k_in_spec_order():
+    retriever = ToolRetriever(SPEC)
+    assert names(retriever.select("what is the weather in Paris city", top_k=2)) == [
+        "local__get_weather",
+    ]
+    assert names(retriever.select("search the web and fetch the page", top_k=2)) == [
+        "web__search", "web__fetch_url",
+    ]
+
+
+def test_select_adds_tools_already_used():
+    selected = ToolRetriever(SPEC).select("weather city", top_k=1, always=["files__read_file"])
+    assert names(selected) == ["files__read_file", "local__get_weather"]
+
+
+def test_select_falls_back_to_the_full_spec():
+    retriever = ToolRetriever(SPEC)
+    assert retriever.select("zzz unknown", top_k=2) is SPEC
+    assert retriever.select("weather", top_k=0) is SPEC
+    assert retriever.select("weather", top_k=len(SPEC)) is SPEC
+    assert ToolRetriever([]).select("weather", top_k=2) == []
+
+
+def test_retriever_for_reuses_and_evicts_indexes(monkeypatch):
+    monkeypatch.setattr(tool_retriever, "_indexes", type(tool_retriever._indexes)())
+    first = retriever_for(SPEC, "hash-0")
+    assert retriever_for(SPEC, "hash-0") is first
+
+    for i in range(1, tool_retriever.MAX_INDEXES + 1):
+        retriever_for(SPEC, f"hash-{i}")
+    assert "hash-0" not in tool_retriever._indexes
+    assert len(tool_retriever._indexes) == tool_retriever.MAX_INDEXES
@@ -0,0 +1,101 @@
+# Mini Project – MCP Agentic Application (Part 1 + Part 2)
+# This module implements the opt-in tool result cache used by mcp_multi_client.py:
+# - Key: LLM tool name + arguments as canonical JSON (sorted keys, no spaces),
+#   so {"a": 1, "b": 2} and {"b": 2, "a": 1} hit the same entry
+# - Each tool has its own TTL (0 = not cacheable), from MCP_TOOL_CACHE or from
+#   the tool's MCP annotations (readOnlyHint + idempotentHint)
+# - Bounded LRU; scope "run" is cleared at the start of every agent run,
+#   scope "global" is one cache shared by every client of the process.
+# - stable_hash(): the same canonical JSON, hashed (tools spec, LLM requests)
+
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import ToolCacheConfig
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def canonical_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    return f"{tool_name}\x00{canonical_json(arguments)}"
+
+
+def stable_hash(value: Any) -> str:
+    """sha256 of the canonical JSON: equal content → equal hash, whatever the key order."""
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()
+
+
+def tool_ttl(cfg: ToolCacheConfig, llm_name: str, annotations: Any) -> float:
+    """Seconds a result of this tool may be reused (0 = never cached)."""
+    if cfg.scope == "off":
+        return 0.0
+    if llm_name in cfg.tool_ttls:
+        return cfg.tool_ttls[llm_name]
+    # Same arguments → same answer, and no side effect skipped by reusing it
+    if annotations is not None and annotations.readOnlyHint and annotations.idempotentHint:
+        return cfg.default_ttl
+    return 0.0
+
+
+class ToolResultCache:
+    """Thread-safe LRU of canonical key -> (result, expires_at, hits)."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Tuple[str, int]]:
+        """(result, hits so far including this one), or None on a miss/expired entry."""
+        key = canonical_key(tool_name, arguments)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            result, expires_at, hits = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries[key] = (result, expires_at, hits + 1)
+            self._entries.move_to_end(key)
+            return result, hits + 1
+
+    def put(self, tool_name: str, arguments: Dict[str, Any], result: str, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        key = canonical_key(tool_name, arguments)
+        with self._lock:
+            self._entries[key] = (result, time.monotonic() + ttl, 0)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_global_cache: Optional[ToolResultCache] = None
+_global_lock = threading.Lock()
+
+
+def cache_for_scope(cfg: ToolCacheConfig) -> Optional[ToolResultCache]:
+    """The cache a new MCPMultiClient should use, or None when caching is off."""
+    global _global_cache
+    if cfg.scope == "off":
+        return None
+    if cfg.scope == "run":
+        return ToolResultCache(cfg.max_entries)
+    with _global_lock:
+        if _global_cache is None:
+            _global_cache = ToolResultCache(cfg.max_entries)
+        return _global_cache
@@ -0,0 +1,118 @@
+# Mini Project – MCP Agentic Application (Part 1 + Part 2)
+# This module picks the tools sent to the LLM at each step (orchestrator.py):
+# - Keyword index (BM25) over each tool's name, description and parameters,
+#   built once per tools spec (keyed by MCPMultiClient.tools_spec_hash)
+# - Query = user goal + recent history; the top-k tools are kept, plus every
+#   tool already used in the run
+# - The subset keeps the order of the full spec, so a step that selects the same
+#   tools sends the same bytes (prompt caching still applies)
+# - No match at all → the full spec (the LLM must never be left without a way forward)
+
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+NAME_WEIGHT = 3  # name tokens count like 3 occurrences: "read_file" says more than its description
+MAX_INDEXES = 8
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "with", "you", "your", "le", "la",
+    "les", "de", "des", "du", "un", "une", "et",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; snake_case, camelCase and 'server__tool' are split."""
+    text = _CAMEL_RE.sub(" ", text)
+    return [t for t in (m.lower() for m in _TOKEN_RE.findall(text)) if t not in _STOPWORDS]
+
+
+def tool_document(tool: Dict[str, Any]) -> List[str]:
+    """Tokens describing one OpenAI-style tool: name (weighted), description, parameters."""
+    fn = tool.get("function") or {}
+    tokens = tokenize(fn.get("name", "")) * NAME_WEIGHT
+    tokens += tokenize(fn.get("description") or "")
+    properties = (fn.get("parameters") or {}).get("properties") or {}
+    for param, schema in properties.items():
+        tokens += tokenize(param)
+        if isinstance(schema, dict):
+            tokens += tokenize(str(schema.get("description") or ""))
+    return tokens
+
+
+class ToolRetriever:
+    """BM25 over a tools spec; select() returns a subset in spec order."""
+
+    def __init__(self, tools_spec: List[Dict[str, Any]]) -> None:
+        self.tools_spec = tools_spec
+        self.names = [(t.get("function") or {}).get("name", "") for t in tools_spec]
+        docs = [tool_document(t) for t in tools_spec]
+        self._tf = [Counter(doc) for doc in docs]
+        self._lengths = [len(doc) for doc in docs]
+        self._avg_length = (sum(self._lengths) / len(docs)) if docs else 0.0
+        doc_freq: Counter = Counter()
+        for tf in self._tf:
+            doc_freq.update(tf.keys())
+        n = len(docs)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        terms = [t for t in tokenize(query) if t in self._idf]
+        out: List[float] = []
+        for tf, length in zip(self._tf, self._lengths):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self._avg_length or 1))
+            score = 0.0
+            for term in terms:
+                freq = tf.get(term, 0)
+                if freq:
+                    score += self._idf[term] * freq * (BM25_K1 + 1) / (freq + norm)
+            out.append(score)
+        return out
+
+    def select(self, query: str, top_k: int, always: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """Top-k tools for the query + the `always` tools, in the order of the full spec."""
+        if top_k <= 0 or len(self.tools_spec) <= top_k:
+            return self.tools_spec
+        scores = self.scores(query)
+        if not any(scores):
+            return self.tools_spec
+        always = set(always)
+
+        # Ties keep spec order, so the same query always gives the same subset
+        ranked = sorted(
+            (i for i, s in enumerate(scores) if s > 0),
+            key=lambda i: (-scores[i], i),
+        )
+        keep = set(ranked[:top_k])
+        keep.update(i for i, name in enumerate(self.names) if name in always)
+        return [tool for i, tool in enumerate(self.tools_spec) if i in keep]
+
+
+# ### One index per tools spec, shared by every run (the spec rarely changes)
+_indexes: "OrderedDict[str, ToolRetriever]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def retriever_for(tools_spec: List[Dict[str, Any]], spec_hash: str) -> ToolRetriever:
+    with _indexes_lock:
+        retriever = _indexes.get(spec_hash)
+        if retriever is None:
+            retriever = ToolRetriever(tools_spec)
+            _indexes[spec_hash] = retriever
+            while len(_indexes) > MAX_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(spec_hash)
+        return retriever